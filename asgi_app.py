@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+ASGI application for the Climate Futures Storyteller.
+
+Serves the JSON API of web_interface.py (/api/locations, /api/impacts,
+/api/characters, /api/catalog, /api/generate, /api/generate/batch,
+/api/generate/events, /api/random and /health) from an event loop, so a
+request waiting on a slow backend holds a coroutine rather than a worker
+thread. It shares
+web_interface's configuration: the same STORY_* variables select the
+catalog, template pack, corpus and story cache.
+
+Template stories take a fraction of a millisecond of CPU and are written
+inline. Anything that may block is kept off the loop: with a file-backed
+catalog that is not held in memory, generation runs on a bounded thread
+pool (STORY_EXECUTOR_THREADS, default 4), and with STORY_LLM_URL set,
+/api/generate and /api/random await the model (see llm_backend.py), falling
+back to the template story after STORY_LLM_DEADLINE seconds, and
+/api/generate/events streams the model's story as it is written. The catalog
+lists are served from web_interface's precomputed responses.
+
+Run it under any ASGI server, such as gunicorn's own ASGI worker or uvicorn:
+
+    gunicorn -k asgi asgi_app:app
+    uvicorn asgi_app:app --port 5000
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+from urllib.parse import parse_qsl
+
+from catalog_snapshot import SnapshotDataSource
+from climate_storyteller import STORY_FORMATS
+from data_sources import ModuleDataSource
+from llm_backend import (
+    DEFAULT_MODEL,
+    CompletionClient,
+    ModelStoryteller,
+    iter_story_events,
+)
+from precomputed import PrecomputedResponse
+from web_interface import (
+    _ACCEPTED_TYPES,
+    _FORMAT_OF_TYPE,
+    UnknownFormat,
+    batch_params,
+    batch_result,
+    batch_specs,
+    cache_entry,
+    cache_json,
+    catalog_responses,
+    check_format,
+    corpus,
+    envelope_story,
+    hedged,
+    ndjson_line,
+    resolve_names,
+    sse_event,
+    story_cache,
+    story_length,
+    storyteller,
+)
+
+# Largest request body read, in bytes
+MAX_BODY = 64 * 1024
+
+# Generation is inline when the catalog is in memory; otherwise loading a
+# region may read a file or query a database, so it runs on the pool, with at
+# most `_offload_limit` stories waiting for or holding a thread
+_inline = isinstance(storyteller.data_source, (SnapshotDataSource, ModuleDataSource))
+_executor_threads = int(os.environ.get("STORY_EXECUTOR_THREADS", 4))
+_offload_limit = _executor_threads * 4
+_executor = None
+_offload_slots = None
+
+# Writes stories with STORY_LLM_URL's model, on the server's event loop
+_narrator = None
+
+# (status, body, content type or None, extra headers); a body of async
+# chunks is streamed
+Response = Tuple[
+    int,
+    Union[bytes, AsyncIterator[bytes]],
+    Optional[str],
+    Iterable[Tuple[bytes, bytes]],
+]
+
+
+class Request:
+    """The parts of an HTTP request the handlers read."""
+
+    def __init__(self, scope: Dict, body: bytes):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+        self.headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        self.body = body
+
+    def int_arg(self, name: str) -> Optional[int]:
+        """An integer query parameter, or None if absent or not an integer."""
+        try:
+            return int(self.args[name])
+        except (KeyError, ValueError):
+            return None
+
+    def get_json(self) -> Dict:
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise ValueError("The request body is not valid JSON")
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """Encode `payload` as Flask's jsonify would."""
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return status, body.encode("utf-8"), "application/json", ()
+
+
+def error_response(error: Exception, status: int = 500) -> Response:
+    return json_response({"success": False, "error": str(error)}, status)
+
+
+def format_error(error: UnknownFormat) -> Response:
+    """web_interface.format_error, for the ASGI app."""
+    return json_response(
+        {"success": False, "error": str(error), "formats": list(STORY_FORMATS)}, 400
+    )
+
+
+def bare_story_response(story, output_format: str) -> Response:
+    """Return a story as the whole response body, its seed in the headers."""
+    return (
+        200,
+        story.encode("utf-8"),
+        f"{STORY_FORMATS[output_format]}; charset=utf-8",
+        (
+            (b"x-story-seed", str(story.seed).encode("latin-1")),
+            (b"x-story-word-count", str(story.word_count).encode("latin-1")),
+        ),
+    )
+
+
+def precomputed_response(
+    request: Request, precomputed: PrecomputedResponse
+) -> Response:
+    """Serve a PrecomputedResponse, or 304 if the client has its version."""
+    body, etag, coding = precomputed.select(request.headers.get("accept-encoding"))
+    headers = tuple(
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in precomputed.headers(etag, coding)
+    )
+    if precomputed.not_modified(request.headers.get("if-none-match")):
+        return 304, b"", None, headers
+    return 200, body, precomputed.content_type, headers
+
+
+def best_match(accept: str, offered: Iterable[str]) -> Optional[str]:
+    """
+    The offered media type the Accept header rates highest, the earliest
+    offered on a tie; None if it accepts none of them. A type is rated by its
+    most specific matching range.
+    """
+    ratings = {}
+    for item in accept.split(","):
+        media_range, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ratings[media_range.lower()] = quality
+
+    best, best_quality = None, 0.0
+    for media_type in offered:
+        for media_range in (media_type, media_type.split("/")[0] + "/*", "*/*"):
+            if media_range in ratings:
+                if ratings[media_range] > best_quality:
+                    best, best_quality = media_type, ratings[media_range]
+                break
+    return best
+
+
+def negotiate_format(request: Request, requested: Optional[str] = None):
+    """web_interface.negotiate_format, for an ASGI request."""
+    if requested:
+        return check_format(requested), False
+    best = best_match(request.headers.get("accept", ""), _ACCEPTED_TYPES)
+    if best in (None, "application/json"):
+        return "markdown", False
+    return _FORMAT_OF_TYPE[best], True
+
+
+def _model() -> Optional[ModelStoryteller]:
+    """The model narrator, created on first use on the server's loop."""
+    global _narrator
+    if _narrator is None and os.environ.get("STORY_LLM_URL"):
+        _narrator = ModelStoryteller(
+            storyteller,
+            CompletionClient(
+                os.environ["STORY_LLM_URL"],
+                model=os.environ.get("STORY_LLM_MODEL", DEFAULT_MODEL),
+                api_key=os.environ.get("STORY_LLM_API_KEY"),
+            ),
+            deadline=float(os.environ.get("STORY_LLM_DEADLINE", 20)),
+        )
+    return _narrator
+
+
+async def generate(**params):
+    """
+    ClimateStoryteller.generate_story without blocking the loop: awaited from
+    the model if there is one, inline for an in-memory catalog, and on the
+    bounded pool otherwise.
+    """
+    narrator = _model()
+    if narrator is not None:
+        return await narrator.generate_story(**params)
+    return await offload(functools.partial(storyteller.generate_story, **params))
+
+
+async def offload(function):
+    """
+    Call `function`, which may touch the catalog, inline for an in-memory
+    catalog and on the bounded pool otherwise.
+    """
+    global _executor, _offload_slots
+    if _inline:
+        return function()
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(_executor_threads, "story")
+        _offload_slots = asyncio.Semaphore(_offload_limit)
+    async with _offload_slots:
+        return await asyncio.get_running_loop().run_in_executor(_executor, function)
+
+
+async def get_locations(request: Request) -> Response:
+    """API endpoint to get available locations."""
+    return precomputed_response(request, catalog_responses()["locations"])
+
+
+async def get_impacts(request: Request) -> Response:
+    """API endpoint to get available climate impacts."""
+    return precomputed_response(request, catalog_responses()["impacts"])
+
+
+async def get_characters(request: Request) -> Response:
+    """API endpoint to get available character types."""
+    return precomputed_response(request, catalog_responses()["characters"])
+
+
+async def get_catalog(request: Request) -> Response:
+    """API endpoint to get every catalog list and their display labels."""
+    return precomputed_response(request, catalog_responses()["catalog"])
+
+
+async def generate_story(request: Request) -> Response:
+    """API endpoint to generate a story; see web_interface.generate_story."""
+    try:
+        data = request.get_json()
+
+        location, impact, character = resolve_names(
+            data.get("location"), data.get("impact"), data.get("character")
+        )
+        length = story_length(data.get("length"))
+        seed = data.get("seed")
+        seed = int(seed) if seed is not None else None
+        output_format, bare = negotiate_format(
+            request, data.get("format") or request.args.get("format")
+        )
+
+        # Model stories differ from call to call, so only template stories
+        # are cached, as in web_interface
+        cacheable = seed is not None and _model() is None
+        key = (location, impact, character, length, seed, output_format, bare)
+        cached = story_cache.get(key) if cacheable else None
+        if cached is not None and cache_json and not bare:
+            return 200, cached, "application/json", ()
+
+        if cached is not None:
+            story, protagonist = cached
+        else:
+            story = await generate(
+                location=location,
+                climate_impact=impact,
+                character_focus=character,
+                story_length=length,
+                seed=seed,
+                output_format=output_format,
+            )
+            protagonist = story.plan.character
+
+        if bare:
+            if cacheable and cached is None:
+                story_cache.put(key, *cache_entry(story))
+            return bare_story_response(story, output_format)
+
+        metadata = {
+            "location": location,
+            "impact": impact,
+            "character": character,
+            "length": length,
+            "word_count": story.word_count,
+            "seed": story.seed,
+            "protagonist": protagonist.to_dict(),
+        }
+        if _narrator is not None:
+            metadata["source"] = story.source
+        response = json_response(
+            {
+                "success": True,
+                "story": envelope_story(story, output_format),
+                "format": output_format,
+                "metadata": metadata,
+            }
+        )
+
+        if cacheable and cached is None:
+            if cache_json:
+                story_cache.put(key, response[1], sys.getsizeof(response[1]))
+            else:
+                story_cache.put(key, *cache_entry(story))
+        return response
+
+    except UnknownFormat as e:
+        return format_error(e)
+    except Exception as e:
+        return error_response(e)
+
+
+async def generate_random_story(request: Request) -> Response:
+    """API endpoint to generate a random story, in any of STORY_FORMATS."""
+    try:
+        seed = request.int_arg("seed")
+        output_format, bare = negotiate_format(request, request.args.get("format"))
+        params = {"seed": seed, "output_format": output_format}
+        if seed is None and corpus is not None:
+            index = corpus.random_index()
+            if index is not None:
+                metadata = corpus.metadata(index)
+                if output_format == "markdown" and not bare:
+                    return json_response(
+                        {
+                            "success": True,
+                            "story": corpus.story(index),
+                            "seed": metadata["seed"],
+                        }
+                    )
+                # Other formats are rendered again from the prebuilt story's seed
+                params = {
+                    "location": metadata["location"],
+                    "climate_impact": metadata["impact"],
+                    "character_focus": metadata["character"],
+                    "story_length": corpus.story_length,
+                    "seed": metadata["seed"],
+                    "output_format": output_format,
+                }
+
+        story = await generate(**params)
+        if bare:
+            return bare_story_response(story, output_format)
+        return json_response(
+            {
+                "success": True,
+                "story": envelope_story(story, output_format),
+                "seed": story.seed,
+            }
+        )
+    except UnknownFormat as e:
+        return format_error(e)
+    except Exception as e:
+        return error_response(e)
+
+
+async def batch_lines(specs) -> AsyncIterator[bytes]:
+    """web_interface.batch_lines, with each story generated as in `generate`."""
+    for index, spec in enumerate(specs):
+        try:
+            params = batch_params(spec)
+            story = await generate(**params)
+            result = batch_result(story, params)
+            if _narrator is not None:
+                result["metadata"]["source"] = story.source
+            line = ndjson_line(index, result)
+        except Exception as e:
+            line = ndjson_line(index, {"success": False, "error": str(e)})
+        yield line.encode("utf-8")
+
+
+async def generate_story_batch(request: Request) -> Response:
+    """
+    API endpoint to stream a batch of stories as newline-delimited JSON; see
+    web_interface.generate_story_batch.
+    """
+    try:
+        count, specs = batch_specs(request.get_json())
+    except UnknownFormat as e:
+        return format_error(e)
+    except Exception as e:
+        return error_response(e, 400)
+    return (
+        200,
+        batch_lines(specs),
+        "application/x-ndjson",
+        (
+            (b"x-batch-count", str(count).encode("latin-1")),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ),
+    )
+
+
+async def _replay(events: Iterable) -> AsyncIterator:
+    """Yield `events` from an async iterator."""
+    for event in events:
+        yield event
+
+
+async def server_sent_events(first, events: AsyncIterator) -> AsyncIterator[bytes]:
+    """
+    web_interface.server_sent_events, for `first` and the rest of an async
+    iterator of events, which is closed when the response ends or the client
+    leaves.
+    """
+    try:
+        yield sse_event(*first).encode("utf-8")
+        async for event, data in events:
+            yield sse_event(event, data).encode("utf-8")
+    except Exception as e:
+        # The response has started; report the failure in the stream
+        yield sse_event("error", {"error": str(e)}).encode("utf-8")
+    finally:
+        await events.aclose()
+
+
+async def generate_story_events(request: Request) -> Response:
+    """
+    API endpoint to stream a story as server-sent events while it is written;
+    see web_interface.generate_story_events. A client that leaves mid-story
+    stops the model's request.
+    """
+    try:
+        location, impact, character = resolve_names(
+            request.args.get("location"),
+            request.args.get("impact"),
+            request.args.get("character"),
+        )
+        params = {
+            "location": location,
+            "climate_impact": impact,
+            "character_focus": character,
+            "story_length": story_length(request.int_arg("length")),
+            "seed": request.int_arg("seed"),
+        }
+        narrator = _model()
+        if narrator is not None and hedged:
+            events = narrator.hedge_story(**params)
+        elif narrator is not None:
+            events = narrator.stream_story(**params)
+        else:
+            events = _replay(
+                await offload(lambda: list(iter_story_events(storyteller, **params)))
+            )
+        # Plan the story before committing to a 200 response
+        first = await events.__anext__()
+    except Exception as e:
+        return error_response(e)
+    return (
+        200,
+        server_sent_events(first, events),
+        "text/event-stream",
+        ((b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")),
+    )
+
+
+async def health_check(request: Request) -> Response:
+    """Health check endpoint for monitoring."""
+    return json_response(
+        {
+            "status": "healthy",
+            "service": "Climate Futures Storyteller",
+            "version": "1.0.0",
+        }
+    )
+
+
+ROUTES = {
+    "/api/locations": ("GET", get_locations),
+    "/api/impacts": ("GET", get_impacts),
+    "/api/characters": ("GET", get_characters),
+    "/api/catalog": ("GET", get_catalog),
+    "/api/generate": ("POST", generate_story),
+    "/api/generate/batch": ("POST", generate_story_batch),
+    "/api/generate/events": ("GET", generate_story_events),
+    "/api/random": ("GET", generate_random_story),
+    "/health": ("GET", health_check),
+}
+
+
+async def _read_body(receive) -> bytes:
+    """Read the request body; raise ValueError past MAX_BODY."""
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ConnectionError("The client disconnected")
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY:
+            raise ValueError(f"Request body larger than {MAX_BODY} bytes")
+        if not message.get("more_body"):
+            return body
+
+
+async def _stream_body(chunks: AsyncIterator[bytes], receive, send):
+    """
+    Send `chunks` as the response body, one message each, stopping at the
+    first chunk after the client disconnects. Servers drop writes to a closed
+    connection silently, so the request's channel is watched instead: with
+    the body read, its next message is http.disconnect.
+    """
+    disconnected = asyncio.ensure_future(receive())
+    try:
+        async for chunk in chunks:
+            if disconnected.done():
+                return
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": True}
+            )
+            # Let the watcher and other requests run between chunks
+            await asyncio.sleep(0)
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        disconnected.cancel()
+        await chunks.aclose()
+
+
+async def _lifespan(receive, send):
+    """Answer the server's startup and shutdown, closing the model client."""
+    global _narrator
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _narrator is not None:
+                await _narrator.client.close()
+                _narrator = None
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    route = ROUTES.get(scope["path"])
+    headers = ()
+    if route is None:
+        response = json_response({"success": False, "error": "Not found"}, 404)
+    elif scope["method"] != route[0] and (
+        scope["method"] != "HEAD" or route[0] != "GET"
+    ):
+        response = json_response(
+            {"success": False, "error": "Method not allowed"}, 405
+        )
+        headers = ((b"allow", route[0].encode("latin-1")),)
+    else:
+        try:
+            body = await _read_body(receive)
+        except ConnectionError:
+            return
+        except ValueError as e:
+            response = error_response(e, 413)
+        else:
+            response = await route[1](Request(scope, body))
+
+    status, body, content_type, extra = response
+    headers = [*extra, *headers]
+    if content_type is not None:
+        headers.append((b"content-type", content_type.encode("latin-1")))
+    start = {"type": "http.response.start", "status": status, "headers": headers}
+    if not isinstance(body, bytes):
+        await send(start)
+        return await _stream_body(body, receive, send)
+    if status != 304:
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+    await send(start)
+    await send(
+        {
+            "type": "http.response.body",
+            "body": b"" if scope["method"] == "HEAD" else body,
+        }
+    )
@@ -0,0 +1,40 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Each script runs from this directory, so `from _common import ...` finds this
+module; it puts the repository root on the path for them as well.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from llm_backend import nearest_rank
+from mock_llm_server import MockCompletionServer, MockModel
+
+
+def percentile(samples, fraction: float) -> float:
+    """Return the nearest-rank percentile of `samples`, in any order."""
+    return nearest_rank(sorted(samples), fraction)
+
+
+def timed(fn):
+    """Return (result, elapsed seconds) for a single call."""
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def start_mock(model: MockModel) -> MockCompletionServer:
+    """Run the mock server on a loop thread of its own; return it once bound."""
+    mock = MockCompletionServer(model, seed=0)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(mock.start(), loop).result()
+    return mock
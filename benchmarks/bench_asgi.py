@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput of the Flask app against the ASGI app.
+
+Starts each app under gunicorn with the same number of workers (Flask on
+gunicorn.conf.py's threaded workers, asgi_app.py on gunicorn's ASGI worker)
+and has `--connections` keep-alive clients send requests for `--duration`
+seconds, then reports requests per second and latency percentiles:
+
+    python benchmarks/bench_asgi.py --connections 64 --duration 10
+
+Two loads are measured. "templates" asks both apps for template stories
+(POST /api/generate). "model" points both at mock_llm_server.py, with
+`--ttft` seconds to the first token and `--tokens-per-second` after, and
+asks each for model-written stories: the Flask app writes them on
+/api/generate/events, its only model-backed route, holding a thread for the
+whole story; the ASGI app awaits them on /api/generate.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from _common import percentile
+from llm_backend import _read_body, _read_head
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(command, port: int, env=None) -> subprocess.Popen:
+    """Run `command` and wait until it accepts connections on `port`."""
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{command[0]} did not start on port {port}")
+
+
+def gunicorn(app: str, port: int, workers: int, env=None) -> subprocess.Popen:
+    """Run `app` under gunicorn: threaded workers for WSGI, ASGI workers else."""
+    command = [sys.executable, "-m", "gunicorn", "-w", str(workers)]
+    command += ["-b", f"127.0.0.1:{port}", "--timeout", "120"]
+    if app.startswith("asgi_app"):
+        command += ["-k", "asgi", "--threads", "1"]
+    return start(command + [app], port, env)
+
+
+def post(path: str, payload: dict) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    return (
+        f"POST {path} HTTP/1.1\r\nHost: bench\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode("latin-1") + body
+
+
+def get(target: str) -> bytes:
+    return f"GET {target} HTTP/1.1\r\nHost: bench\r\n\r\n".encode("latin-1")
+
+
+async def load(port: int, request, args) -> dict:
+    """
+    Send `request(seed)`s on `args.connections` connections for
+    `args.duration` seconds; return throughput and latency.
+    """
+    latencies, errors = [], 0
+    stop = time.perf_counter() + args.duration
+
+    async def connection():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            writer.write(request(random.getrandbits(32)))
+            _, status, headers = await _read_head(reader)
+            await _read_body(reader, headers)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests/s": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--length", type=int, default=1200, help="words per story")
+    parser.add_argument("--model-length", type=int, default=300)
+    parser.add_argument("--ttft", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    args = parser.parse_args()
+
+    mock_port = free_port()
+    mock = start(
+        [
+            sys.executable,
+            "mock_llm_server.py",
+            "--port",
+            str(mock_port),
+            "--ttft",
+            str(args.ttft),
+            "--tokens-per-second",
+            str(args.tokens_per_second),
+            "--slots",
+            "1024",
+        ],
+        mock_port,
+    )
+    model_env = {
+        "STORY_LLM_URL": f"http://127.0.0.1:{mock_port}",
+        "STORY_LLM_DEADLINE": "30",
+    }
+    length, model_length = args.length, args.model_length
+    runs = [
+        (
+            "templates / flask",
+            "wsgi:app",
+            lambda seed: post("/api/generate", {"length": length, "seed": seed}),
+            {},
+        ),
+        (
+            "templates / asgi",
+            "asgi_app:app",
+            lambda seed: post("/api/generate", {"length": length, "seed": seed}),
+            {},
+        ),
+        (
+            "model / flask",
+            "wsgi:app",
+            lambda seed: get(f"/api/generate/events?length={model_length}"),
+            model_env,
+        ),
+        (
+            "model / asgi",
+            "asgi_app:app",
+            lambda seed: post("/api/generate", {"length": model_length}),
+            model_env,
+        ),
+    ]
+
+    print(
+        f"{args.connections} connections, {args.workers} workers, "
+        f"{args.duration:g}s per run"
+    )
+    print(f"{'':<18} {'requests/s':>10} {'p50':>8} {'p99':>8} {'errors':>6}")
+    try:
+        for label, app, request, env in runs:
+            port = free_port()
+            server = gunicorn(app, port, args.workers, env)
+            try:
+                result = asyncio.run(load(port, request, args))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{label:<18} {result['requests/s']:>10.1f} "
+                f"{result['p50'] * 1000:>6.0f}ms {result['p99'] * 1000:>6.0f}ms "
+                f"{result['errors']:>6}"
+            )
+    finally:
+        mock.terminate()
+
+
+if __name__ == "__main__":
+    main()
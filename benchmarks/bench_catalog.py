@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Cost of serving the catalog lists, encoded per hit against precomputed.
+
+Calls the Flask app directly (no server or socket) for /api/locations,
+/api/impacts and /api/characters three ways: through a route that encodes
+the list with jsonify on every hit, as before; through the real route, which
+serves the precomputed response; and as a revalidation answered with 304.
+Also reports the bytes sent with and without gzip:
+
+    python benchmarks/bench_catalog.py
+    STORY_DATA=catalog.db python benchmarks/bench_catalog.py   # larger catalog
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify
+from werkzeug.test import EnvironBuilder
+
+from web_interface import app, catalog_responses, storyteller
+
+LISTS = {
+    "locations": storyteller.list_available_locations,
+    "impacts": storyteller.list_available_impacts,
+    "characters": storyteller.list_available_characters,
+}
+
+
+@app.route("/bench/jsonify/<name>")
+def encoded_per_hit(name):
+    return jsonify(LISTS[name]())
+
+
+def call(path: str, headers=None):
+    """A function that has the app answer one GET of `path`."""
+    environ = EnvironBuilder(path=path, headers=headers).get_environ()
+
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    def request():
+        for _ in app(dict(environ), start_response):
+            pass
+
+    return request
+
+
+def per_call_us(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(
+        f"{'':<12} {'jsonify':>10} {'precomputed':>12} {'304':>8} "
+        f"{'bytes':>7} {'gzip':>7}"
+    )
+    for name in LISTS:
+        precomputed = catalog_responses()[name]
+        gzip = {"Accept-Encoding": "gzip"}
+        timings = [
+            per_call_us(call(path, headers), args.number)
+            for path, headers in (
+                (f"/bench/jsonify/{name}", None),
+                (f"/api/{name}", gzip),
+                (f"/api/{name}", {**gzip, "If-None-Match": precomputed.etag}),
+            )
+        ]
+        gzipped = precomputed.variants.get("gzip", (precomputed.body,))[0]
+        print(
+            f"{name:<12} {timings[0]:>8.1f}us {timings[1]:>10.1f}us "
+            f"{timings[2]:>6.1f}us {len(precomputed.body):>7} {len(gzipped):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
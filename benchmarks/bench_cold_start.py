@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Cold start of ClimateStoryteller with and without a compiled catalog snapshot.
+
+Each run is a fresh interpreter that imports the storyteller, constructs it
+and generates one story; the script reports the median time to construct and
+generate (the part the catalog snapshot affects), the median total time and
+the peak resident memory of those processes:
+
+    python benchmarks/bench_cold_start.py -n 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import resource, time
+start = time.perf_counter()
+from climate_storyteller import ClimateStoryteller
+imported = time.perf_counter()
+ClimateStoryteller().generate_story(seed=1)
+end = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(end - imported, end - start, rss)
+"""
+
+
+def run(cache_dir: str, n: int):
+    """Return median (start-up seconds, total seconds, max RSS in KiB)."""
+    env = {**os.environ, "STORY_CATALOG_CACHE": cache_dir}
+    startup, total, rss = [], [], []
+    for _ in range(n):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        startup.append(float(output[0]))
+        total.append(float(output[1]))
+        rss.append(int(output[2]))
+    return tuple(map(statistics.median, (startup, total, rss)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=20, help="processes per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Compile the snapshot once so every measured run finds it fresh
+        run(cache_dir, 1)
+        for label, directory in (("source:", ""), ("snapshot:", cache_dir)):
+            startup, total, rss = run(directory, args.n)
+            print(
+                f"{label:<10} start-up {startup * 1000:>6.2f} ms  "
+                f"total {total * 1000:>6.1f} ms  {rss / 1024:>6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for ClimateStoryteller.generate_stories.
+
+Compares the batch API against a Python loop over generate_story:
+
+    python benchmarks/bench_generate_stories.py -n 100000
+    python benchmarks/bench_generate_stories.py -n 100000 --reproducible
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _common import timed
+from climate_storyteller import ClimateStoryteller
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=100000, help="stories per run")
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="batch stories that generate_story reproduces from their seeds",
+    )
+    args = parser.parse_args()
+
+    storyteller = ClimateStoryteller()
+    storyteller.generate_stories(n=1000)  # warm up
+
+    _, loop = timed(lambda: [storyteller.generate_story() for _ in range(args.n)])
+    _, batch = timed(
+        lambda: storyteller.generate_stories(n=args.n, reproducible=args.reproducible)
+    )
+
+    print(f"loop:  {args.n / loop:>12,.0f} stories/s")
+    print(f"batch: {args.n / batch:>12,.0f} stories/s  ({loop / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for ClimateStoryteller.generate_story.
+
+Times story generation in the working tree and, optionally, in the
+climate_storyteller.py from another git revision so the two can be compared:
+
+    python benchmarks/bench_generate_story.py --against HEAD~1
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CASES = {
+    "random": {},
+    "coastal": {
+        "location": "miami_florida",
+        "climate_impact": "sea_level_rise",
+        "character_focus": "coastal_community",
+    },
+    "maternal": {
+        "location": "kenya",
+        "climate_impact": "flooding_events",
+        "character_focus": "pregnant_woman",
+    },
+}
+
+
+def load_storyteller(revision=None):
+    """Import ClimateStoryteller from the working tree or from a git revision."""
+    if revision is None:
+        from climate_storyteller import ClimateStoryteller
+
+        return ClimateStoryteller
+
+    source = subprocess.run(
+        ["git", "show", f"{revision}:climate_storyteller.py"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location("_baseline_storyteller", f.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    os.unlink(f.name)
+    return module.ClimateStoryteller
+
+
+def bench(storyteller_cls, kwargs, number, repeat):
+    """Return the best per-story time in microseconds."""
+    storyteller = storyteller_cls()
+    random.seed(0)
+    timings = timeit.repeat(
+        lambda: storyteller.generate_story(**kwargs), number=number, repeat=repeat
+    )
+    return min(timings) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--against", help="git revision to compare against")
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    current = load_storyteller()
+    baseline = load_storyteller(args.against) if args.against else None
+
+    print(f"{'case':<10} {'current':>12}" + (f" {'baseline':>12} {'speedup':>8}" if baseline else ""))
+    for case, kwargs in CASES.items():
+        now = bench(current, kwargs, args.number, args.repeat)
+        line = f"{case:<10} {now:>9.2f} us"
+        if baseline:
+            then = bench(baseline, kwargs, args.number, args.repeat)
+            line += f" {then:>9.2f} us {then / now:>7.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
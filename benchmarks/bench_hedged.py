@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Latency of hedged stories: the template story at once, the model's later.
+
+Runs mock_llm_server.py on a thread and has `--concurrency` callers generate
+`--stories` stories with ClimateStoryteller, one every `--interval` seconds
+each, once on its own and then with a ModelService as its enricher, against
+a healthy, an erratic, a failing and a stalling model. Reports
+generate_story latency percentiles, which should not move, how many rewrites
+arrived in time, and the circuit breaker's state:
+
+    python benchmarks/bench_hedged.py --stories 400 --concurrency 8
+    python benchmarks/bench_hedged.py --deadline 0.5 --ttft 1
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _common import percentile, start_mock
+from climate_storyteller import ClimateStoryteller
+from llm_backend import ModelService
+from mock_llm_server import MockModel
+
+
+def bench(args, model=None) -> dict:
+    """Generate the stories, hedged against `model` if given; return results."""
+    storyteller = ClimateStoryteller()
+    service = None
+    if model is not None:
+        mock = start_mock(model)
+        service = ModelService(
+            storyteller, f"http://127.0.0.1:{mock.port}", deadline=args.deadline
+        )
+        storyteller.enricher = service
+        service.stats()  # start its loop thread before timing
+
+    def generate(seed):
+        time.sleep(args.interval)
+        start = time.perf_counter()
+        story = storyteller.generate_story(story_length=args.length, seed=seed)
+        return time.perf_counter() - start, story.enriched
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(generate, range(args.stories)))
+    latencies = [latency for latency, _ in results]
+    result = {
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "max": max(latencies) * 1000,
+    }
+    if service is not None:
+        futures = [future for _, future in results]
+        wait(futures)
+        stats = service.stats()
+        result.update(
+            enriched=sum(future.result() is not None for future in futures),
+            rejected=stats["rejected"],
+            breaker=stats["breaker"],
+        )
+        service.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stories", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--interval", type=float, default=0.1, help="seconds between stories"
+    )
+    parser.add_argument("--length", type=int, default=600, help="words per story")
+    parser.add_argument("--deadline", type=float, default=2.0)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # one warning per failed rewrite otherwise
+
+    healthy = MockModel(ttft=args.ttft, tokens_per_second=args.tokens_per_second)
+    models = {
+        "templates": None,
+        "healthy": healthy,
+        "erratic": MockModel(**{**healthy.__dict__, "error_rate": 0.3}),
+        "failing": MockModel(**{**healthy.__dict__, "error_rate": 1.0}),
+        "stalling": MockModel(**{**healthy.__dict__, "stall_rate": 1.0}),
+    }
+    print(
+        f"{args.stories} stories of {args.length} words, "
+        f"{args.concurrency} callers, deadline {args.deadline:g}s "
+        "(erratic: 30% errors)"
+    )
+    print(
+        f"{'':<12} {'p50':>9} {'p99':>9} {'max':>9} "
+        f"{'enriched':>9} {'rejected':>9}  breaker"
+    )
+    for label, model in models.items():
+        result = bench(args, model)
+        print(
+            f"{label:<12} {result['p50']:>7.2f}ms {result['p99']:>7.2f}ms "
+            f"{result['max']:>7.2f}ms {result.get('enriched', '-'):>9} "
+            f"{result.get('rejected', '-'):>9}  {result.get('breaker', '-')}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Overhead of ClimateStoryteller's per-stage instrumentation.
+
+Times generate_story on a storyteller that never enabled instrumentation, with
+it enabled, and after disabling it again, then prints the stage breakdown
+recorded while enabled:
+
+    python benchmarks/bench_instrumentation.py --number 5000
+
+To check the disabled path against the code before instrumentation existed,
+use bench_generate_story.py --against <revision>.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from climate_storyteller import ClimateStoryteller
+
+
+def bench(variants, number: int, repeat: int) -> dict:
+    """
+    Return the best per-story time in microseconds of each storyteller,
+    running the variants in turn every round so drift affects them alike.
+    """
+    best = {label: float("inf") for label in variants}
+    for _ in range(repeat):
+        for label, storyteller in variants.items():
+            seeds = iter(range(number))
+            elapsed = timeit.timeit(
+                lambda: storyteller.generate_story(seed=next(seeds)), number=number
+            )
+            best[label] = min(best[label], elapsed / number * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    plain = ClimateStoryteller()
+    toggled = ClimateStoryteller()
+    instrumented = ClimateStoryteller()
+    instrumented.enable_instrumentation()
+    toggled.enable_instrumentation()
+    toggled.disable_instrumentation()
+
+    best = bench(
+        {"disabled:": plain, "toggled off:": toggled, "enabled:": instrumented},
+        args.number,
+        args.repeat,
+    )
+    for label, now in best.items():
+        change = now / best["disabled:"] - 1
+        print(f"{label:<13} {now:>8.2f} us/story  {change:>+7.1%}")
+
+    print(f"\n{'stage':<26} {'calls':>10} {'mean':>10} {'max':>10}")
+    for stage, timing in instrumented.stage_timings().items():
+        print(
+            f"{stage:<26} {timing['calls']:>10,} "
+            f"{timing['mean_ns'] / 1000:>7.2f} us {timing['max_ns'] / 1000:>7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
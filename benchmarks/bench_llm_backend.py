@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Throughput and tail latency of model-written stories, offline.
+
+Starts mock_llm_server.py in-process and has `--concurrency` callers write
+`--stories` stories through ModelStoryteller, once sending every prompt on its
+own and once batching prompts that arrive together, then reports stories per
+second, latency percentiles, and how many stories fell back to templates:
+
+    python benchmarks/bench_llm_backend.py --stories 400 --concurrency 64
+    python benchmarks/bench_llm_backend.py --error-rate 0.05 --stall-rate 0.02
+
+The mock decodes at most `--slots` requests at once, like a model server, so
+batching is what lets throughput grow past `--slots` stories at a time.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _common import percentile
+from climate_storyteller import ClimateStoryteller
+from llm_backend import CompletionClient, ModelStoryteller
+from mock_llm_server import MockCompletionServer, MockModel
+
+
+async def bench(args, model: MockModel, max_batch: int) -> dict:
+    """Write the stories against a fresh mock server; return the results."""
+    mock = MockCompletionServer(model, seed=0)
+    server = await mock.start()
+    storyteller = ClimateStoryteller()
+    client = CompletionClient(
+        f"http://127.0.0.1:{mock.port}",
+        max_connections=args.connections,
+        max_batch=max_batch,
+    )
+    narrator = ModelStoryteller(storyteller, client, deadline=args.deadline)
+    seeds = iter(range(args.stories))
+    latencies = []
+
+    async def caller():
+        for seed in seeds:
+            start = time.perf_counter()
+            await narrator.generate_story(story_length=args.length, seed=seed)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    server.close()
+    await server.wait_closed()
+
+    stats = narrator.stats()
+    return {
+        "stories/s": args.stories / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies),
+        "model": stats["model_stories"],
+        "fallback": stats["timeouts"] + stats["failures"],
+        "requests": stats["requests"],
+    }
+
+
+def main():
+    defaults = MockModel()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stories", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--length", type=int, default=1200, help="words per story")
+    parser.add_argument("--deadline", type=float, default=10.0)
+    parser.add_argument("--ttft", type=float, default=0.1)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--slots", type=int, default=defaults.slots)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # one warning per failed story otherwise
+
+    model = MockModel(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        slots=args.slots,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+    )
+    print(
+        f"{args.stories} stories, {args.concurrency} callers, "
+        f"{args.connections} connections, {args.slots} server slots, "
+        f"deadline {args.deadline:g}s"
+    )
+    print(
+        f"{'':<12} {'stories/s':>10} {'p50':>8} {'p99':>8} {'max':>8} "
+        f"{'model':>6} {'fallback':>8} {'requests':>8}"
+    )
+    for label, max_batch in (("unbatched", 1), ("batched", args.max_batch)):
+        result = asyncio.run(bench(args, model, max_batch))
+        print(
+            f"{label:<12} {result['stories/s']:>10.1f} {result['p50']:>7.2f}s "
+            f"{result['p99']:>7.2f}s {result['max']:>7.2f}s {result['model']:>6} "
+            f"{result['fallback']:>8} {result['requests']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Per-story memory of StoryPlan/Character records versus plain dicts.
+
+Plans a batch of stories, then measures with tracemalloc the memory retained
+by the slotted records and by the equivalent dicts (`plan.to_dict()`, the
+shape the storyteller used to pass around). Both forms share the same scene
+and name strings, so the difference is the container overhead alone:
+
+    python benchmarks/bench_story_memory.py -n 100000
+"""
+
+import argparse
+import dataclasses
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from climate_storyteller import ClimateStoryteller
+
+
+def retained(build):
+    """Return (retained bytes, peak bytes) while the result of build() is alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=100000, help="stories per run")
+    args = parser.parse_args()
+
+    storyteller = ClimateStoryteller()
+
+    def plan_batch():
+        return [
+            storyteller._plan_story(None, None, None, seed)[0]
+            for seed in range(args.n)
+        ]
+
+    total, _ = retained(plan_batch)
+    plans = plan_batch()
+
+    records, records_peak = retained(
+        lambda: [
+            dataclasses.replace(plan, character=dataclasses.replace(plan.character))
+            for plan in plans
+        ]
+    )
+    dicts, dicts_peak = retained(lambda: [plan.to_dict() for plan in plans])
+
+    n = args.n
+    print(f"stories:     {n:>10,}")
+    print(f"plan total:  {total / n:>10,.0f} bytes/story (records and strings)")
+    for label, current, peak in (
+        ("records:", records, records_peak),
+        ("dicts:", dicts, dicts_peak),
+    ):
+        print(f"{label:<12} {current / n:>10,.0f} bytes/story (peak {peak / n:,.0f})")
+    saved = dicts - records
+    print(f"saved:       {saved / n:>10,.0f} bytes/story ({saved / dicts:.0%})")
+
+
+if __name__ == "__main__":
+    main()
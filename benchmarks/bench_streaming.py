@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Time to first chunk of streamed, model-written stories, offline.
+
+Runs mock_llm_server.py on a thread, points the web interface's
+STORY_LLM_URL at it, and has `--concurrency` clients read `--stories`
+stories from /api/generate/events through Flask's test client. Reports how
+long readers waited for the first words against the whole story, and checks
+that a reader who leaves early stops the model request:
+
+    python benchmarks/bench_streaming.py --stories 40 --concurrency 8
+    python benchmarks/bench_streaming.py --ttft 2 --deadline 1   # fallbacks
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _common import percentile, start_mock
+from mock_llm_server import MockModel
+
+
+def read_story(client, query: str, leave_after_first: bool = False) -> dict:
+    """Read one event stream; return its timings and the "done" event."""
+    start = time.perf_counter()
+    response = client.get(f"/api/generate/events?{query}", buffered=False)
+    first, done = None, None
+    try:
+        for piece in response.response:
+            for event in piece.decode("utf-8").split("\n\n"):
+                if event.startswith("event: chunk") and first is None:
+                    first = time.perf_counter() - start
+                    if leave_after_first:
+                        return {"first": first}
+                elif event.startswith("event: done"):
+                    done = json.loads(event.split("data: ", 1)[1])
+    finally:
+        response.close()
+    return {"first": first, "total": time.perf_counter() - start, "done": done}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stories", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--length", type=int, default=600, help="words per story")
+    parser.add_argument("--deadline", type=float, default=5.0)
+    parser.add_argument("--ttft", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    mock = start_mock(
+        MockModel(ttft=args.ttft, tokens_per_second=args.tokens_per_second)
+    )
+    os.environ["STORY_LLM_URL"] = f"http://127.0.0.1:{mock.port}"
+    os.environ["STORY_LLM_DEADLINE"] = str(args.deadline)
+    from web_interface import app, model_service
+
+    client = app.test_client()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(
+            pool.map(
+                lambda seed: read_story(
+                    client, f"length={args.length}&seed={seed}"
+                ),
+                range(args.stories),
+            )
+        )
+
+    firsts = [result["first"] for result in results]
+    totals = [result["total"] for result in results]
+    sources = [result["done"]["source"] for result in results]
+    print(
+        f"{args.stories} stories of {args.length} words, "
+        f"{args.concurrency} readers, deadline {args.deadline:g}s"
+    )
+    for label, samples in (("first chunk", firsts), ("whole story", totals)):
+        print(
+            f"  {label:<12} p50 {percentile(samples, 0.5):6.3f}s  "
+            f"p99 {percentile(samples, 0.99):6.3f}s"
+        )
+    print(
+        f"  written by the model: {sources.count('model')}, "
+        f"templates: {sources.count('template')}"
+    )
+    print(f"  server-side ttft_ms: {model_service.stats()['ttft_ms']}")
+
+    # A reader who leaves after the first words must not keep the model
+    # busy. The mock notices a closed connection when it next writes, which
+    # may be after its first-token delay, so give it time to.
+    settle = args.ttft * 5 + 0.5
+    time.sleep(settle)
+    before = mock.requests
+    read_story(client, f"length={args.length * 4}&seed=1", leave_after_first=True)
+    time.sleep(settle)
+    print(
+        f"  abandoned stream: model requests sent {mock.requests - before}, "
+        f"still decoding {mock.active}"
+    )
+
+
+if __name__ == "__main__":
+    main()
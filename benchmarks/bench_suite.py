@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the story generation pipeline, with regression gating.
+
+`run` measures generate_story latency (p50/p99) over every location x impact x
+character combination, batch throughput of generate_stories, per-story
+allocations with tracemalloc, and the import/start-up time of
+climate_storyteller and web_interface, and writes the results as JSON.
+`compare` checks a results file against a stored baseline and exits with
+status 1 when any metric is worse by more than the threshold, or status 2
+when the two were written by a different format or run parameters. Metrics
+new since the baseline are listed but not gated:
+
+    python benchmarks/bench_suite.py run -o baseline.json
+    python benchmarks/bench_suite.py run -o results.json
+    python benchmarks/bench_suite.py compare baseline.json results.json
+
+Everything runs offline with the standard library; web_interface is skipped
+when Flask is not installed.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import product
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from _common import percentile, timed
+
+FORMAT_VERSION = 1
+
+IMPORT_CHILD = """
+import sys, time
+start = time.perf_counter_ns()
+import {module}
+print(time.perf_counter_ns() - start)
+"""
+
+
+def metric(value: float, unit: str, better: str = "lower") -> Dict:
+    """One gated measurement; `better` is "lower" or "higher"."""
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def bench_latency(storyteller, samples: int) -> Dict:
+    """Time generate_story `samples` times per combination, with fixed seeds."""
+    locations = storyteller.list_available_locations()
+    impacts = storyteller.list_available_impacts()
+    characters = storyteller.list_available_characters()
+
+    # Per combination only the median is kept: with a few dozen samples each,
+    # a combination's p99 is its single slowest call and mostly noise
+    every, worst_p50 = [], 0.0
+    for location, impact, character in product(locations, impacts, characters):
+        # The first story of a combination loads its region; keep it untimed
+        storyteller.generate_story(
+            location=location, climate_impact=impact, character_focus=character
+        )
+        timings = []
+        for seed in range(samples):
+            start = time.perf_counter_ns()
+            storyteller.generate_story(
+                location=location,
+                climate_impact=impact,
+                character_focus=character,
+                seed=seed,
+            )
+            timings.append((time.perf_counter_ns() - start) / 1000)
+        every.extend(timings)
+        worst_p50 = max(worst_p50, percentile(timings, 0.50))
+
+    return {
+        "generate_story.p50": metric(percentile(every, 0.50), "us"),
+        "generate_story.p99": metric(percentile(every, 0.99), "us"),
+        "generate_story.worst_combination_p50": metric(worst_p50, "us"),
+    }
+
+
+def bench_throughput(storyteller, n: int, repeat: int) -> Dict:
+    """Best-of-`repeat` stories per second for generate_stories."""
+    storyteller.generate_stories(n=min(n, 1000), seed=0)  # warm up
+    best = min(
+        timed(lambda: storyteller.generate_stories(n=n, seed=run))[1]
+        for run in range(repeat)
+    )
+    return {"generate_stories.throughput": metric(n / best, "stories/s", "higher")}
+
+
+def bench_allocations(storyteller, n: int) -> Dict:
+    """Mean bytes and blocks allocated, and peak, per generate_story call."""
+    allocated, blocks, peaks = 0, 0, []
+    gc.collect()
+    tracemalloc.start()
+    for seed in range(n):
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        story = storyteller.generate_story(seed=seed)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        del story
+        peaks.append(peak - base)
+        for stat in after.compare_to(before, "filename"):
+            if stat.size_diff > 0:
+                allocated += stat.size_diff
+                blocks += max(stat.count_diff, 0)
+    tracemalloc.stop()
+    return {
+        "generate_story.allocated": metric(allocated / n, "bytes"),
+        "generate_story.allocated_blocks": metric(blocks / n, "blocks"),
+        "generate_story.peak": metric(statistics.mean(peaks), "bytes"),
+    }
+
+
+def bench_import(module: str, repeat: int) -> Dict:
+    """Median time to import `module` in a fresh interpreter."""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_CHILD.format(module=module)],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(int(output.split()[-1]) / 1e6)
+    return {f"import.{module}": metric(statistics.median(timings), "ms")}
+
+
+def git_revision() -> str:
+    """Return the current commit, or "" outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(args) -> Dict:
+    """Run every benchmark and return the results document."""
+    from climate_storyteller import ClimateStoryteller
+
+    storyteller = ClimateStoryteller()
+    metrics, skipped = {}, []
+
+    print("latency...", file=sys.stderr)
+    metrics.update(bench_latency(storyteller, args.samples))
+    print("throughput...", file=sys.stderr)
+    metrics.update(bench_throughput(storyteller, args.batch, args.repeat))
+    print("allocations...", file=sys.stderr)
+    metrics.update(bench_allocations(storyteller, args.allocations))
+    print("imports...", file=sys.stderr)
+    metrics.update(bench_import("climate_storyteller", args.imports))
+    try:
+        import flask  # noqa: F401
+    except ImportError:
+        skipped.append("import.web_interface (Flask not installed)")
+    else:
+        metrics.update(bench_import("web_interface", args.imports))
+
+    return {
+        "format": FORMAT_VERSION,
+        "revision": git_revision(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "samples": args.samples,
+            "batch": args.batch,
+            "repeat": args.repeat,
+            "allocations": args.allocations,
+            "imports": args.imports,
+        },
+        "skipped": skipped,
+        "metrics": metrics,
+    }
+
+
+def mismatches(baseline: Dict, results: Dict) -> List[str]:
+    """
+    Return why `results` can't be compared with `baseline`: a different
+    results format, or different run parameters (sample counts, batch size).
+    """
+    reasons = []
+    if baseline.get("format") != results.get("format"):
+        reasons.append(f"format {baseline.get('format')} != {results.get('format')}")
+    before, after = baseline.get("parameters", {}), results.get("parameters", {})
+    for name in sorted(before.keys() | after.keys()):
+        if before.get(name) != after.get(name):
+            reasons.append(f"parameter {name}: {before.get(name)} != {after.get(name)}")
+    return reasons
+
+
+def compare(baseline: Dict, results: Dict, threshold: float, overrides: Dict):
+    """
+    Return (report lines, regressed metric names) for `results` against
+    `baseline`. A metric regresses when it is worse than the baseline by more
+    than its threshold, a fraction of the baseline value.
+    """
+    lines, regressed = [], []
+    for name, base in baseline["metrics"].items():
+        current = results["metrics"].get(name)
+        if current is None:
+            lines.append(f"  {name:<42} missing from results")
+            continue
+        change = current["value"] / base["value"] - 1 if base["value"] else 0.0
+        worse = change if base["better"] == "lower" else -change
+        limit = overrides.get(name, threshold)
+        status = "REGRESSED" if worse > limit else "ok"
+        if worse > limit:
+            regressed.append(name)
+        lines.append(
+            f"  {name:<42} {base['value']:>12,.2f} -> {current['value']:>12,.2f} "
+            f"{base['unit']:<10} {change:>+7.1%}  {status}"
+        )
+    for name, current in results["metrics"].items():
+        if name not in baseline["metrics"]:
+            lines.append(
+                f"  {name:<42} {'-':>12} -> {current['value']:>12,.2f} "
+                f"{current['unit']:<10} {'':>7}  new"
+            )
+    return lines, regressed
+
+
+def parse_overrides(values: List[str]) -> Dict[str, float]:
+    """Parse NAME=FRACTION pairs into per-metric thresholds."""
+    overrides = {}
+    for value in values:
+        name, _, fraction = value.partition("=")
+        try:
+            overrides[name] = float(fraction)
+        except ValueError:
+            raise SystemExit(f"Invalid --metric-threshold {value!r}; use NAME=0.25")
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and write JSON")
+    run_parser.add_argument("--output", "-o", help="Results file (default: stdout)")
+    run_parser.add_argument(
+        "--samples", type=int, default=30, help="stories per combination"
+    )
+    run_parser.add_argument("--batch", type=int, default=20000, help="batch size")
+    run_parser.add_argument("--repeat", type=int, default=3, help="batch repeats")
+    run_parser.add_argument(
+        "--allocations", type=int, default=200, help="stories traced for allocations"
+    )
+    run_parser.add_argument(
+        "--imports", type=int, default=7, help="fresh interpreters per import"
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="Fail if results regressed against a baseline"
+    )
+    compare_parser.add_argument("baseline", help="Stored baseline results")
+    compare_parser.add_argument("results", help="New results")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed worsening as a fraction of the baseline (default 0.10)",
+    )
+    compare_parser.add_argument(
+        "--metric-threshold",
+        action="append",
+        default=[],
+        metavar="NAME=FRACTION",
+        help="threshold for one metric; may be repeated",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        document = json.dumps(run(args), indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(document + "\n")
+            print(f"Wrote {args.output}", file=sys.stderr)
+        else:
+            print(document)
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.results, encoding="utf-8") as f:
+        results = json.load(f)
+    reasons = mismatches(baseline, results)
+    if reasons:
+        print(f"{args.baseline} and {args.results} are not comparable:")
+        print("\n".join(f"  {reason}" for reason in reasons))
+        sys.exit(2)
+    lines, regressed = compare(
+        baseline, results, args.threshold, parse_overrides(args.metric_threshold)
+    )
+    print(
+        f"{args.baseline} ({baseline['revision']}) -> "
+        f"{args.results} ({results['revision']})"
+    )
+    print("\n".join(lines))
+    if regressed:
+        print(f"{len(regressed)} metric(s) regressed: {', '.join(regressed)}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
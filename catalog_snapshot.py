@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Compiled, frozen snapshots of the storyteller catalog.
+
+Compiling a catalog validates its three tables (regions, impact descriptions
+and character templates), interns every string, turns lists into tuples and
+precomputes the location list and lookup index. The result is written with
+`marshal`, keyed by a hash of the catalog source, so later processes load one
+file instead of executing regional_data.py and rebuilding the index. Loaded
+tables are served as read-only mappings.
+
+Loading never writes: without a fresh snapshot the catalog is compiled in
+memory. Write the snapshot as a build step (every deploy config runs it) with:
+
+    python catalog_snapshot.py
+
+Snapshots live in __pycache__ next to this file by default; set
+STORY_CATALOG_CACHE to another directory, or to an empty string to disable
+them.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import sys
+from types import MappingProxyType
+from typing import Dict, List, Optional
+
+from data_sources import DataSource, ModuleDataSource, build_location_index
+
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled layout changes
+SNAPSHOT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "__pycache__"
+)
+
+_CHARACTER_FIELDS = ("professions", "ages", "backgrounds", "challenges", "adaptations")
+
+
+def validate_catalog(
+    regions: Dict[str, Dict],
+    impacts: Dict[str, Dict],
+    characters: Dict[str, Dict],
+    aliases: Dict[str, str],
+):
+    """Check the catalog tables, raising ValueError that lists every problem."""
+    problems = []
+
+    def is_text_list(value) -> bool:
+        return isinstance(value, (list, tuple)) and all(
+            isinstance(item, str) for item in value
+        )
+
+    for location, region in regions.items():
+        where = f"region {location!r}"
+        if region is None:
+            problems.append(f"{where}: listed but missing")
+            continue
+        if not isinstance(region.get("region_type"), str):
+            problems.append(f"{where}: region_type must be a string")
+        if not is_text_list(region.get("climate_impacts", [])):
+            problems.append(f"{where}: climate_impacts must be a list of strings")
+        details = region.get("specific_details", {})
+        if not isinstance(details, dict):
+            problems.append(f"{where}: specific_details must be an object")
+        else:
+            for key, value in details.items():
+                if not (isinstance(value, str) or is_text_list(value)):
+                    problems.append(
+                        f"{where}: specific_details[{key!r}] must be a string "
+                        "or a list of strings"
+                    )
+        if not isinstance(region.get("cultural_context", ""), str):
+            problems.append(f"{where}: cultural_context must be a string")
+        if not isinstance(region.get("year", 0), int):
+            problems.append(f"{where}: year must be an integer")
+
+    for impact, descriptions in impacts.items():
+        if not isinstance(descriptions, dict) or not all(
+            isinstance(text, str) for text in descriptions.values()
+        ):
+            problems.append(f"impact {impact!r}: descriptions must be strings")
+
+    for focus, template in characters.items():
+        for field in _CHARACTER_FIELDS:
+            value = template.get(field)
+            if not value or not is_text_list(value):
+                problems.append(
+                    f"character {focus!r}: {field} must be a non-empty list of strings"
+                )
+
+    for alias, location in aliases.items():
+        if location not in regions:
+            problems.append(f"alias {alias!r}: unknown location {location!r}")
+
+    if problems:
+        raise ValueError("Invalid catalog:\n  " + "\n  ".join(problems))
+
+
+def _freeze(value):
+    """Intern strings and turn lists into tuples, recursively."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(key): _freeze(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _read_only(value):
+    """Wrap dicts, recursively, in read-only mapping proxies."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    return value
+
+
+def compile_catalog(source: DataSource) -> Dict:
+    """
+    Read, validate and freeze every table of `source`.
+
+    Returns the snapshot tables: `locations` (tuple of keys in catalog
+    order), `regions`, `aliases`, `location_index`, `impacts` and
+    `characters`, built only from types `marshal` can write.
+    """
+    locations = source.list_locations()
+    regions = {location: source.load_region(location) for location in locations}
+    impacts = source.impact_descriptions()
+    characters = source.character_templates()
+    aliases = source.location_aliases()
+    validate_catalog(regions, impacts, characters, aliases)
+
+    return _freeze(
+        {
+            "locations": locations,
+            "regions": regions,
+            "aliases": aliases,
+            "location_index": build_location_index(locations, aliases),
+            "impacts": impacts,
+            "characters": characters,
+        }
+    )
+
+
+class SnapshotDataSource(DataSource):
+    """A catalog served from compiled snapshot tables."""
+
+    def __init__(self, tables: Dict):
+        self._tables = tables
+        self._impacts = _read_only(tables["impacts"])
+        self._characters = _read_only(tables["characters"])
+
+    def list_locations(self) -> List[str]:
+        return list(self._tables["locations"])
+
+    def load_region(self, location: str) -> Optional[Dict]:
+        region = self._tables["regions"].get(location)
+        return None if region is None else _read_only(region)
+
+    def location_aliases(self) -> Dict[str, str]:
+        return MappingProxyType(self._tables["aliases"])
+
+    def location_index(self) -> Optional[Dict[str, str]]:
+        return MappingProxyType(self._tables["location_index"])
+
+    def impact_descriptions(self) -> Dict[str, Dict]:
+        return self._impacts
+
+    def character_templates(self) -> Dict[str, Dict]:
+        return self._characters
+
+
+def snapshot_key(source: DataSource) -> Optional[str]:
+    """Content hash naming the snapshot of `source`, or None if it has none."""
+    fingerprint = source.fingerprint()
+    if fingerprint is None:
+        return None
+    salt = f"{SNAPSHOT_VERSION}:{marshal.version}:{sys.version_info[:2]}:"
+    return hashlib.sha256((salt + fingerprint).encode()).hexdigest()
+
+
+def _snapshot_file(source: DataSource, cache_dir: Optional[str]):
+    """The key and path of the snapshot of `source`, or None if it has none."""
+    if cache_dir is None:
+        cache_dir = os.environ.get("STORY_CATALOG_CACHE", DEFAULT_CACHE_DIR)
+    key = snapshot_key(source) if cache_dir else None
+    if key is None:
+        return None
+    return key, os.path.join(cache_dir, f"catalog-{key[:16]}.marshal")
+
+
+def load_snapshot(
+    source: Optional[DataSource] = None, cache_dir: Optional[str] = None
+) -> DataSource:
+    """
+    Return `source` (default: the built-in catalog) served from a compiled
+    snapshot.
+
+    A fresh snapshot is loaded as is; a missing or stale one is compiled in
+    memory, and nothing is written (see write_snapshot). When the source
+    cannot be fingerprinted or snapshots are disabled, the source itself is
+    returned.
+    """
+    source = source or ModuleDataSource()
+    snapshot = _snapshot_file(source, cache_dir)
+    if snapshot is None:
+        return source
+
+    key, path = snapshot
+    try:
+        with open(path, "rb") as f:
+            tables = marshal.load(f)
+        if tables.get("key") == key:
+            return SnapshotDataSource(tables)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    logger.info(
+        "No fresh catalog snapshot at %s; compiling in memory "
+        "(run python catalog_snapshot.py to write it)",
+        path,
+    )
+    return SnapshotDataSource(compile_catalog(source))
+
+
+def write_snapshot(
+    source: Optional[DataSource] = None, cache_dir: Optional[str] = None
+) -> Optional[str]:
+    """
+    Compile `source` (default: the built-in catalog) and write its snapshot
+    for load_snapshot. Returns the snapshot's path, or None when the source
+    cannot be fingerprinted or snapshots are disabled; raises OSError when
+    the snapshot cannot be written.
+    """
+    source = source or ModuleDataSource()
+    snapshot = _snapshot_file(source, cache_dir)
+    if snapshot is None:
+        return None
+
+    key, path = snapshot
+    tables = compile_catalog(source)
+    tables["key"] = key
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        marshal.dump(tables, f)
+    os.replace(temporary, path)
+    return path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    path = write_snapshot()
+    if path is None:
+        print("Catalog snapshots are disabled (STORY_CATALOG_CACHE is empty)")
+    else:
+        snapshot = load_snapshot()
+        print(
+            f"Catalog snapshot ready: {len(snapshot.list_locations())} locations "
+            f"in {path}"
+        )
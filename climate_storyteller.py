@@ -5,18 +5,588 @@ This module contains the main ClimateStoryteller class that generates compelling
 realistic stories about how climate change is transforming daily life around the world.
 """
 
+import hashlib
+import inspect
 import json
+import logging
 import random
+import secrets
+import sys
+import time
+from array import array
+from html import escape
+from bisect import bisect_right
+from math import comb, prod
+import string
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import story_templates
+from catalog_snapshot import load_snapshot
+from data_sources import DataSource, build_location_index, normalize_location
+from story_cache import ByteBudgetLRU
+from template_packs import TemplatePack, builtin_pack
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batches fall back to the stdlib RNG
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Fresh seeds fit in 53 bits so they survive a round trip through JSON numbers
+# in JavaScript and stay short enough for permalinks
+SEED_BITS = 53
+
+# Longest story_length every built-in location, impact and persona class can
+# honor within 5%; the shortest of them runs out of passages at 1331 words
+MAX_STORY_LENGTH = 1300
+
+# Persona classes used to key the fragment registry
+_GENERAL = "general"
+_MATERNAL = "maternal"
+
+# Scenes every story includes, in reading order
+_CORE_SECTIONS = (
+    "opening_scene",
+    "before_scene",
+    "transition",
+    "present_challenges",
+    "adaptations",
+    "community_response",
+    "reflection",
+)
+
+# Pipeline stages timed by ClimateStoryteller.enable_instrumentation, as
+# (stage, method). "plan" covers region, character and structure, which covers
+# the title and the scenes; "write" covers passages. "write" times the story
+# sections shared by every output format and by iter_story, not their markup.
+_TIMED_STAGES = (
+    ("plan", "_plan_story"),
+    ("region", "_get_region_data"),
+    ("character", "_create_character"),
+    ("structure", "_generate_story_structure"),
+    ("title", "_select_title"),
+    ("passages", "_select_passages"),
+    ("write", "_iter_story_blocks"),
+)
 
-from regional_data import (
-    CHARACTER_TEMPLATES,
-    CLIMATE_IMPACT_DESCRIPTIONS,
-    REGIONAL_CLIMATE_DATA,
+# Uniform draws per story in generate_stories: location, impact, character,
+# year, before-year offset, name, profession, title, memory, background and up
+# to two pregnancy stages
+_BATCH_DRAWS = 12
+
+# Positional fields of the whole-story renderers used by generate_stories
+_BATCH_FIELDS = (
+    "name",
+    "title",
+    "year",
+    "before_year",
+    "memory",
+    "personal_story",
+    "pregnancy_stage",
+    "second_pregnancy_stage",
 )
 
 
+def _mean_words(texts) -> int:
+    """Average word count of a collection of texts, rounded."""
+    texts = list(texts)
+    return round(sum(len(text.split()) for text in texts) / len(texts))
+
+
+# Typical word counts of per-story slot values. Fragments are sized with these
+# before a story's values are drawn, so passage selection depends only on the
+# location, impact, persona class and target length; any other field counts
+# as one word.
+_SLOT_WORDS = {
+    "title": _mean_words(
+        title
+        for table in (story_templates.TITLES, story_templates.MATERNAL_TITLES)
+        for titles in table.values()
+        for title in titles
+    ),
+    "memory": _mean_words(
+        memory
+        for memories in (
+            *story_templates.BEFORE_MEMORIES.values(),
+            story_templates.DEFAULT_BEFORE_MEMORIES,
+        )
+        for memory in memories
+    ),
+    "personal_story": _mean_words(
+        background
+        for backgrounds in (
+            *story_templates.PERSONAL_BACKGROUNDS.values(),
+            story_templates.DEFAULT_PERSONAL_BACKGROUNDS,
+        )
+        for background in backgrounds
+    ),
+    "pregnancy_stage": _mean_words(story_templates.PREGNANCY_STAGES),
+}
+
+
+def new_seed() -> int:
+    """Draw a fresh story seed from the operating system's entropy source."""
+    return secrets.randbits(SEED_BITS)
+
+
+class Story(str):
+    """
+    A generated story: a plain string that also carries its seed, its word
+    count and the `StoryPlan` it was written from.
+
+    The word count is that of the Markdown form, which `story_length`
+    targets, whichever format the text is in. `source` says what wrote the
+    prose, and `enriched` is, when the storyteller has an enricher, a
+    concurrent.futures.Future of a rewrite of the story (None if the rewrite
+    did not arrive within its deadline).
+    """
+
+    source = "template"
+    enriched = None
+
+    def __new__(
+        cls,
+        text: str = "",
+        seed: Optional[int] = None,
+        plan: Optional["StoryPlan"] = None,
+        word_count: Optional[int] = None,
+    ):
+        story = super().__new__(cls, text)
+        story.seed = seed
+        story.word_count = len(text.split()) if word_count is None else word_count
+        story.plan = plan
+        return story
+
+
+def _check_format(output_format: str):
+    """Reject output formats not in STORY_FORMATS."""
+    if output_format not in STORY_FORMATS:
+        raise ValueError(
+            f"Unknown output format {output_format!r}; "
+            f"choose from {', '.join(STORY_FORMATS)}"
+        )
+
+
+def _markdown_sections(blocks: Iterator[Tuple[str, str]]) -> Iterator[str]:
+    """Format story blocks as Markdown: a heading, then italic setting and footer."""
+    for section, text in blocks:
+        if section == "title":
+            yield story_templates.TITLE_LINE.format(title=text) + "\n\n"
+        elif section == "setting":
+            yield f"*{text}*\n\n"
+        elif section == "footer":
+            yield f"*{text}*"
+        else:
+            yield f"{text}\n\n"
+
+
+def _markdown_text(texts: List[str]) -> str:
+    """
+    Join the texts of every story block as one Markdown document: the output
+    of _markdown_sections, built with a single join for whole stories.
+    """
+    texts[0] = story_templates.TITLE_LINE.format(title=texts[0])
+    texts[1] = f"*{texts[1]}*"
+    texts[-1] = f"*{texts[-1]}*"
+    return "\n\n".join(texts)
+
+
+def _html_sections(blocks: Iterator[Tuple[str, str]]) -> Iterator[str]:
+    """Format story blocks as an HTML fragment, one element per section."""
+    yield '<article class="story">\n'
+    for section, text in blocks:
+        text = escape(text, quote=False)
+        if section == "title":
+            yield f"<h1>{text}</h1>\n"
+        elif section == "setting":
+            yield f'<p class="story-setting"><em>{text}</em></p>\n'
+        elif section == "footer":
+            yield f'<footer><p><em>{text}</em></p></footer>\n'
+        else:
+            yield f'<p data-section="{section}">{text}</p>\n'
+    yield "</article>\n"
+
+
+def _text_sections(blocks: Iterator[Tuple[str, str]]) -> Iterator[str]:
+    """Format story blocks as plain text paragraphs."""
+    for section, text in blocks:
+        yield text if section == "footer" else f"{text}\n\n"
+
+
+def _json_sections(blocks: Iterator[Tuple[str, str]]) -> Iterator[str]:
+    """
+    Format story blocks as a JSON document, {"sections": [{"section": ...,
+    "text": ...}, ...]}, written one section at a time.
+    """
+    yield '{"sections": ['
+    separator = ""
+    for section, text in blocks:
+        block = json.dumps({"section": section, "text": text}, ensure_ascii=False)
+        yield separator + block
+        separator = ", "
+    yield "]}"
+
+
+# Output formats of generate_story and iter_story, with their media types
+STORY_FORMATS = {
+    "markdown": "text/markdown",
+    "html": "text/html",
+    "text": "text/plain",
+    "json": "application/json",
+}
+_FORMATTERS = {
+    "markdown": _markdown_sections,
+    "html": _html_sections,
+    "text": _text_sections,
+    "json": _json_sections,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Character:
+    """The protagonist of a story."""
+
+    name: str
+    age_group: str
+    profession: str
+    background: str
+    location: str
+    challenges: Tuple[str, ...]
+    adaptations: Tuple[str, ...]
+    personal_story: str
+
+    def to_dict(self) -> Dict:
+        """Return the character as a JSON-ready dict."""
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class StoryPlan:
+    """The drawn choices and rendered scenes of one story, before layout."""
+
+    character: Character
+    climate_impact: str
+    persona: str
+    title: str
+    year: int
+    before_year: int
+    opening_scene: str
+    before_scene: str
+    transition: str
+    present_challenges: str
+    adaptations: str
+    community_response: str
+    reflection: str
+
+    def to_dict(self) -> Dict:
+        """Return the plan, including its character, as a JSON-ready dict."""
+        return asdict(self)
+
+
+def _literal(text: str) -> str:
+    """Escape character-independent text so it survives str.format."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _count_words(template: str) -> int:
+    """Estimate the word count of a str.format template once it is filled in."""
+    pieces = []
+    extra = 0
+    for literal, field, _, _ in string.Formatter().parse(template):
+        pieces.append(literal)
+        if field is not None:
+            pieces.append("x")
+            extra += _SLOT_WORDS.get(field, 1) - 1
+    return len("".join(pieces).split()) + extra
+
+
+def _compile_renderer(template: str, fields: Tuple[str, ...]):
+    """
+    Compile a str.format template into a callable taking `fields` positionally.
+
+    The callable evaluates a single f-string, which avoids re-parsing long
+    templates on every call the way str.format does. Placeholders missing from
+    `fields` raise ValueError here rather than at render time.
+    """
+    namespace = {}
+    pieces = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        if literal:
+            constant = f"_c{len(namespace)}"
+            namespace[constant] = literal
+            pieces.append("{%s}" % constant)
+        if field is not None:
+            if field not in fields:
+                raise ValueError(f"Undefined placeholder {{{field}}} in template")
+            pieces.append("{%s}" % field)
+    source = 'lambda %s: f"%s"' % (", ".join(fields), "".join(pieces))
+    return eval(source, namespace)
+
+
+class _Fragment(NamedTuple):
+    """A section template precompiled for one (section, impact, persona) key."""
+
+    template: str
+    needs_pregnancy_stage: bool
+    # Literal pieces between {name} placeholders when name is the only field
+    # (or there are none), so rendering is a single str.join instead of a
+    # str.format parse
+    name_parts: Optional[Tuple[str, ...]]
+    # Estimated rendered word count, see _SLOT_WORDS
+    words: int
+
+    @classmethod
+    def compile(cls, frame: str, **slots: str) -> "_Fragment":
+        """Fold slot texts into a frame template and record the fields it uses."""
+        template = frame
+        for slot, text in slots.items():
+            template = template.replace("{%s}" % slot, text)
+        fields = {
+            field for _, field, _, _ in string.Formatter().parse(template) if field
+        }
+        name_parts = None
+        if fields <= {"name"} and "{{" not in template and "}}" not in template:
+            name_parts = tuple(template.split("{name}"))
+        return cls(
+            template, "pregnancy_stage" in fields, name_parts, _count_words(template)
+        )
+
+
+class _RegionPassages(NamedTuple):
+    """Location-specific passages available to the word budget."""
+
+    setting_words: int
+    cultural: Optional[_Fragment]
+    details: Tuple[_Fragment, ...]
+
+
+class _Region(NamedTuple):
+    """A loaded region: its read-only data view and compiled passages."""
+
+    data: MappingProxyType
+    passages: _RegionPassages
+
+
+class _BatchTemplate(NamedTuple):
+    """A whole-story renderer of `generate_stories`, with what its draws need."""
+
+    # Takes the fields in _BATCH_FIELDS order
+    render: object
+    titles: Tuple[str, ...]
+    # Pregnancy stages drawn before the before-scene memory (0 or 1), and in all
+    stages_before_memory: int
+    stages: int
+    # Words of the story with every field one word long, and how often each
+    # field occurs
+    words: int
+    field_counts: Dict[str, int]
+
+    def word_count(
+        self,
+        extra_words: "_ExtraWords",
+        name: str,
+        title: str,
+        memory: str,
+        personal_story: str,
+        stage: str,
+        second_stage: str,
+    ) -> int:
+        """Words of the rendered story with these field values."""
+        counts = self.field_counts
+        return (
+            self.words
+            + counts["name"] * extra_words[name]
+            + counts["title"] * extra_words[title]
+            + counts["memory"] * extra_words[memory]
+            + counts["personal_story"] * extra_words[personal_story]
+            + counts["pregnancy_stage"] * extra_words[stage]
+            + counts["second_pregnancy_stage"] * extra_words[second_stage]
+        )
+
+
+class _ExtraWords(dict):
+    """Words beyond the first of each field value, counted on first use."""
+
+    def __missing__(self, value: str) -> int:
+        words = self[value] = len(value.split()) - 1
+        return words
+
+
+class _StageCounter:
+    """Call count and wall time of one instrumented pipeline stage."""
+
+    __slots__ = ("calls", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed: int):
+        self.calls += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+
+
+def _timed(method, counter: _StageCounter):
+    """Wrap a bound method so every call is charged to `counter`."""
+    clock = time.perf_counter_ns
+    add = counter.add
+
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            add(clock() - start)
+
+    return timed
+
+
+def _timed_iter(method, counter: _StageCounter):
+    """
+    Wrap a bound generator method so every generator it returns is charged to
+    `counter` as one call, timing only the steps that produce its items.
+    """
+    clock = time.perf_counter_ns
+    add = counter.add
+
+    def timed(*args, **kwargs):
+        items = method(*args, **kwargs)
+        elapsed = 0
+        start = clock()
+        try:
+            for item in items:
+                elapsed += clock() - start
+                yield item
+                start = clock()
+            elapsed += clock() - start
+        finally:
+            items.close()
+            add(elapsed)
+
+    return timed
+
+
+def _random_words(count: int, rng: random.Random):
+    """
+    Draw `count` uniform 32-bit integers in one call, via NumPy when available.
+
+    A word `w` picks index `w * k >> 32` from a k-element sequence, which is
+    uniform to within k / 2**32.
+    """
+    if np is not None:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        return generator.integers(0, 2**32, size=count, dtype=np.uint64).tolist()
+    return array("I", rng.randbytes(4 * count))
+
+
+class _Combinations:
+    """The k-element combinations of a population, in lexicographic order."""
+
+    def __init__(self, population, k: int):
+        self.population = tuple(population)
+        self.k = min(k, len(self.population))
+
+    def __len__(self) -> int:
+        return comb(len(self.population), self.k)
+
+    def __getitem__(self, index: int) -> List:
+        """Unrank one combination with the combinatorial number system."""
+        n = len(self.population)
+        chosen = []
+        start = 0
+        for remaining in range(self.k, 0, -1):
+            for i in range(start, n):
+                count = comb(n - i - 1, remaining - 1)
+                if index < count:
+                    chosen.append(self.population[i])
+                    start = i + 1
+                    break
+                index -= count
+        return chosen
+
+
+class _Replay:
+    """
+    Stand-in for random.Random that returns predetermined values in draw order.
+
+    Lets `story_at` reuse the regular character and scene builders, so a
+    decoded story is exactly what those draws would have produced.
+    """
+
+    def __init__(self, values):
+        self._values = iter(values)
+
+    def choice(self, seq):
+        return next(self._values)
+
+    def randint(self, a: int, b: int) -> int:
+        return next(self._values)
+
+    def sample(self, population, k: int) -> List:
+        return list(next(self._values))
+
+
+class _KeyedPermutation:
+    """
+    A keyed pseudorandom permutation of range(size).
+
+    A balanced Feistel network permutes the smallest even-bit-width domain
+    covering `size`; values that land outside range(size) are walked through
+    the network again until they fall inside (cycle walking). The domain is
+    under four times `size`, so a lookup takes a few walks at most, and it
+    needs no memory beyond the key.
+    """
+
+    ROUNDS = 6
+
+    def __init__(self, size: int, key: int):
+        self.size = size
+        self._half_bits = max(1, (max(size - 1, 1).bit_length() + 1) // 2)
+        self._mask = (1 << self._half_bits) - 1
+        self._key = hashlib.blake2b(repr(key).encode(), digest_size=32).digest()
+
+    def _round(self, value: int, round_index: int) -> int:
+        digest = hashlib.blake2b(
+            value.to_bytes(16, "little"),
+            digest_size=8,
+            key=self._key,
+            person=round_index.to_bytes(16, "little"),
+        ).digest()
+        return int.from_bytes(digest, "little") & self._mask
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._mask
+        for round_index in range(self.ROUNDS):
+            left, right = right, left ^ self._round(right, round_index)
+        return (left << self._half_bits) | right
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(f"permutation index {index} out of range")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+
+class _StoryBlock(NamedTuple):
+    """Stories sharing a location, impact, character focus and profession."""
+
+    location: str
+    climate_impact: str
+    character_focus: str
+    # One sequence per random draw, in the order the builders draw them; a
+    # story in the block is one mixed-radix digit per sequence
+    slots: Tuple
+
+
 class ClimateStoryteller:
     """
     AI storyteller specializing in climate change narratives.
@@ -25,11 +595,44 @@ class ClimateStoryteller:
     transforming daily life around the world, set between present day and 2050.
     """
 
-    def __init__(self):
-        """Initialize the Climate Storyteller with regional data and templates."""
-        self.regional_data = REGIONAL_CLIMATE_DATA
-        self.impact_descriptions = CLIMATE_IMPACT_DESCRIPTIONS
-        self.character_templates = CHARACTER_TEMPLATES
+    def __init__(
+        self,
+        data_source: Optional[DataSource] = None,
+        region_cache_size: int = 1024,
+        templates: Optional[TemplatePack] = None,
+        enricher=None,
+    ):
+        """
+        Initialize the Climate Storyteller with regional data and templates.
+
+        Args:
+            data_source: Catalog to draw from (default: the built-in catalog in
+                regional_data.py); served from a compiled snapshot when the
+                source can be fingerprinted, see catalog_snapshot.py
+            region_cache_size: Maximum number of regions kept loaded at once
+            templates: Story prose to write with (default: story_templates.py);
+                see template_packs.py to load a pack from a file
+            enricher: Rewrites stories in the background, for `story.enriched`:
+                anything with an `enrich(plan, region_data, seed, story_length,
+                output_format)` method returning a Future, such as
+                llm_backend.ModelService. May also be set later.
+        """
+        self.templates = templates or builtin_pack()
+        self.enricher = enricher
+        self.data_source = load_snapshot(data_source)
+        self.impact_descriptions = self.data_source.impact_descriptions()
+        self.character_templates = self.data_source.character_templates()
+        self._impacts = tuple(self.impact_descriptions)
+        self._characters = tuple(self.character_templates)
+        # Impact and character keys by themselves and their normalized forms
+        self._impact_index = {
+            **{normalize_location(key): key for key in self._impacts},
+            **{key: key for key in self._impacts},
+        }
+        self._character_index = {
+            **{normalize_location(key): key for key in self._characters},
+            **{key: key for key in self._characters},
+        }
 
         # Climate science base as of October 2025
         self.climate_facts = {
@@ -40,13 +643,32 @@ class ClimateStoryteller:
             "biodiversity": "accelerating loss and ecosystem disruption",
         }
 
+        # Scene templates keyed by (section, impact, persona class)
+        self._fragments = self._compile_fragments()
+
+        # Canonical location key for every key, normalized form and alias;
+        # the regions themselves load on first use
+        self._locations, self._location_index = self._build_location_index()
+
+        # Loaded regions, least recently used dropped first. Each is charged
+        # one unit, so the budget is a region count.
+        self._regions = ByteBudgetLRU(region_cache_size)
+
+        # (block offsets, blocks) of the story space, built on first use
+        self._story_space = None
+
+        # Per-stage counters while instrumentation is enabled
+        self._stage_counters = None
+
     def generate_story(
         self,
         location: str = None,
         climate_impact: str = None,
         character_focus: str = None,
         story_length: int = 1200,
-    ) -> str:
+        seed: Optional[int] = None,
+        output_format: str = "markdown",
+    ) -> "Story":
         """
         Generate a climate futures story.
 
@@ -54,60 +676,690 @@ class ClimateStoryteller:
             location: Specific location (e.g., "Miami, Florida", "Bangladesh Delta")
             climate_impact: Type of climate impact (e.g., "sea_level_rise", "drought")
             character_focus: Character type focus (e.g., "coastal_community", "urban_worker")
-            story_length: Target word count (default 1200)
+            story_length: Target word count (default 1200). Optional passages
+                are chosen to land within about 5% of it, as far as the
+                available material allows; with the built-in catalog, up to
+                MAX_STORY_LENGTH.
+            seed: Seed for this story's random choices (default: a fresh seed).
+                The same parameters and seed always produce the same text.
+            output_format: "markdown" (default), "html" (an <article>
+                fragment), "text" or "json" (the sections with their names);
+                see STORY_FORMATS. Every format renders the same story.
 
         Returns:
-            Generated story as a string
+            Generated story as a string, with the seed used in `story.seed`,
+            its actual length in `story.word_count` and its character and
+            scenes in `story.plan`. With an enricher, the template story is
+            still returned at once and its rewrite follows in
+            `story.enriched`.
+        """
+        _check_format(output_format)
+        if seed is None:
+            seed = new_seed()
+        plan, region_data = self._plan_story(
+            location, climate_impact, character_focus, seed
+        )
+        story = self._story_from_plan(
+            plan, region_data, seed, story_length, output_format
+        )
+        if self.enricher is not None:
+            story.enriched = self.enricher.enrich(
+                plan, region_data, seed, story_length, output_format
+            )
+        return story
+
+    def _story_from_plan(
+        self,
+        plan: "StoryPlan",
+        region_data: Dict,
+        seed: int,
+        story_length: int,
+        output_format: str,
+    ) -> "Story":
+        """Write the template story of a plan in `output_format`."""
+        if output_format == "markdown":
+            return Story(self._write_story(plan, region_data, story_length), seed, plan)
+
+        blocks = list(self._iter_story_blocks(plan, region_data, story_length))
+        # Count as the Markdown form would, where the title's "#" is a word
+        word_count = 1 + sum(len(text.split()) for _, text in blocks)
+        return Story(
+            "".join(_FORMATTERS[output_format](blocks)), seed, plan, word_count
+        )
+
+    def iter_story(
+        self,
+        location: str = None,
+        climate_impact: str = None,
+        character_focus: str = None,
+        story_length: int = 1200,
+        seed: Optional[int] = None,
+        output_format: str = "markdown",
+    ) -> Iterator[str]:
+        """
+        Generate a climate futures story section by section.
+
+        Takes the same arguments as `generate_story` and yields the title, the
+        setting line and then each paragraph as soon as it is ready, so callers
+        can stream the story to stdout or an HTTP response. Joining the
+        sections gives exactly `generate_story` for the same seed and format.
+        Pick the seed up front (see `new_seed`) to be able to reproduce the
+        story.
+        """
+        _check_format(output_format)
+        plan, region_data = self._plan_story(
+            location, climate_impact, character_focus, seed
+        )
+
+        # Write the complete story
+        yield from self._iter_story_sections(
+            plan, region_data, story_length, output_format
+        )
+
+    def _plan_story(
+        self,
+        location: Optional[str],
+        climate_impact: Optional[str],
+        character_focus: Optional[str],
+        seed: Optional[int],
+        name: Optional[str] = None,
+        profession: Optional[str] = None,
+    ) -> Tuple["StoryPlan", Dict]:
+        """
+        Draw every random choice of a story; returns the plan and region data.
+
+        A given `name` or `profession` is used instead of drawing one.
         """
+        rng = random.Random(new_seed() if seed is None else seed)
+
         # Select random parameters if not specified
         if not location:
-            location = self._select_random_location()
+            location = self._select_random_location(rng)
         if not climate_impact:
-            climate_impact = self._select_random_climate_impact()
+            climate_impact = self._select_random_climate_impact(rng)
         if not character_focus:
-            character_focus = self._select_random_character_focus()
+            character_focus = self._select_random_character_focus(rng)
 
         # Get regional data for the location
         region_data = self._get_region_data(location, climate_impact)
 
         # Create character profile
-        character = self._create_character(character_focus, region_data)
+        character = self._create_character(
+            character_focus, region_data, rng, name, profession
+        )
 
         # Generate story structure
-        story_parts = self._generate_story_structure(
-            character, region_data, climate_impact
+        plan = self._generate_story_structure(
+            character, region_data, climate_impact, rng
         )
+        return plan, region_data
 
-        # Write the complete story
-        story = self._write_story(story_parts, character, region_data, story_length)
+    def generate_stories(
+        self,
+        specs=None,
+        n: Optional[int] = None,
+        seed: Optional[int] = None,
+        story_length: int = 1200,
+        reproducible: bool = False,
+    ) -> List["Story"]:
+        """
+        Generate many climate futures stories in one batch.
 
-        return story
+        All random choices for the batch (locations, impacts, characters,
+        names, years and template picks) are drawn up front as flat arrays,
+        then every story is rendered from a whole-story template compiled once
+        per (location, impact, persona class, target length). The stories
+        follow the same distribution as repeated `generate_story` calls, and
+        their word counts are computed from the template instead of by
+        splitting the text.
+
+        Args:
+            specs: A dict of `generate_story` keyword arguments applied to every
+                story, or a list with one such dict per story. Missing or empty
+                values are drawn at random.
+            n: Number of stories. Required when `specs` is a dict or None;
+                defaults to `len(specs)` for a list.
+            seed: Seed for the whole batch (default: a fresh seed). The same
+                specs and seed always produce the same list of stories.
+            story_length: Target word count for specs without one.
+            reproducible: Give every story a seed of its own, drawn from the
+                batch seed, and write exactly the story `generate_story`
+                writes for its spec and that seed. This replays all of
+                `generate_story`'s draws per story, at about half the
+                batch's speed.
+
+        Returns:
+            List of generated stories, each with its `word_count`, and with
+            `reproducible` its `seed` (their `plan` is None; `generate_story`
+            with the same spec and seed returns the story with its plan)
+        """
+        if specs is None or isinstance(specs, dict):
+            if n is None:
+                raise ValueError("n is required unless specs is a list")
+            specs = [specs or {}] * n
+        elif n is None:
+            n = len(specs)
+        elif n != len(specs):
+            raise ValueError(f"got {len(specs)} specs for a batch of {n} stories")
+
+        # Per character focus: its template, (persona class, profession,
+        # memories) for each profession, and the candidate personal backgrounds
+        focuses = {
+            focus: (
+                template,
+                tuple(
+                    (
+                        _MATERNAL
+                        if profession in self.templates.MATERNAL_PERSONAS
+                        else _GENERAL,
+                        profession,
+                        self.templates.BEFORE_MEMORIES.get(
+                            profession, self.templates.DEFAULT_BEFORE_MEMORIES
+                        ),
+                    )
+                    for profession in template["professions"]
+                ),
+                self.templates.PERSONAL_BACKGROUNDS.get(
+                    focus, self.templates.DEFAULT_PERSONAL_BACKGROUNDS
+                ),
+            )
+            for focus, template in self.character_templates.items()
+        }
+
+        extra_words = _ExtraWords()
+        rng = random.Random(new_seed() if seed is None else seed)
+        if reproducible:
+            return self._replay_stories(specs, rng, story_length, focuses, extra_words)
+
+        # One column of random words per random choice, drawn in a single call
+        words = _random_words(_BATCH_DRAWS * n, rng)
+        columns = [words[i * n : (i + 1) * n] for i in range(_BATCH_DRAWS)]
+        names = self.templates.NAMES
+        stages = self.templates.PREGNANCY_STAGES
+
+        def column(values, draws, key):
+            size = len(values)
+            picks = [values[w * size >> 32] for w in draws]
+            return [spec.get(key) or pick for spec, pick in zip(specs, picks)]
+
+        locations = column(self._locations, columns[0], "location")
+        impacts = column(self._impacts, columns[1], "climate_impact")
+        characters = column(self._characters, columns[2], "character_focus")
+        story_years = [2025 + (w * 26 >> 32) for w in columns[3]]
+        before_offsets = [5 + (w * 11 >> 32) for w in columns[4]]
+        story_names = [names[w * len(names) >> 32] for w in columns[5]]
+        lengths = [spec.get("story_length") or story_length for spec in specs]
+
+        templates = {}
+        stories = []
+        append = stories.append
+        for (
+            location,
+            climate_impact,
+            character_focus,
+            story_year,
+            before_offset,
+            name,
+            target_length,
+            w_profession,
+            w_title,
+            w_memory,
+            w_background,
+            w_stage,
+            w_second_stage,
+        ) in zip(
+            locations,
+            impacts,
+            characters,
+            story_years,
+            before_offsets,
+            story_names,
+            lengths,
+            *columns[6:],
+        ):
+            _, professions, backgrounds = focuses[character_focus]
+            persona, profession, memories = professions[
+                w_profession * len(professions) >> 32
+            ]
+
+            key = (location, climate_impact, persona, target_length)
+            compiled = templates.get(key)
+            if compiled is None:
+                compiled = templates[key] = self._compile_story_template(
+                    location, climate_impact, profession, target_length
+                )
+            titles = compiled.titles
+
+            title = titles[w_title * len(titles) >> 32]
+            memory = memories[w_memory * len(memories) >> 32]
+            personal_story = backgrounds[w_background * len(backgrounds) >> 32]
+            stage = stages[w_stage * len(stages) >> 32]
+            second_stage = stages[w_second_stage * len(stages) >> 32]
+            append(
+                Story(
+                    compiled.render(
+                        name,
+                        title,
+                        story_year,
+                        story_year - before_offset,
+                        memory,
+                        personal_story,
+                        stage,
+                        second_stage,
+                    ),
+                    None,
+                    None,
+                    compiled.word_count(
+                        extra_words,
+                        name,
+                        title,
+                        memory,
+                        personal_story,
+                        stage,
+                        second_stage,
+                    ),
+                )
+            )
+
+        return stories
+
+    def _replay_stories(
+        self,
+        specs: List[Dict],
+        seeds: random.Random,
+        story_length: int,
+        focuses: Dict,
+        extra_words: _ExtraWords,
+    ) -> List["Story"]:
+        """
+        The stories of `generate_stories(reproducible=True)`: each reseeds
+        the RNG from `seeds` and replays the draws of `_plan_story`, in its
+        order, including those whose values never reach the text.
+        """
+        rng = random.Random()
+        choice, randint, sample = rng.choice, rng.randint, rng.sample
+        locations, impacts = self._locations, self._impacts
+        characters = self._characters
+        names = self.templates.NAMES
+        stages = self.templates.PREGNANCY_STAGES
+
+        templates = {}
+        stories = []
+        append = stories.append
+        for spec in specs:
+            story_seed = seeds.getrandbits(SEED_BITS)
+            rng.seed(story_seed)
+
+            location = spec.get("location") or choice(locations)
+            climate_impact = spec.get("climate_impact") or choice(impacts)
+            character_focus = spec.get("character_focus") or choice(characters)
+            template, professions, backgrounds = focuses[character_focus]
+            name = choice(names)
+            choice(template["ages"])
+            persona, profession, memories = choice(professions)
+            choice(template["backgrounds"])
+            sample(template["challenges"], k=min(2, len(template["challenges"])))
+            sample(template["adaptations"], k=min(2, len(template["adaptations"])))
+            personal_story = choice(backgrounds)
+            story_year = randint(2025, 2050)
+            before_year = story_year - randint(5, 15)
+
+            target_length = spec.get("story_length") or story_length
+            key = (location, climate_impact, persona, target_length)
+            compiled = templates.get(key)
+            if compiled is None:
+                compiled = templates[key] = self._compile_story_template(
+                    location, climate_impact, profession, target_length
+                )
+            title = choice(compiled.titles)
+            stage = second_stage = ""
+            if compiled.stages_before_memory:
+                stage = choice(stages)
+            memory = choice(memories)
+            if compiled.stages and not compiled.stages_before_memory:
+                stage = choice(stages)
+            if compiled.stages == 2:
+                second_stage = choice(stages)
+
+            append(
+                Story(
+                    compiled.render(
+                        name,
+                        title,
+                        story_year,
+                        before_year,
+                        memory,
+                        personal_story,
+                        stage,
+                        second_stage,
+                    ),
+                    story_seed,
+                    None,
+                    compiled.word_count(
+                        extra_words,
+                        name,
+                        title,
+                        memory,
+                        personal_story,
+                        stage,
+                        second_stage,
+                    ),
+                )
+            )
+
+        return stories
+
+    def _compile_story_template(
+        self, location: str, climate_impact: str, profession: str, target_length: int
+    ) -> _BatchTemplate:
+        """
+        Compile a whole-story renderer for `generate_stories`.
+
+        The template is produced by `_write_story` itself, fed with the section
+        templates and placeholder values, so batch and single-story output
+        share one layout.
+        """
+        region_data = dict(self._get_region_data(location, climate_impact))
+        region_year = region_data.get("year", 2030)
+        region_data["location"] = _literal(region_data["location"])
+        if "cultural_context" in region_data:
+            region_data["cultural_context"] = _literal(region_data["cultural_context"])
+        # Placeholders stand in for the per-story values
+        character = Character(
+            name="{name}",
+            age_group="",
+            profession=profession,
+            background="",
+            location=region_data["location"],
+            challenges=(),
+            adaptations=(),
+            personal_story="{personal_story}",
+        )
+
+        fragments = self._fragments
+        persona = self._persona_class(character)
+        if ("title", climate_impact, persona) not in fragments:
+            climate_impact = story_templates.DEFAULT_IMPACT
+
+        scenes = {}
+        stage_fields = iter(_BATCH_FIELDS[-2:])
+        stages = stages_before_memory = 0
+        for section in _CORE_SECTIONS:
+            fragment = fragments[(section, climate_impact, persona)]
+            text = fragment.template.replace("{region_year}", str(region_year))
+            if fragment.needs_pregnancy_stage:
+                text = text.replace("{pregnancy_stage}", "{%s}" % next(stage_fields))
+                stages += 1
+                # Only the opening scene's stage is drawn before the memory
+                if section == "opening_scene":
+                    stages_before_memory = 1
+            scenes[section] = text
+        plan = StoryPlan(
+            character=character,
+            climate_impact=climate_impact,
+            persona=persona,
+            title="{title}",
+            year="{year}",
+            before_year="{before_year}",
+            **scenes,
+        )
+
+        template = self._write_story(plan, region_data, target_length)
+        pieces = []
+        field_counts = dict.fromkeys(_BATCH_FIELDS, 0)
+        for literal, field, _, _ in string.Formatter().parse(template):
+            pieces.append(literal)
+            if field is not None:
+                pieces.append("x")
+                field_counts[field] += 1
+        return _BatchTemplate(
+            render=_compile_renderer(template, _BATCH_FIELDS),
+            titles=fragments[("title", climate_impact, persona)],
+            stages_before_memory=stages_before_memory,
+            stages=stages,
+            words=len("".join(pieces).split()),
+            field_counts=field_counts,
+        )
+
+    def count_stories(self) -> int:
+        """
+        Count the distinct stories the engine can produce.
+
+        The space covers every location, impact, character focus, profession,
+        age group, background, challenge and adaptation pair, personal story,
+        name, year, before-year offset, title, memory and pregnancy stage. It
+        is computed arithmetically; no story is built.
+        """
+        offsets, _ = self._get_story_space()
+        return offsets[-1]
 
-    def _select_random_location(self) -> str:
+    def story_at(self, index: int, story_length: int = 1200) -> "Story":
+        """
+        Decode the story at `index` in the story space.
+
+        Indices run from 0 to `count_stories() - 1`, each naming one
+        combination of choices by mixed-radix unranking, so any story can be
+        reached in constant memory without enumerating those before it.
+        """
+        offsets, blocks = self._get_story_space()
+        if not 0 <= index < offsets[-1]:
+            raise IndexError(f"story index {index} out of range")
+        position = bisect_right(offsets, index) - 1
+        block = blocks[position]
+
+        index -= offsets[position]
+        values = []
+        for slot in reversed(block.slots):
+            index, digit = divmod(index, len(slot))
+            values.append(slot[digit])
+        replay = _Replay(reversed(values))
+
+        region_data = self._get_region_data(block.location, block.climate_impact)
+        character = self._create_character(
+            block.character_focus, region_data, replay
+        )
+        plan = self._generate_story_structure(
+            character, region_data, block.climate_impact, replay
+        )
+        return Story(self._write_story(plan, region_data, story_length), None, plan)
+
+    def iter_stories(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        step: int = 1,
+        story_length: int = 1200,
+    ) -> Iterator["Story"]:
+        """
+        Lazily yield the stories in a slice of the story space.
+
+        Takes slice semantics (negative indices count from the end), decodes
+        one story at a time and keeps nothing, so exhaustive or sampled
+        corpus builds can be sharded by index range across processes.
+        """
+        indices = range(*slice(start, stop, step).indices(self.count_stories()))
+        for index in indices:
+            yield self.story_at(index, story_length)
+
+    def unique_stories(
+        self, seed: Optional[int] = None, story_length: int = 1200
+    ) -> "UniqueStorySampler":
+        """
+        Return an iterator of stories that never repeat a (location, impact,
+        character focus, profession, name) combination; see
+        `UniqueStorySampler`.
+        """
+        return UniqueStorySampler(self, seed=seed, story_length=story_length)
+
+    def _get_story_space(self) -> Tuple[List[int], List["_StoryBlock"]]:
+        """Return the story space as cumulative block offsets and blocks."""
+        if self._story_space is None:
+            self._story_space = self._build_story_space()
+        return self._story_space
+
+    def _build_story_space(self) -> Tuple[List[int], List["_StoryBlock"]]:
+        """
+        Split the story space into blocks of uniform mixed radix.
+
+        The sequences each draw picks from depend only on the location,
+        impact, character focus and profession, so within one such block the
+        space is a plain product. `offsets[i]` is the index of the first story
+        in `blocks[i]`; the final entry is the total count.
+        """
+        fragments = self._fragments
+        years = range(2025, 2051)
+        before_offsets = range(5, 16)
+        stages = self.templates.PREGNANCY_STAGES
+
+        offsets = [0]
+        blocks = []
+        for location in self._locations:
+            for climate_impact in self.impact_descriptions:
+                for focus, template in self.character_templates.items():
+                    personal_stories = self.templates.PERSONAL_BACKGROUNDS.get(
+                        focus, self.templates.DEFAULT_PERSONAL_BACKGROUNDS
+                    )
+                    for profession in template["professions"]:
+                        persona = (
+                            _MATERNAL
+                            if profession in self.templates.MATERNAL_PERSONAS
+                            else _GENERAL
+                        )
+                        impact = climate_impact
+                        if ("title", impact, persona) not in fragments:
+                            impact = story_templates.DEFAULT_IMPACT
+
+                        # Same draw order as _create_character and
+                        # _generate_story_structure
+                        slots = [
+                            self.templates.NAMES,
+                            template["ages"],
+                            (profession,),
+                            template["backgrounds"],
+                            _Combinations(template["challenges"], 2),
+                            _Combinations(template["adaptations"], 2),
+                            personal_stories,
+                            years,
+                            before_offsets,
+                            fragments[("title", impact, persona)],
+                        ]
+                        for section in _CORE_SECTIONS:
+                            if section == "before_scene":
+                                slots.append(
+                                    self.templates.BEFORE_MEMORIES.get(
+                                        profession,
+                                        self.templates.DEFAULT_BEFORE_MEMORIES,
+                                    )
+                                )
+                            fragment = fragments[(section, impact, persona)]
+                            if fragment.needs_pregnancy_stage:
+                                slots.append(stages)
+
+                        blocks.append(
+                            _StoryBlock(location, climate_impact, focus, tuple(slots))
+                        )
+                        offsets.append(offsets[-1] + prod(map(len, slots)))
+
+        return offsets, blocks
+
+    def _select_random_location(self, rng: random.Random) -> str:
         """Select a random location from available regional data."""
-        all_locations = []
-        for region_type, locations in self.regional_data.items():
-            all_locations.extend(locations.keys())
-        return random.choice(all_locations)
+        return rng.choice(self._locations)
 
-    def _select_random_climate_impact(self) -> str:
+    def _select_random_climate_impact(self, rng: random.Random) -> str:
         """Select a random climate impact type."""
-        impacts = list(self.impact_descriptions.keys())
-        return random.choice(impacts)
+        return rng.choice(self._impacts)
 
-    def _select_random_character_focus(self) -> str:
+    def _select_random_character_focus(self, rng: random.Random) -> str:
         """Select a random character focus type."""
-        return random.choice(list(self.character_templates.keys()))
+        return rng.choice(self._characters)
+
+    def _build_location_index(self) -> Tuple[Tuple[str, ...], Dict[str, str]]:
+        """
+        Index every location under its canonical key and normalized aliases.
+
+        The index maps each lookup key to the canonical location key only;
+        region data is loaded from the data source when first requested (see
+        `_load_region`), so the index stays small for large catalogs. Sources
+        with a precomputed index (compiled snapshots) skip the build. Build
+        time and size are kept in `self.location_index_stats` and logged.
+        """
+        start = time.perf_counter()
+        locations = tuple(self.data_source.list_locations())
+        index = self.data_source.location_index()
+        if index is None:
+            index = build_location_index(
+                locations, self.data_source.location_aliases()
+            )
+
+        size = sys.getsizeof(index) + sum(map(sys.getsizeof, index))
+        self.location_index_stats = {
+            "locations": len(locations),
+            "keys": len(index),
+            "build_ms": (time.perf_counter() - start) * 1000,
+            "bytes": size,
+        }
+        logger.info(
+            "Location index: %(locations)d locations, %(keys)d keys, "
+            "built in %(build_ms).2f ms, %(bytes)d bytes",
+            self.location_index_stats,
+        )
+        return locations, index
+
+    def _load_region(self, location: str) -> Optional["_Region"]:
+        """
+        Return a canonical location's region, loading it on first use.
+
+        The region's data is a shared read-only view that also carries the
+        canonical `location` key, kept with its compiled passages in the
+        bounded region cache.
+        """
+        region = self._regions.get(location)
+        if region is None:
+            data = self.data_source.load_region(location)
+            if data is None:
+                return None
+            view = MappingProxyType({**data, "location": location})
+            region = _Region(view, self._compile_region_passages(view))
+            self._regions.put(location, region, 1)
+        return region
+
+    def resolve_location(self, location: str) -> Optional[str]:
+        """
+        Return the location key a location is known by: its key, normalized
+        form or an alias, or for human-form input ("Miami, Florida") the
+        whole name or its first part. None for an unknown location.
+        """
+        key = self._location_index.get(location)
+        if key is None:
+            key = self._location_index.get(normalize_location(location))
+            if key is None and "," in location:
+                key = self._location_index.get(
+                    normalize_location(location.split(",", 1)[0])
+                )
+        return key
+
+    def resolve_impact(self, climate_impact: str) -> Optional[str]:
+        """Return the key of a climate impact given in any case or spacing."""
+        key = self._impact_index.get(climate_impact)
+        if key is None:
+            key = self._impact_index.get(normalize_location(climate_impact))
+        return key
+
+    def resolve_character(self, character_focus: str) -> Optional[str]:
+        """Return the key of a character focus given in any case or spacing."""
+        key = self._character_index.get(character_focus)
+        if key is None:
+            key = self._character_index.get(normalize_location(character_focus))
+        return key
 
     def _get_region_data(self, location: str, climate_impact: str) -> Dict:
         """Get regional data for the specified location and climate impact."""
-        # Find the region that contains this location
-        for region_type, locations in self.regional_data.items():
-            if location in locations:
-                region_data = locations[location].copy()
-                region_data["region_type"] = region_type
-                region_data["location"] = location
-                return region_data
+        key = self.resolve_location(location)
+        if key is not None:
+            region = self._load_region(key)
+            if region is not None:
+                return region.data
 
         # Fallback to generic data if location not found
         return {
@@ -118,480 +1370,732 @@ class ClimateStoryteller:
             "cultural_context": "Diverse community adapting to climate change",
         }
 
-    def _create_character(self, character_focus: str, region_data: Dict) -> Dict:
+    def _create_character(
+        self,
+        character_focus: str,
+        region_data: Dict,
+        rng: random.Random,
+        name: Optional[str] = None,
+        profession: Optional[str] = None,
+    ) -> "Character":
         """Create a detailed character profile."""
         template = self.character_templates[character_focus]
 
-        character = {
-            "name": self._generate_name(),
-            "age_group": random.choice(template["ages"]),
-            "profession": random.choice(template["professions"]),
-            "background": random.choice(template["backgrounds"]),
-            "location": region_data["location"],
-            "challenges": random.sample(
-                template["challenges"], k=min(2, len(template["challenges"]))
+        character = Character(
+            name=self._generate_name(rng) if name is None else name,
+            age_group=rng.choice(template["ages"]),
+            profession=(
+                rng.choice(template["professions"])
+                if profession is None
+                else profession
             ),
-            "adaptations": random.sample(
-                template["adaptations"], k=min(2, len(template["adaptations"]))
+            background=rng.choice(template["backgrounds"]),
+            location=region_data["location"],
+            challenges=tuple(
+                rng.sample(
+                    template["challenges"], k=min(2, len(template["challenges"]))
+                )
             ),
-            "personal_story": self._generate_personal_background(
-                character_focus, region_data
+            adaptations=tuple(
+                rng.sample(
+                    template["adaptations"], k=min(2, len(template["adaptations"]))
+                )
             ),
-        }
+            personal_story=self._generate_personal_background(
+                character_focus, region_data, rng
+            ),
+        )
 
         return character
 
-    def _generate_name(self) -> str:
+    def _generate_name(self, rng: random.Random) -> str:
         """Generate a culturally appropriate name."""
-        names = [
-            "Maria",
-            "Ahmed",
-            "Sarah",
-            "Chen",
-            "Fatima",
-            "James",
-            "Priya",
-            "Diego",
-            "Aisha",
-            "Michael",
-            "Yuki",
-            "Carlos",
-            "Nadia",
-            "David",
-            "Lakshmi",
-            "Hassan",
-        ]
-        return random.choice(names)
+        return rng.choice(self.templates.NAMES)
 
     def _generate_personal_background(
-        self, character_focus: str, region_data: Dict
+        self, character_focus: str, region_data: Dict, rng: random.Random
     ) -> str:
         """Generate a personal background for the character."""
-        backgrounds = {
-            "coastal_community": [
-                "grew up by the water, learned to fish from grandparents",
-                "moved here for work, fell in love with the ocean",
-                "family has lived here for generations, watching the tides change",
-            ],
-            "urban_worker": [
-                "came to the city for opportunities, now navigating new challenges",
-                "born and raised in the neighborhood, seeing it transform",
-                "moved here recently, learning to adapt to urban climate impacts",
-            ],
-            "rural_farmer": [
-                "inherited the family farm, learning new ways to work the land",
-                "started farming after a career change, embracing sustainable practices",
-                "grew up in the countryside, now teaching others about adaptation",
-            ],
-            "pregnant_woman": [
-                "discovered she was pregnant just as the climate impacts became more severe",
-                "had her first child during a drought, now expecting her second during floods",
-                "moved to the city for better healthcare, but climate change is making access difficult",
-            ],
-            "new_mother": [
-                "gave birth during the worst heatwave in years, now caring for her newborn",
-                "had her baby during flooding season, learning to navigate motherhood in crisis",
-                "became a mother in a time of climate uncertainty, adapting daily to new challenges",
-            ],
-            "healthcare_worker": [
-                "trained as a community health worker to serve her community during climate crises",
-                "became a midwife to help women give birth safely despite climate challenges",
-                "works as a nurse, seeing firsthand how climate change affects maternal health",
-            ],
-        }
-
-        return random.choice(
-            backgrounds.get(character_focus, ["adapting to changing times"])
+        return rng.choice(
+            self.templates.PERSONAL_BACKGROUNDS.get(
+                character_focus, self.templates.DEFAULT_PERSONAL_BACKGROUNDS
+            )
         )
 
-    def _get_pregnancy_stage(self, character: Dict) -> str:
+    def _get_pregnancy_stage(
+        self, character: "Character", rng: random.Random
+    ) -> str:
         """Get pregnancy stage description for maternal health stories."""
-        stages = [
-            "in her first trimester",
-            "in her second trimester",
-            "in her third trimester",
-            "expecting her first child",
-            "carrying her second child",
-            "pregnant with twins",
+        return rng.choice(self.templates.PREGNANCY_STAGES)
+
+    def _compile_fragments(self) -> Dict[Tuple[str, str, str], object]:
+        """
+        Compile the fragment registry used by the scene builders.
+
+        Maps (section, climate impact, persona class) to either a `_Fragment`
+        template or, for titles, the tuple of candidate titles. Character-
+        independent passages (early signs, community responses, hopeful
+        endings, sensory details, daily changes) are folded in here, so a story
+        only pays for one lookup and one substitution per section.
+
+        The optional passages used to honor `story_length` are registered the
+        same way, as are "expansions", "adaptation_expansions" and
+        "general_passages" (tuples of fragments) and "core_words", the
+        estimated word count of the sections every story includes apart from
+        the setting line.
+        """
+        templates = self.templates
+        impacts = {story_templates.DEFAULT_IMPACT, *self.impact_descriptions}
+        for table in (
+            templates.TITLES,
+            templates.OPENING_SCENES,
+            templates.CHALLENGES,
+            templates.ADAPTATION_DESCRIPTIONS,
+            templates.EARLY_SIGNS,
+            templates.COMMUNITY_RESPONSES,
+            templates.HOPEFUL_ENDINGS,
+        ):
+            impacts.update(table)
+
+        def pick(table: Dict, impact: str, maternal_table: Dict, persona: str):
+            if persona == _MATERNAL and impact in maternal_table:
+                return maternal_table[impact]
+            return table.get(impact, table[story_templates.DEFAULT_IMPACT])
+
+        personal_passage = _Fragment.compile(templates.PERSONAL_PASSAGE)
+        science_passage = _Fragment.compile(
+            templates.SCIENCE_PASSAGE,
+            **{
+                fact: _literal(self.climate_facts[fact])
+                for fact in ("global_temperature", "extreme_weather", "sea_level_rise")
+            },
+        )
+        general_passages = tuple(
+            map(_Fragment.compile, templates.GENERAL_PASSAGES)
+        )
+        layout_words = _count_words(story_templates.TITLE_LINE) + _count_words(
+            story_templates.FOOTER
+        )
+
+        registry = {}
+        for impact in impacts:
+            descriptions = self.impact_descriptions.get(impact, {})
+            for persona in (_GENERAL, _MATERNAL):
+                sections = {
+                    "title": pick(
+                        templates.TITLES,
+                        impact,
+                        templates.MATERNAL_TITLES,
+                        persona,
+                    ),
+                    "opening_scene": _Fragment.compile(
+                        pick(
+                            templates.OPENING_SCENES,
+                            impact,
+                            templates.MATERNAL_OPENING_SCENES,
+                            persona,
+                        )
+                    ),
+                    "before_scene": _Fragment.compile(templates.BEFORE_SCENE),
+                    "transition": _Fragment.compile(
+                        templates.TRANSITION,
+                        early_signs=_literal(
+                            pick(templates.EARLY_SIGNS, impact, {}, persona)
+                        ),
+                    ),
+                    "present_challenges": _Fragment.compile(
+                        templates.PRESENT_CHALLENGES,
+                        challenge=pick(
+                            templates.CHALLENGES,
+                            impact,
+                            templates.MATERNAL_CHALLENGES,
+                            persona,
+                        ),
+                    ),
+                    "adaptations": _Fragment.compile(
+                        templates.ADAPTATIONS,
+                        adaptation=pick(
+                            templates.ADAPTATION_DESCRIPTIONS,
+                            impact,
+                            templates.MATERNAL_ADAPTATION_DESCRIPTIONS,
+                            persona,
+                        ),
+                    ),
+                    "community_response": _Fragment.compile(
+                        templates.COMMUNITY_RESPONSE,
+                        response=_literal(
+                            pick(templates.COMMUNITY_RESPONSES, impact, {}, persona)
+                        ),
+                    ),
+                    "reflection": _Fragment.compile(
+                        templates.REFLECTION,
+                        ending=_literal(
+                            pick(templates.HOPEFUL_ENDINGS, impact, {}, persona)
+                        ),
+                    ),
+                    "sensory_details": _Fragment.compile(
+                        templates.SENSORY_PASSAGE,
+                        sensory_details=_literal(
+                            descriptions.get(
+                                "sensory_details",
+                                templates.DEFAULT_SENSORY_DETAILS,
+                            )
+                        ),
+                    ),
+                    "daily_changes": _Fragment.compile(
+                        templates.DAILY_CHANGES_PASSAGE,
+                        daily_changes=_literal(
+                            descriptions.get(
+                                "daily_changes", templates.DEFAULT_DAILY_CHANGES
+                            )
+                        ),
+                    ),
+                    "emotional_impact": (
+                        _Fragment.compile(
+                            templates.EMOTIONAL_PASSAGE,
+                            emotional_impact=_literal(descriptions["emotional_impact"]),
+                        )
+                        if "emotional_impact" in descriptions
+                        else None
+                    ),
+                    "personal_story": personal_passage,
+                    "climate_science": science_passage,
+                    "expansions": tuple(
+                        map(
+                            _Fragment.compile,
+                            pick(templates.SCENE_EXPANSIONS, impact, {}, persona),
+                        )
+                    ),
+                    "adaptation_expansions": tuple(
+                        map(
+                            _Fragment.compile,
+                            pick(
+                                templates.ADAPTATION_EXPANSIONS,
+                                impact,
+                                {},
+                                persona,
+                            ),
+                        )
+                    ),
+                    "general_passages": general_passages,
+                }
+                sections["core_words"] = layout_words + sum(
+                    sections[section].words for section in _CORE_SECTIONS
+                )
+                for section, fragment in sections.items():
+                    registry[(section, impact, persona)] = fragment
+
+        return registry
+
+    def _compile_region_passages(self, region_data: Dict) -> "_RegionPassages":
+        """Compile the cultural passage and regional detail sentences of a location."""
+        location = _literal(region_data["location"])
+        cultural = None
+        if "cultural_context" in region_data:
+            cultural = _Fragment.compile(
+                self.templates.CULTURAL_PASSAGE,
+                location=location,
+                cultural_context=_literal(region_data["cultural_context"]),
+            )
+
+        details = []
+        for key, value in region_data.get("specific_details", {}).items():
+            sentence = self.templates.REGIONAL_DETAIL_SENTENCES.get(key)
+            if sentence is None:
+                continue
+            if isinstance(value, str):
+                value = value[:1].lower() + value[1:]
+                items = value
+            else:
+                words = [item.replace("_", " ") for item in value]
+                items = value = ", ".join(words[:-1]) + " and " + words[-1]
+            details.append(
+                _Fragment.compile(
+                    sentence,
+                    location=location,
+                    value=_literal(value),
+                    items=_literal(items),
+                )
+            )
+
+        return _RegionPassages(
+            _count_words(story_templates.SETTING_LINE.replace("{location}", location)),
+            cultural,
+            tuple(details),
+        )
+
+    def _select_passages(
+        self, plan: "StoryPlan", region_data: Dict, target_length: int
+    ) -> Dict[str, List["_Fragment"]]:
+        """
+        Choose the optional passages that bring a story closest to its target.
+
+        One greedy pass over the candidates in priority order (closing
+        paragraphs, scene and adaptation expansions, the emotional passage,
+        general passages and finally the short regional detail sentences)
+        keeps each passage that still fits the remaining word budget. The
+        late candidates are the smallest, so the total lands within a sentence
+        of the target whenever there is enough material. Returns the chosen
+        fragments per slot, in reading order.
+        """
+        fragments = self._fragments
+        key = (plan.climate_impact, plan.persona)
+        location = region_data["location"]
+        loaded = None
+        if self._location_index.get(location) == location:
+            loaded = self._load_region(location)
+        if loaded is not None:
+            region = loaded.passages
+        else:
+            region = self._compile_region_passages(region_data)
+
+        budget = (
+            target_length - fragments[("core_words", *key)] - region.setting_words
+        )
+        chosen = {
+            "expansions": [],
+            "adaptations": [],
+            "reflections": [],
+            "closing": [],
+            "regional": [],
+            "science": [],
+        }
+        candidates = [
+            ("closing", fragments[("sensory_details", *key)]),
+            ("closing", fragments[("daily_changes", *key)]),
+            ("closing", fragments[("personal_story", *key)]),
+            ("closing", region.cultural),
+            ("science", fragments[("climate_science", *key)]),
         ]
-        return random.choice(stages)
+        candidates.extend(
+            ("expansions", fragment) for fragment in fragments[("expansions", *key)]
+        )
+        candidates.extend(
+            ("adaptations", fragment)
+            for fragment in fragments[("adaptation_expansions", *key)]
+        )
+        candidates.append(("reflections", fragments[("emotional_impact", *key)]))
+        candidates.extend(
+            ("reflections", fragment)
+            for fragment in fragments[("general_passages", *key)]
+        )
+        candidates.extend(("regional", fragment) for fragment in region.details)
+
+        for slot, fragment in candidates:
+            if fragment is not None and fragment.words <= budget:
+                chosen[slot].append(fragment)
+                budget -= fragment.words
+        return chosen
+
+    def _persona_class(self, character: "Character") -> str:
+        """Classify a character for the maternal-health scene variants."""
+        if character.profession in self.templates.MATERNAL_PERSONAS:
+            return _MATERNAL
+        return _GENERAL
+
+    def _render(
+        self,
+        fragment: "_Fragment",
+        character: "Character",
+        rng: random.Random,
+        **fields,
+    ) -> str:
+        """Substitute per-story values into one compiled section template."""
+        if fragment.name_parts is not None:
+            return character.name.join(fragment.name_parts)
+        if fragment.needs_pregnancy_stage:
+            fields["pregnancy_stage"] = self._get_pregnancy_stage(character, rng)
+        return fragment.template.format(name=character.name, **fields)
+
+    def _render_passage(self, fragment: "_Fragment", character: "Character") -> str:
+        """Substitute a character's name and background into an optional passage."""
+        if fragment.name_parts is not None:
+            return character.name.join(fragment.name_parts)
+        return fragment.template.format(
+            name=character.name, personal_story=character.personal_story
+        )
 
     def _generate_story_structure(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> Dict:
+        self,
+        character: "Character",
+        region_data: Dict,
+        climate_impact: str,
+        rng: random.Random,
+    ) -> "StoryPlan":
         """Generate the structure and key elements of the story."""
+        fragments = self._fragments
+        persona = self._persona_class(character)
+        if ("title", climate_impact, persona) not in fragments:
+            climate_impact = story_templates.DEFAULT_IMPACT
+
         # Set story timeframe (present to 2050)
-        story_year = random.randint(2025, 2050)
+        story_year = rng.randint(2025, 2050)
 
         # Create before/after comparison
-        before_year = story_year - random.randint(5, 15)
-
-        story_structure = {
-            "title": self._generate_title(character, region_data, climate_impact),
-            "year": story_year,
-            "before_year": before_year,
-            "opening_scene": self._create_opening_scene(
-                character, region_data, climate_impact
-            ),
-            "before_scene": self._create_before_scene(
-                character, region_data, before_year
-            ),
-            "transition": self._create_transition(
-                character, region_data, climate_impact
+        before_year = story_year - rng.randint(5, 15)
+
+        title = self._select_title(climate_impact, persona, rng)
+        opening_scene = self._render(
+            fragments[("opening_scene", climate_impact, persona)], character, rng
+        )
+        before_scene = self._render(
+            fragments[("before_scene", climate_impact, persona)],
+            character,
+            rng,
+            before_year=before_year,
+            memory=self._get_before_memory(character, region_data, rng),
+        )
+
+        story_structure = StoryPlan(
+            character=character,
+            climate_impact=climate_impact,
+            persona=persona,
+            title=title,
+            year=story_year,
+            before_year=before_year,
+            opening_scene=opening_scene,
+            before_scene=before_scene,
+            transition=self._render(
+                fragments[("transition", climate_impact, persona)], character, rng
             ),
-            "present_challenges": self._create_present_challenges(
-                character, region_data, climate_impact
+            present_challenges=self._render(
+                fragments[("present_challenges", climate_impact, persona)],
+                character,
+                rng,
+                region_year=region_data.get("year", 2030),
             ),
-            "adaptations": self._create_adaptations(
-                character, region_data, climate_impact
+            adaptations=self._render(
+                fragments[("adaptations", climate_impact, persona)], character, rng
             ),
-            "community_response": self._create_community_response(
-                character, region_data, climate_impact
+            community_response=self._render(
+                fragments[("community_response", climate_impact, persona)],
+                character,
+                rng,
             ),
-            "reflection": self._create_reflection(
-                character, region_data, climate_impact
+            reflection=self._render(
+                fragments[("reflection", climate_impact, persona)], character, rng
             ),
-            "sensory_details": self._get_sensory_details(climate_impact),
-            "daily_changes": self._get_daily_changes(climate_impact),
-        }
+        )
 
         return story_structure
 
-    def _generate_title(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Generate a compelling story title."""
-        titles = {
-            "sea_level_rise": [
-                "The New Shoreline",
-                "When the Water Came",
-                "Rising Tides, Rising Hope",
-                "The Last Beach House",
-            ],
-            "drought": [
-                "The Thirsty Season",
-                "When the Rains Stopped",
-                "Learning to Live with Less",
-                "The Water Keepers",
-            ],
-            "extreme_heat": [
-                "The Long Summer",
-                "When the Air Burned",
-                "Finding Shade",
-                "The Cool Places",
-            ],
-            "wildfire": [
-                "The Orange Sky",
-                "When the Mountains Burned",
-                "Learning to Live with Fire",
-                "The Fire Keepers",
-            ],
-            "flooding_events": [
-                "When the Roads Disappeared",
-                "The Water Between Us",
-                "Flooded Paths, Open Hearts",
-                "Rising Waters, Rising Hope",
-            ],
-            "vector_borne_diseases": [
-                "The Buzz of Danger",
-                "When Mosquitoes Multiply",
-                "Protecting Two Lives",
-                "The Invisible Threat",
-            ],
-        }
-
-        # Special titles for maternal health stories
-        if character.get("profession") in ["pregnant_woman", "new_mother"]:
-            maternal_titles = {
-                "flooding_events": [
-                    "The Road to the Clinic",
-                    "When Water Blocks the Way",
-                    "Flooded Paths, Mother's Heart",
-                    "The Journey Through Water",
-                ],
-                "extreme_heat": [
-                    "The Heat of New Life",
-                    "When the Sun Burns Too Bright",
-                    "Cooling the Fire Within",
-                    "The Longest Summer",
-                ],
-                "vector_borne_diseases": [
-                    "The Buzz of Fear",
-                    "Protecting Two Hearts",
-                    "When Mosquitoes Threaten Life",
-                    "The Invisible Enemy",
-                ],
-            }
-            if climate_impact in maternal_titles:
-                return random.choice(maternal_titles[climate_impact])
-
-        return random.choice(titles.get(climate_impact, ["Adapting to Change"]))
-
-    def _create_opening_scene(
-        self, character: Dict, region_data: Dict, climate_impact: str
+    def _select_title(
+        self, climate_impact: str, persona: str, rng: random.Random
     ) -> str:
-        """Create the opening scene of the story."""
-        opening_templates = {
-            "sea_level_rise": f"I never thought I'd need a boat to get to my own front door. But here I am, {character['name']}, paddling through what used to be my neighborhood street, past the old oak tree that now stands knee-deep in brackish water.",
-            "drought": f"The sound of water is different now. {character['name']} remembers when the river used to rush past their window, but today it's just a trickle, and the silence is deafening.",
-            "extreme_heat": f"At 6 AM, the air already feels like a warm blanket. {character['name']} steps outside and immediately feels the weight of the day ahead, knowing that by noon, the streets will be empty and the city will retreat indoors.",
-            "wildfire": f"The sky is orange again today. {character['name']} has learned to read the color of the horizon like a weather forecast, and this particular shade means another day of staying inside, windows closed against the smoke.",
-            "flooding_events": f"The rain started three days ago, and now {character['name']} watches the water rise around their home, knowing that today's antenatal appointment might be impossible to reach.",
-            "vector_borne_diseases": f"The mosquitoes are worse this year, and {character['name']} feels their constant buzz as a threat to the life growing inside her, knowing that malaria during pregnancy can be devastating.",
-        }
+        """Select a story title for a climate impact and persona class."""
+        return rng.choice(self._fragments[("title", climate_impact, persona)])
 
-        # Special opening for maternal health scenarios
-        if character.get("profession") in [
-            "pregnant_woman",
-            "new_mother",
-        ] and climate_impact in [
-            "flooding_events",
-            "extreme_heat",
-            "vector_borne_diseases",
-        ]:
-            if climate_impact == "flooding_events":
-                return f"The water has cut off the road to the clinic again. {character['name']}, {self._get_pregnancy_stage(character)}, feels her baby kick as she watches the floodwaters rise, wondering how she'll make it to her antenatal appointment."
-            elif climate_impact == "extreme_heat":
-                return f"The heat is unbearable today, and {character['name']} feels her body struggling under the weight of both pregnancy and the scorching sun, knowing that heat stress can be dangerous for her unborn child."
-            elif climate_impact == "vector_borne_diseases":
-                return f"The mosquitoes are relentless this season, and {character['name']} feels their constant presence as a threat to her pregnancy, knowing that malaria can cause complications for both her and her baby."
-
-        return opening_templates.get(
-            climate_impact, f"{character['name']} wakes up to another day of change."
-        )
-
-    def _create_before_scene(
-        self, character: Dict, region_data: Dict, before_year: int
+    def _get_before_memory(
+        self, character: "Character", region_data: Dict, rng: random.Random
     ) -> str:
-        """Create a scene showing life before climate impacts became severe."""
-        return f"Back in {before_year}, things were different. {character['name']} remembers when {self._get_before_memory(character, region_data)}. The rhythm of daily life was predictable, comfortable, taken for granted."
-
-    def _get_before_memory(self, character: Dict, region_data: Dict) -> str:
         """Generate a specific memory from before climate impacts."""
-        memories = {
-            "coastal_community": [
-                "the morning jog along the beach was a daily ritual",
-                "the sound of waves was the soundtrack to every evening",
-                "fishing trips were about adventure, not necessity",
-                "the community gathered on the pier every sunset",
-            ],
-            "urban_worker": [
-                "the subway was crowded but reliable",
-                "summer meant outdoor festivals and street fairs",
-                "the city's energy was infectious and constant",
-                "weekend walks through the park were restorative",
-            ],
-            "rural_farmer": [
-                "the seasons followed a predictable pattern",
-                "the sound of rain on the roof was music",
-                "the harvest was a time of celebration and abundance",
-                "the land provided everything the community needed",
-            ],
-        }
-
-        return random.choice(
-            memories.get(
-                character.get("profession", "coastal_community"), ["life was simpler"]
+        return rng.choice(
+            self.templates.BEFORE_MEMORIES.get(
+                character.profession,
+                self.templates.DEFAULT_BEFORE_MEMORIES,
             )
         )
 
-    def _create_transition(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Create the transition showing how things began to change."""
-        return f"But change came gradually, then suddenly. {character['name']} noticed the small things first - {self._get_early_signs(climate_impact)}. Then the big changes started happening faster than anyone expected."
-
-    def _get_early_signs(self, climate_impact: str) -> str:
-        """Get early signs of climate impact."""
-        signs = {
-            "sea_level_rise": "the high tides reaching further up the beach, the storm drains backing up more often",
-            "drought": "the wells running dry earlier each year, the crops needing more water than before",
-            "extreme_heat": "the summer days getting longer and hotter, the nights offering less relief",
-            "wildfire": "the fire season starting earlier each year, the smoke becoming a regular visitor",
-        }
-        return signs.get(climate_impact, "the small changes that added up")
-
-    def _create_present_challenges(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Create a scene showing current challenges."""
-        return f"Now, in {region_data.get('year', 2030)}, {character['name']} faces new realities every day. {self._get_present_challenge_description(character, region_data, climate_impact)}"
-
-    def _get_present_challenge_description(
-        self, character: Dict, region_data: Dict, climate_impact: str
+    def _write_story(
+        self,
+        plan: "StoryPlan",
+        region_data: Dict,
+        target_length: int,
+        output_format: str = "markdown",
     ) -> str:
-        """Get description of present challenges."""
-        challenges = {
-            "sea_level_rise": f"The water has claimed {character['name']}'s favorite walking path, and the insurance company won't cover the flood damage anymore. Every storm brings new anxiety about what might be lost next.",
-            "drought": f"{character['name']} has learned to measure water in drops, not gallons. The garden that once fed the family now struggles to survive, and the community well runs dry by mid-summer.",
-            "extreme_heat": f"The heat has reshaped {character['name']}'s entire day. Work starts at dawn and ends by noon, and the afternoons are spent in whatever cool place can be found.",
-            "wildfire": f"Every summer, {character['name']} keeps a bag packed by the door. The evacuation orders come with little warning, and the smoke makes it hard to breathe even when the flames are miles away.",
-            "flooding_events": f"The roads to the clinic are impassable again, and {character['name']} worries about missing critical antenatal appointments. The floodwaters have cut off access to healthcare when it's needed most.",
-            "vector_borne_diseases": f"The mosquitoes are relentless this season, and {character['name']} feels their constant presence as a threat to her pregnancy, knowing that malaria can cause complications for both her and her baby.",
-        }
-
-        # Special challenges for maternal health scenarios
-        if character.get("profession") in ["pregnant_woman", "new_mother"]:
-            maternal_challenges = {
-                "flooding_events": f"The floodwaters have cut off the road to the clinic, and {character['name']}, {self._get_pregnancy_stage(character)}, worries about missing her antenatal appointment. She can feel her baby kick as she watches the water rise, wondering how she'll get the care she needs.",
-                "extreme_heat": f"The heat is unbearable, and {character['name']} feels her body struggling under the weight of both pregnancy and the scorching sun. She knows heat stress can be dangerous for her unborn child, but she must continue working to support her family.",
-                "vector_borne_diseases": f"The mosquitoes are worse this year, and {character['name']} feels their constant buzz as a threat to the life growing inside her. She knows malaria during pregnancy can cause premature birth, low birth weight, or even death for her baby.",
-            }
-            if climate_impact in maternal_challenges:
-                return maternal_challenges[climate_impact]
-
-        return challenges.get(
-            climate_impact, f"{character['name']} faces new challenges every day."
+        """Write the complete story from the story plan."""
+        if output_format == "markdown":
+            blocks = self._iter_story_blocks(plan, region_data, target_length)
+            return _markdown_text([text for _, text in blocks])
+        return "".join(
+            self._iter_story_sections(plan, region_data, target_length, output_format)
         )
 
-    def _create_adaptations(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Create a scene showing how the character has adapted."""
-        return f"But {character['name']} has learned to adapt. {self._get_adaptation_description(character, region_data, climate_impact)}"
-
-    def _get_adaptation_description(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Get description of adaptations."""
-        adaptations = {
-            "sea_level_rise": f"The house now sits on stilts, and {character['name']} has learned to navigate the neighborhood by boat. The community has built floating gardens and installed pumps that run on solar power.",
-            "drought": f"{character['name']} has become a master of water conservation, collecting every drop of rainwater and growing drought-resistant crops. The community shares resources and knowledge about sustainable farming.",
-            "extreme_heat": f"The home has been retrofitted with better insulation and cooling systems that run on renewable energy. {character['name']} has learned to work with the heat, not against it.",
-            "wildfire": f"The property has been cleared of flammable materials, and {character['name']} has learned to read the wind and weather patterns. The community has established early warning systems and evacuation plans.",
-            "flooding_events": f"The community has established emergency transport systems and mobile clinics that can reach flooded areas. {character['name']} has learned to identify safe routes and alternative healthcare options when the main roads are impassable.",
-            "vector_borne_diseases": f"The community has implemented comprehensive mosquito control measures and distributed insecticide-treated nets. {character['name']} has learned to protect herself and her family through proper net usage and environmental management.",
-        }
-
-        # Special adaptations for maternal health scenarios
-        if character.get("profession") in ["pregnant_woman", "new_mother"]:
-            maternal_adaptations = {
-                "flooding_events": f"The community has established emergency transport systems and mobile clinics that can reach flooded areas. {character['name']} has learned to identify safe routes and alternative healthcare options when the main roads are impassable. Community health workers now make home visits during floods to ensure pregnant women receive the care they need.",
-                "extreme_heat": f"The community has set up cooling centers and shade structures where pregnant women can rest during the hottest parts of the day. {character['name']} has learned to adjust her work schedule and stay hydrated, while community health workers provide regular check-ups to monitor her and her baby's health.",
-                "vector_borne_diseases": f"The community has implemented comprehensive mosquito control measures and distributed insecticide-treated nets. {character['name']} has learned to protect herself and her unborn child through proper net usage, environmental management, and regular malaria prevention medication. Community health workers provide education and support to ensure safe pregnancies.",
-            }
-            if climate_impact in maternal_adaptations:
-                return maternal_adaptations[climate_impact]
-
-        return adaptations.get(
-            climate_impact, f"{character['name']} has found new ways to thrive."
+    def _iter_story_sections(
+        self,
+        plan: "StoryPlan",
+        region_data: Dict,
+        target_length: int,
+        output_format: str = "markdown",
+    ) -> Iterator[str]:
+        """Yield the complete story section by section, formatted, in reading order."""
+        return _FORMATTERS[output_format](
+            self._iter_story_blocks(plan, region_data, target_length)
         )
 
-    def _create_community_response(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Create a scene showing community response and solidarity."""
-        return f"The community has come together in ways {character['name']} never expected. {self._get_community_response_description(character, region_data, climate_impact)}"
+    def _iter_story_blocks(
+        self, plan: "StoryPlan", region_data: Dict, target_length: int
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yield the story as (section, plain text) pairs, in reading order.
 
-    def _get_community_response_description(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Get description of community response."""
-        responses = {
-            "sea_level_rise": "Neighbors help each other with flood preparations, share boats for transportation, and work together to maintain the community's resilience.",
-            "drought": "The community has established water-sharing agreements, created community gardens, and organized workshops on sustainable living.",
-            "extreme_heat": "Cooling centers have been set up in community buildings, and neighbors check on each other during heat waves, especially the elderly and vulnerable.",
-            "wildfire": "The community has formed fire watch groups, established evacuation protocols, and created support networks for those who have lost homes.",
-        }
-        return responses.get(
-            climate_impact, "The community has found strength in working together."
+        Sections are "title", "setting", the core scenes (see _CORE_SECTIONS),
+        the optional passages ("scene_expansion", "adaptation_expansion",
+        "reflection_passage", "closing_passage", "regional_details",
+        "climate_science") and "footer". The formatters add the markup.
+        """
+        passages = self._select_passages(plan, region_data, target_length)
+        render = self._render_passage
+        character = plan.character
+
+        yield "title", plan.title
+        yield "setting", story_templates.SETTING_TEXT.format(
+            location=region_data["location"], year=plan.year
         )
 
-    def _create_reflection(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Create a reflective ending to the story."""
-        return f"As {character['name']} looks out at the changed landscape, there's a mix of loss and hope. The world is different now, but the human spirit of adaptation and community resilience shines through. {self._get_hopeful_ending(character, region_data, climate_impact)}"
+        yield "opening_scene", plan.opening_scene
+        yield "before_scene", plan.before_scene
+        yield "transition", plan.transition
 
-    def _get_hopeful_ending(
-        self, character: Dict, region_data: Dict, climate_impact: str
-    ) -> str:
-        """Get a hopeful ending for the story."""
-        endings = {
-            "sea_level_rise": "The water may have claimed some land, but it has also brought the community closer together, creating new ways of living that are more connected to the natural world.",
-            "drought": "The scarcity of water has taught the community to value every resource, creating a more sustainable way of life that honors the land and each other.",
-            "extreme_heat": "The heat has forced innovation and adaptation, leading to new technologies and community practices that are more resilient and sustainable.",
-            "wildfire": "The fires have taught the community to respect the power of nature while building stronger bonds and more resilient communities.",
-        }
-        return endings.get(
-            climate_impact,
-            "The challenges have brought out the best in people, creating new possibilities for the future.",
-        )
+        # Present challenges, expanded with everyday scenes
+        yield "present_challenges", plan.present_challenges
+        for fragment in passages["expansions"]:
+            yield "scene_expansion", render(fragment, character)
 
-    def _get_sensory_details(self, climate_impact: str) -> str:
-        """Get sensory details for the climate impact."""
-        return self.impact_descriptions.get(climate_impact, {}).get(
-            "sensory_details", "The world feels different now."
-        )
+        # Adaptations, expanded with what people are doing about it
+        yield "adaptations", plan.adaptations
+        for fragment in passages["adaptations"]:
+            yield "adaptation_expansion", render(fragment, character)
 
-    def _get_daily_changes(self, climate_impact: str) -> str:
-        """Get description of daily changes due to climate impact."""
-        return self.impact_descriptions.get(climate_impact, {}).get(
-            "daily_changes", "Daily life has changed in ways both small and large."
-        )
+        # Community response, then how people live with it
+        yield "community_response", plan.community_response
+        for fragment in passages["reflections"]:
+            yield "reflection_passage", render(fragment, character)
 
-    def _write_story(
-        self, story_parts: Dict, character: Dict, region_data: Dict, target_length: int
-    ) -> str:
-        """Write the complete story from the story parts."""
-        story = f"# {story_parts['title']}\n\n"
-        story += f"*A climate futures story set in {region_data['location']}, {story_parts['year']}*\n\n"
+        yield "reflection", plan.reflection
 
-        # Opening scene
-        story += f"{story_parts['opening_scene']}\n\n"
+        # Sensory details, daily changes, the character's own story and the
+        # cultural context
+        for fragment in passages["closing"]:
+            yield "closing_passage", render(fragment, character)
 
-        # Before scene
-        story += f"{story_parts['before_scene']}\n\n"
+        # Regional facts, as one paragraph
+        if passages["regional"]:
+            yield "regional_details", " ".join(
+                render(fragment, character) for fragment in passages["regional"]
+            )
 
-        # Transition
-        story += f"{story_parts['transition']}\n\n"
+        # Climate science context
+        for fragment in passages["science"]:
+            yield "climate_science", render(fragment, character)
 
-        # Present challenges
-        story += f"{story_parts['present_challenges']}\n\n"
+        yield "footer", story_templates.FOOTER_TEXT
 
-        # Adaptations
-        story += f"{story_parts['adaptations']}\n\n"
+    def list_available_locations(self) -> List[str]:
+        """List all available locations for story generation."""
+        return list(self._locations)
 
-        # Community response
-        story += f"{story_parts['community_response']}\n\n"
+    def list_available_impacts(self) -> List[str]:
+        """List all available climate impacts for story generation."""
+        return list(self._impacts)
 
-        # Reflection
-        story += f"{story_parts['reflection']}\n\n"
+    def list_available_characters(self) -> List[str]:
+        """List all available character types for story generation."""
+        return list(self._characters)
 
-        # Add sensory details and daily changes throughout
-        story += (
-            f"The sensory details are everywhere: {story_parts['sensory_details']}\n\n"
-        )
-        story += f"Daily life has transformed: {story_parts['daily_changes']}\n\n"
+    def enable_instrumentation(self):
+        """
+        Start recording call counts and wall time per pipeline stage.
+
+        Stages are "plan", "region", "character", "structure", "title", one
+        "scene.<section>" per core scene, "passages" and "write"; enclosing
+        stages include the time of the stages they call (see _TIMED_STAGES).
+        "write" counts one call per story in every output format, whether
+        written whole or through `iter_story`, and times producing the story's
+        sections but not the format's markup.
+        `generate_stories` renders batches without these stages and is not
+        covered.
+
+        The stage methods are shadowed on this instance by timing wrappers, so
+        a storyteller that never enables instrumentation runs exactly the
+        uninstrumented code. Counters are plain integers updated without a
+        lock; under heavy concurrent use an update can occasionally be lost.
+        """
+        if self._stage_counters is not None:
+            return
+        counters = {}
+        for stage, method in _TIMED_STAGES:
+            counters[stage] = _StageCounter()
+            bound = getattr(self, method)
+            timer = _timed_iter if inspect.isgeneratorfunction(bound) else _timed
+            setattr(self, method, timer(bound, counters[stage]))
+
+        # Scenes share _render; charge each call to its fragment's section
+        scenes = {}
+        for (section, _, _), fragment in self._fragments.items():
+            if section in _CORE_SECTIONS:
+                stage = f"scene.{section}"
+                scenes[id(fragment)] = counters.setdefault(stage, _StageCounter())
+        render = self._render
+        clock = time.perf_counter_ns
+
+        def timed_render(fragment, *args, **kwargs):
+            start = clock()
+            try:
+                return render(fragment, *args, **kwargs)
+            finally:
+                scenes[id(fragment)].add(clock() - start)
+
+        self._render = timed_render
+        self._stage_counters = counters
+
+    def disable_instrumentation(self):
+        """Stop recording and restore the uninstrumented stage methods."""
+        if self._stage_counters is None:
+            return
+        for _, method in _TIMED_STAGES:
+            delattr(self, method)
+        del self._render
+        self._stage_counters = None
+
+    def stage_timings(self, reset: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Snapshot the per-stage counters: calls, total_ns, mean_ns and max_ns
+        for every stage called at least once. Empty when instrumentation is
+        disabled. With `reset`, the counters restart from zero.
+        """
+        timings = {}
+        for stage, counter in (self._stage_counters or {}).items():
+            calls, total_ns, max_ns = counter.calls, counter.total_ns, counter.max_ns
+            if reset:
+                counter.__init__()
+            if calls:
+                timings[stage] = {
+                    "calls": calls,
+                    "total_ns": total_ns,
+                    "mean_ns": total_ns // calls,
+                    "max_ns": max_ns,
+                }
+        return timings
+
+    def reset_stage_timings(self):
+        """Restart every per-stage counter from zero."""
+        for counter in (self._stage_counters or {}).values():
+            counter.__init__()
+
+
+class UniqueStorySampler:
+    """
+    Draws stories without replacement over (location, impact, character
+    focus, profession, name) combinations.
 
-        # Add character's personal story
-        story += f"For {character['name']}, this journey has been deeply personal. {character['personal_story']}, and now {character['name']} is part of a community learning to thrive in a changing world.\n\n"
+    Combination indices are visited in the order of a keyed pseudorandom
+    permutation, so no two stories share a combination until the space is
+    exhausted, with no rejection loop and constant memory per draw. The
+    sampler's whole state is its seed and position: save `checkpoint()` and
+    pass it to `from_checkpoint` to continue a batch after a restart.
 
-        # Add regional context
-        if "cultural_context" in region_data:
-            story += f"The cultural context of {region_data['location']} adds another layer to this story. {region_data['cultural_context']}, and this heritage provides both challenges and strengths as the community adapts to new realities.\n\n"
+    Iterate to get stories; iteration stops once every combination is used.
+    """
 
-        # Add climate science context
-        story += f"This story reflects the reality of climate change as we understand it in 2025: {self.climate_facts['global_temperature']}, with {self.climate_facts['extreme_weather']}, and {self.climate_facts['sea_level_rise']}. The impacts are real, but so is the human capacity for adaptation and resilience.\n\n"
+    def __init__(
+        self,
+        storyteller: "ClimateStoryteller",
+        seed: Optional[int] = None,
+        position: int = 0,
+        story_length: int = 1200,
+    ):
+        self.storyteller = storyteller
+        self.seed = new_seed() if seed is None else seed
+        self.position = position
+        self.story_length = story_length
+
+        self._locations = storyteller.list_available_locations()
+        self._impacts = storyteller.list_available_impacts()
+        self._personas = [
+            (focus, profession)
+            for focus, template in storyteller.character_templates.items()
+            for profession in template["professions"]
+        ]
+        self._names = storyteller.templates.NAMES
+        self._radices = (
+            len(self._locations),
+            len(self._impacts),
+            len(self._personas),
+            len(self._names),
+        )
+        self._permutation = _KeyedPermutation(prod(self._radices), self.seed)
+
+    @classmethod
+    def from_checkpoint(
+        cls, checkpoint: Dict, storyteller: "ClimateStoryteller"
+    ) -> "UniqueStorySampler":
+        """Resume a sampler from a `checkpoint()` dict."""
+        sampler = cls(
+            storyteller,
+            seed=checkpoint["seed"],
+            position=checkpoint["position"],
+            story_length=checkpoint.get("story_length", 1200),
+        )
+        if checkpoint.get("size", len(sampler)) != len(sampler):
+            raise ValueError(
+                "checkpoint was taken over a different combination space "
+                f"({checkpoint['size']} combinations, now {len(sampler)})"
+            )
+        return sampler
 
-        story += f"*This story is part of the Climate Futures Storyteller project, creating narratives that help us understand and connect with the human experience of climate change.*"
+    def __len__(self) -> int:
+        """Number of distinct combinations."""
+        return self._permutation.size
 
-        return story
+    @property
+    def remaining(self) -> int:
+        """Number of combinations not drawn yet."""
+        return len(self) - self.position
 
-    def list_available_locations(self) -> List[str]:
-        """List all available locations for story generation."""
-        locations = []
-        for region_type, locations_dict in self.regional_data.items():
-            locations.extend(locations_dict.keys())
-        return locations
+    def checkpoint(self) -> Dict:
+        """Return the JSON-serializable state needed to resume this sampler."""
+        return {
+            "seed": self.seed,
+            "position": self.position,
+            "size": len(self),
+            "story_length": self.story_length,
+        }
 
-    def list_available_impacts(self) -> List[str]:
-        """List all available climate impacts for story generation."""
-        return list(self.impact_descriptions.keys())
+    def combination_at(self, position: int) -> Dict:
+        """Return the combination drawn at `position` of the sampling order."""
+        index = self._permutation[position]
+        digits = []
+        for radix in reversed(self._radices):
+            index, digit = divmod(index, radix)
+            digits.append(digit)
+        name, persona, impact, location = digits
+        character_focus, profession = self._personas[persona]
+        return {
+            "location": self._locations[location],
+            "climate_impact": self._impacts[impact],
+            "character_focus": character_focus,
+            "profession": profession,
+            "name": self._names[name],
+        }
 
-    def list_available_characters(self) -> List[str]:
-        """List all available character types for story generation."""
-        return list(self.character_templates.keys())
+    def __iter__(self) -> "UniqueStorySampler":
+        return self
+
+    def __next__(self) -> "Story":
+        if self.position >= len(self):
+            raise StopIteration
+        combination = self.combination_at(self.position)
+
+        # Each position gets its own story seed, so resuming replays exactly
+        digest = hashlib.blake2b(
+            f"{self.seed}:{self.position}".encode(), digest_size=8
+        ).digest()
+        seed = int.from_bytes(digest, "little") >> (64 - SEED_BITS)
+
+        storyteller = self.storyteller
+        plan, region_data = storyteller._plan_story(
+            combination["location"],
+            combination["climate_impact"],
+            combination["character_focus"],
+            seed,
+            name=combination["name"],
+            profession=combination["profession"],
+        )
+        self.position += 1
+        return Story(
+            storyteller._write_story(plan, region_data, self.story_length), seed, plan
+        )
 
 
 # Example usage and testing
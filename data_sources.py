@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Data sources for the Climate Futures Storyteller catalog.
+
+A data source supplies the regional climate data, impact descriptions,
+character templates and location aliases a `ClimateStoryteller` draws from.
+Impacts and characters are small and read once; regions are read one at a
+time on first use, so a catalog of many thousands of locations costs neither
+start-up time nor memory for regions nobody asks for.
+
+Backends:
+
+    ModuleDataSource          the built-in catalog in regional_data.py (default)
+    JSONDirectoryDataSource   a directory of JSON files, one per region
+    SQLiteDataSource          a single SQLite database
+
+Export the built-in catalog to either format, as a starting point for a
+larger one:
+
+    python data_sources.py export --format json catalog/
+    python data_sources.py export --format sqlite catalog.db
+"""
+
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_location(location: str) -> str:
+    """Normalize a human-form location ("Miami, Florida") to key form ("miami_florida")."""
+    return _NON_ALNUM.sub("_", location.lower()).strip("_")
+
+
+def build_location_index(
+    locations: Iterable[str], aliases: Dict[str, str]
+) -> Dict[str, str]:
+    """
+    Map every location key, its normalized form and each alias of a known
+    location to the location key. Exact keys win over normalized forms,
+    which win over aliases.
+    """
+    locations = list(locations)
+    index = {location: location for location in locations}
+    for location in locations:
+        index.setdefault(normalize_location(location), location)
+    for alias, location in aliases.items():
+        if location in index:
+            index.setdefault(alias, location)
+    return index
+
+
+class DataSource:
+    """
+    Interface of a storyteller catalog.
+
+    `load_region` returns a region's data with its `region_type`, or None for
+    an unknown location; it is only called for names from `list_locations`.
+    """
+
+    def list_locations(self) -> List[str]:
+        """Return every location key, in catalog order."""
+        raise NotImplementedError
+
+    def load_region(self, location: str) -> Optional[Dict]:
+        """Return the regional data for one location key."""
+        raise NotImplementedError
+
+    def location_aliases(self) -> Dict[str, str]:
+        """Return extra lookup keys mapped to location keys."""
+        return {}
+
+    def location_index(self) -> Optional[Dict[str, str]]:
+        """
+        Return a precomputed index of every lookup key (location keys, their
+        normalized forms and aliases) to its location key, or None to let the
+        storyteller build one.
+        """
+        return None
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        Return a hash of the catalog's content that is cheap to compute, or
+        None if there is none; used to key compiled snapshots.
+        """
+        return None
+
+    def impact_descriptions(self) -> Dict[str, Dict]:
+        """Return the sensory, daily and emotional descriptions per impact."""
+        raise NotImplementedError
+
+    def character_templates(self) -> Dict[str, Dict]:
+        """Return the character templates per character focus."""
+        raise NotImplementedError
+
+
+class ModuleDataSource(DataSource):
+    """
+    The catalog hardcoded in a Python module, regional_data.py by default.
+
+    The module is imported on first use rather than up front, so a storyteller
+    served from a fresh compiled snapshot never executes it.
+    """
+
+    def __init__(self, module: str = "regional_data"):
+        self.module = module
+        self._data = None
+        self._region_types = None
+
+    def _tables(self):
+        if self._data is None:
+            self._data = importlib.import_module(self.module)
+            self._region_types = {
+                location: region_type
+                for region_type, locations in self._data.REGIONAL_CLIMATE_DATA.items()
+                for location in locations
+            }
+        return self._data
+
+    def list_locations(self) -> List[str]:
+        self._tables()
+        return list(self._region_types)
+
+    def load_region(self, location: str) -> Optional[Dict]:
+        data = self._tables()
+        region_type = self._region_types.get(location)
+        if region_type is None:
+            return None
+        return {
+            **data.REGIONAL_CLIMATE_DATA[region_type][location],
+            "region_type": region_type,
+        }
+
+    def location_aliases(self) -> Dict[str, str]:
+        return self._tables().LOCATION_ALIASES
+
+    def impact_descriptions(self) -> Dict[str, Dict]:
+        return self._tables().CLIMATE_IMPACT_DESCRIPTIONS
+
+    def character_templates(self) -> Dict[str, Dict]:
+        return self._tables().CHARACTER_TEMPLATES
+
+    def fingerprint(self) -> Optional[str]:
+        """Hash the module's source file without importing it."""
+        spec = importlib.util.find_spec(self.module)
+        if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+            return None
+        with open(spec.origin, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+
+class JSONDirectoryDataSource(DataSource):
+    """
+    A catalog stored as a directory of JSON files:
+
+        locations.json    list of location keys, in catalog order
+        aliases.json      optional object of alias -> location key
+        impacts.json      object of impact descriptions
+        characters.json   object of character templates
+        regions/<location>.json   one region, including its region_type
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self, *parts: str):
+        with open(os.path.join(self.path, *parts), encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_locations(self) -> List[str]:
+        return self._read("locations.json")
+
+    def load_region(self, location: str) -> Optional[Dict]:
+        # Location keys come from locations.json, never from a request, so
+        # they are safe to use as file names
+        try:
+            return self._read("regions", f"{location}.json")
+        except FileNotFoundError:
+            return None
+
+    def location_aliases(self) -> Dict[str, str]:
+        try:
+            return self._read("aliases.json")
+        except FileNotFoundError:
+            return {}
+
+    def impact_descriptions(self) -> Dict[str, Dict]:
+        return self._read("impacts.json")
+
+    def character_templates(self) -> Dict[str, Dict]:
+        return self._read("characters.json")
+
+
+class SQLiteDataSource(DataSource):
+    """
+    A catalog stored in one SQLite database.
+
+    Tables: `regions(position, location, region_type, data)` with the region
+    JSON in `data`, `aliases(alias, location)` and `catalog(name, data)` with
+    the "impacts" and "characters" JSON objects. The connection is shared
+    between threads behind a lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS regions (
+            position INTEGER NOT NULL,
+            location TEXT PRIMARY KEY,
+            region_type TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS aliases (
+            alias TEXT PRIMARY KEY,
+            location TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS catalog (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, *parameters) -> List:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _catalog(self, name: str) -> Dict:
+        rows = self._query("SELECT data FROM catalog WHERE name = ?", name)
+        return json.loads(rows[0][0]) if rows else {}
+
+    def list_locations(self) -> List[str]:
+        return [
+            location
+            for (location,) in self._query(
+                "SELECT location FROM regions ORDER BY position"
+            )
+        ]
+
+    def load_region(self, location: str) -> Optional[Dict]:
+        rows = self._query(
+            "SELECT region_type, data FROM regions WHERE location = ?", location
+        )
+        if not rows:
+            return None
+        region_type, data = rows[0]
+        return {**json.loads(data), "region_type": region_type}
+
+    def location_aliases(self) -> Dict[str, str]:
+        return dict(self._query("SELECT alias, location FROM aliases"))
+
+    def impact_descriptions(self) -> Dict[str, Dict]:
+        return self._catalog("impacts")
+
+    def character_templates(self) -> Dict[str, Dict]:
+        return self._catalog("characters")
+
+    def close(self):
+        """Close the database connection."""
+        self._connection.close()
+
+
+def open_data_source(path: Optional[str]) -> DataSource:
+    """
+    Open the catalog at `path`: a directory is read as JSON files, anything
+    else as a SQLite database. No path means the built-in catalog.
+    """
+    if not path:
+        return ModuleDataSource()
+    if os.path.isdir(path):
+        return JSONDirectoryDataSource(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No catalog at {path}")
+    return SQLiteDataSource(path)
+
+
+def export_json_directory(source: DataSource, path: str):
+    """Write every region and table of `source` as a JSON directory catalog."""
+    os.makedirs(os.path.join(path, "regions"), exist_ok=True)
+
+    def write(data, *parts):
+        with open(os.path.join(path, *parts), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    locations = source.list_locations()
+    for location in locations:
+        write(source.load_region(location), "regions", f"{location}.json")
+    write(locations, "locations.json")
+    write(source.location_aliases(), "aliases.json")
+    write(source.impact_descriptions(), "impacts.json")
+    write(source.character_templates(), "characters.json")
+
+
+def export_sqlite(source: DataSource, path: str):
+    """Write every region and table of `source` into a SQLite catalog."""
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executescript(SQLiteDataSource.SCHEMA)
+        for position, location in enumerate(source.list_locations()):
+            region = dict(source.load_region(location))
+            region_type = region.pop("region_type")
+            connection.execute(
+                "INSERT OR REPLACE INTO regions VALUES (?, ?, ?, ?)",
+                (position, location, region_type, json.dumps(region)),
+            )
+        connection.executemany(
+            "INSERT OR REPLACE INTO aliases VALUES (?, ?)",
+            source.location_aliases().items(),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO catalog VALUES (?, ?)",
+            [
+                ("impacts", json.dumps(source.impact_descriptions())),
+                ("characters", json.dumps(source.character_templates())),
+            ],
+        )
+    connection.close()
+
+
+def main():
+    """Command line entry point: export the built-in catalog."""
+    parser = argparse.ArgumentParser(
+        description="Export the Climate Futures Storyteller catalog"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Export the built-in catalog")
+    export.add_argument("--format", choices=("json", "sqlite"), default="json")
+    export.add_argument("path", help="Directory (json) or database file (sqlite)")
+    args = parser.parse_args()
+
+    source = ModuleDataSource()
+    if args.format == "json":
+        export_json_directory(source, args.path)
+    else:
+        export_sqlite(source, args.path)
+    print(f"Exported {len(source.list_locations())} locations to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,10 @@ def check_requirements():
         "web_interface.py",
         "climate_storyteller.py",
         "regional_data.py",
+        "data_sources.py",
+        "catalog_snapshot.py",
+        "template_packs.py",
+        "llm_backend.py",
         "requirements.txt",
         "Procfile",
         "render.yaml",
@@ -0,0 +1,16 @@
+"""
+Gunicorn settings for the Climate Futures Storyteller: `gunicorn wsgi:app`.
+
+Streamed stories (/api/generate/stream and /api/generate/events) hold their
+connection until the last section is sent, which with a model writing them
+takes seconds. Threaded workers serve each stream from a thread of their own
+and keep answering the arbiter's heartbeat meanwhile, so a long stream
+neither blocks a whole worker nor trips the worker timeout.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
@@ -0,0 +1,1202 @@
+"""
+Model-written stories for the Climate Futures Storyteller.
+
+ModelStoryteller plans a story exactly as ClimateStoryteller does, then asks
+an OpenAI-compatible completion endpoint (`POST /v1/completions`) to write
+the prose from that plan. When the model does not answer within the story's
+deadline, or answers with an error, the template story for the same seed is
+returned instead, so a slow or failing model never costs more than the
+deadline:
+
+    client = CompletionClient("http://localhost:8001", model="my-model")
+    narrator = ModelStoryteller(ClimateStoryteller(), client, deadline=10.0)
+    story = await narrator.generate_story(climate_impact="drought", seed=42)
+    story.source  # "model" or "template"
+
+CompletionClient is a small asyncio HTTP/1.1 client built on the standard
+library. It keeps a bounded pool of keep-alive connections, limits how many
+prompts are in flight, and batches prompts that arrive together into one
+request (the completion API takes a list of prompts), which lets the server
+decode them side by side. mock_llm_server.py stands in for a model offline.
+
+Failed requests are retried with jittered backoff while the deadline allows,
+and a CircuitBreaker stops calling a model that keeps failing until it has
+had time to recover. ModelService can also serve as ClimateStoryteller's
+`enricher`, so the template story is returned at once and the model's
+rewrite of the same plan follows when it arrives in time:
+
+    storyteller.enricher = ModelService(storyteller, "http://localhost:8001")
+    story = storyteller.generate_story(seed=42)  # the template story, now
+    rewrite = story.enriched.result()  # the model's, or None
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import random
+import ssl
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import story_templates
+from climate_storyteller import (
+    _FORMATTERS,
+    ClimateStoryteller,
+    Story,
+    StoryPlan,
+    _check_format,
+    new_seed,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo-instruct"
+
+# Rough tokens per English word, for sizing max_tokens from a word count
+TOKENS_PER_WORD = 1.35
+
+
+class CompletionError(Exception):
+    """The completion endpoint failed or returned something unusable."""
+
+
+def build_prompt(plan: StoryPlan, region_data: Dict, story_length: int) -> str:
+    """
+    Turn a story plan into a completion prompt: the setting, the protagonist
+    and the planned scenes as an outline the model writes the story from.
+    """
+    character = plan.character
+    details = region_data.get("specific_details") or {}
+    facts = "\n".join(
+        f"- {key.replace('_', ' ')}: "
+        + (", ".join(value) if isinstance(value, (list, tuple)) else str(value))
+        for key, value in details.items()
+    )
+    beats = "\n".join(
+        f"{i}. {scene}"
+        for i, scene in enumerate(
+            (
+                plan.opening_scene,
+                plan.before_scene,
+                plan.transition,
+                plan.present_challenges,
+                plan.adaptations,
+                plan.community_response,
+                plan.reflection,
+            ),
+            1,
+        )
+    )
+    return (
+        f"Write a realistic, hopeful climate futures short story of about "
+        f"{story_length} words, in plain prose paragraphs separated by blank "
+        f"lines, with no title or headings.\n\n"
+        f"Title: {plan.title}\n"
+        f"Setting: {region_data['location']}, {plan.year}\n"
+        f"Climate impact: {plan.climate_impact.replace('_', ' ')}\n"
+        f"Protagonist: {character.name}, {character.age_group.replace('_', ' ')}, "
+        f"{character.profession.replace('_', ' ')}, "
+        f"{character.background.replace('_', ' ')}; {character.personal_story}\n"
+        f"Cultural context: {region_data.get('cultural_context', '')}\n"
+        + (f"Regional facts:\n{facts}\n" if facts else "")
+        + f"\nFollow this outline, in order, expanding each beat into scenes:\n"
+        f"{beats}\n\nStory:\n"
+    )
+
+
+def _max_tokens(story_length: int) -> int:
+    """Token budget of a story, with room to overshoot its word count."""
+    return int(story_length * TOKENS_PER_WORD * 1.25)
+
+
+def _paragraphs(text: str) -> List[str]:
+    """Split model output into paragraphs, dropping an echoed title or heading."""
+    paragraphs = [" ".join(part.split()) for part in text.strip().split("\n\n")]
+    paragraphs = [paragraph for paragraph in paragraphs if paragraph]
+    if paragraphs and paragraphs[0].startswith(("#", "Title:")):
+        del paragraphs[0]
+    return paragraphs
+
+
+class _ConnectionPool:
+    """
+    Keep-alive connections to one origin, at most `size` of them in use.
+
+    Connections are handed out most recently used first; one that failed or
+    was interrupted mid-exchange is closed rather than returned.
+    """
+
+    def __init__(self, host: str, port: int, tls: bool, size: int):
+        self.host = host
+        self.port = port
+        self.tls = ssl.create_default_context() if tls else None
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self) -> Tuple[Tuple, bool]:
+        """Return a connection and whether it has been used before."""
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                reader, writer = self._idle.pop()
+                if not writer.is_closing() and not reader.at_eof():
+                    self.reused += 1
+                    return (reader, writer), True
+                writer.close()
+            connection = await asyncio.open_connection(
+                self.host, self.port, ssl=self.tls
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return connection, False
+
+    def release(self, connection: Tuple, reusable: bool):
+        """Return a connection to the pool, or close it."""
+        if reusable:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+        self._slots.release()
+
+    def close(self):
+        """Close every idle connection."""
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, int, Dict]:
+    """Read a response's status line and headers."""
+    line = await reader.readuntil(b"\n")
+    version, status, *_ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\n")
+        if line in (b"\r\n", b"\n"):
+            return version, int(status), headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _iter_body(
+    reader: asyncio.StreamReader, headers: Dict
+) -> AsyncIterator[bytes]:
+    """Yield a response body as it arrives, framed by chunked encoding,
+    Content-Length or the end of the connection."""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\n")).split(b";")[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\n") not in (b"\r\n", b"\n"):
+                    pass  # trailers
+                return
+            yield await reader.readexactly(size)
+            await reader.readuntil(b"\n")
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining:
+            piece = await reader.read(min(remaining, 65536))
+            if not piece:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(piece)
+            yield piece
+    else:
+        while True:
+            piece = await reader.read(65536)
+            if not piece:
+                return
+            yield piece
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict) -> bytes:
+    """Read a whole response body."""
+    return b"".join([piece async for piece in _iter_body(reader, headers)])
+
+
+async def _iter_events(pieces: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Yield the data of each server-sent event in a byte stream."""
+    buffer = b""
+    async for piece in pieces:
+        buffer += piece.replace(b"\r", b"")
+        while b"\n\n" in buffer:
+            event, buffer = buffer.split(b"\n\n", 1)
+            data = [
+                line[6:] if line.startswith(b"data: ") else line[5:]
+                for line in event.split(b"\n")
+                if line.startswith(b"data:")
+            ]
+            if data:
+                yield b"\n".join(data).decode("utf-8")
+
+
+def _keep_alive(version: str, headers: Dict) -> bool:
+    """Whether a response leaves its connection reusable once read."""
+    framed = "content-length" in headers or (
+        headers.get("transfer-encoding", "").lower() == "chunked"
+    )
+    return (
+        framed
+        and version == "HTTP/1.1"
+        and headers.get("connection", "").lower() != "close"
+    )
+
+
+def _fail(batch: List[Tuple[str, asyncio.Future]], error: Exception):
+    """Fail every prompt of `batch` still waiting with `error`."""
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _cancel(batch: List[Tuple[str, asyncio.Future]]):
+    """Cancel every prompt of `batch` still waiting."""
+    for _, future in batch:
+        future.cancel()
+
+
+class CompletionClient:
+    """
+    Asyncio client for an OpenAI-compatible completion endpoint.
+
+    At most `max_connections` requests are sent at once, over keep-alive
+    connections, and at most `max_concurrency` prompts are admitted at once;
+    later callers wait their turn. Prompts with the same max_tokens that
+    arrive within `batch_window` seconds of each other are sent together, up
+    to `max_batch` per request; set max_batch to 1 to send each on its own.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str = DEFAULT_MODEL,
+        api_key: Optional[str] = None,
+        max_connections: int = 8,
+        max_concurrency: int = 64,
+        max_batch: int = 8,
+        batch_window: float = 0.005,
+        temperature: float = 0.8,
+    ):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Unsupported completion endpoint {base_url!r}")
+        tls = url.scheme == "https"
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+        self.temperature = temperature
+        self._path = url.path.rstrip("/") + "/v1/completions"
+        self._host = url.netloc
+        self._api_key = api_key
+        self._pool = _ConnectionPool(
+            url.hostname, url.port or (443 if tls else 80), tls, max_connections
+        )
+        self._admission = asyncio.Semaphore(max_concurrency)
+
+        # Prompts waiting to be sent, by max_tokens, and their flush timers
+        self._pending: Dict[int, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._sending = set()
+
+        self.requests = 0
+        self.prompts = 0
+        self.errors = 0
+
+    async def __aenter__(self) -> "CompletionClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Cancel requests in flight and close the pooled connections."""
+        for task in self._sending:
+            task.cancel()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        self._pool.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Requests, prompts, errors and connections opened and reused."""
+        return {
+            "requests": self.requests,
+            "prompts": self.prompts,
+            "errors": self.errors,
+            "connections_opened": self._pool.opened,
+            "connections_reused": self._pool.reused,
+        }
+
+    async def complete(self, prompt: str, max_tokens: int) -> str:
+        """
+        Return the completion of `prompt`.
+
+        Raises CompletionError when the endpoint fails, and OSError when it
+        cannot be reached. Cancelling the call (for instance with
+        asyncio.wait_for) withdraws the prompt if it has not been sent yet.
+        """
+        async with self._admission:
+            future = asyncio.get_running_loop().create_future()
+            self._enqueue(prompt, max_tokens, future)
+            return await future
+
+    def _enqueue(self, prompt: str, max_tokens: int, future: asyncio.Future):
+        pending = self._pending.setdefault(max_tokens, [])
+        pending.append((prompt, future))
+        if len(pending) >= self.max_batch or self.batch_window <= 0:
+            self._flush(max_tokens)
+        elif len(pending) == 1:
+            self._timers[max_tokens] = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush, max_tokens
+            )
+
+    def _flush(self, max_tokens: int):
+        """Send the prompts waiting for `max_tokens` as one request."""
+        timer = self._timers.pop(max_tokens, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [
+            (prompt, future)
+            for prompt, future in self._pending.pop(max_tokens, ())
+            if not future.done()
+        ]
+        if batch:
+            task = asyncio.ensure_future(self._send(batch, max_tokens))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]], max_tokens: int):
+        try:
+            connection, reused = await self._pool.acquire()
+        except asyncio.CancelledError:
+            _cancel(batch)
+            raise
+        except OSError as e:
+            self.errors += 1
+            _fail(batch, e)
+            return
+
+        # Callers that gave up while the batch waited for a connection are
+        # left out; if none are left, nothing is sent
+        batch = [(prompt, future) for prompt, future in batch if not future.done()]
+        if not batch:
+            self._pool.release(connection, True)
+            return
+
+        prompts = [prompt for prompt, _ in batch]
+        payload = {
+            "model": self.model,
+            "prompt": prompts if len(prompts) > 1 else prompts[0],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature,
+        }
+        self.requests += 1
+        self.prompts += len(prompts)
+        try:
+            response = await self._post(payload, connection, reused)
+            texts = [None] * len(batch)
+            for choice in response["choices"]:
+                texts[choice.get("index", 0)] = choice["text"]
+        except asyncio.CancelledError:
+            _cancel(batch)
+            raise
+        except (CompletionError, OSError) as e:
+            self.errors += 1
+            _fail(batch, e)
+            return
+        except Exception as e:
+            self.errors += 1
+            _fail(batch, CompletionError(f"Malformed completion response: {e!r}"))
+            return
+        for (_, future), text in zip(batch, texts):
+            if future.done():
+                continue
+            if text is None:
+                future.set_exception(CompletionError("No completion for prompt"))
+            else:
+                future.set_result(text)
+
+    def _request(self, payload: Dict, accept: str) -> bytes:
+        """Encode a POST of `payload` as JSON to the completion endpoint."""
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"POST {self._path} HTTP/1.1\r\n"
+            f"Host: {self._host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Accept: {accept}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+        )
+        if self._api_key:
+            head += f"Authorization: Bearer {self._api_key}\r\n"
+        return (head + "\r\n").encode("latin-1") + body
+
+    async def _open(
+        self, request: bytes, connection: Tuple, reused: bool
+    ) -> Tuple[Tuple, int, Dict, bool]:
+        """
+        Send `request` over a pooled connection and read the response head;
+        returns (connection, status, headers, keep-alive). When a reused
+        connection turns out to have been closed by the server, the request
+        is sent again over another one. On failure the connection is closed.
+        """
+        while True:
+            reader, writer = connection
+            try:
+                writer.write(request)
+                await writer.drain()
+                version, status, headers = await _read_head(reader)
+                return connection, status, headers, _keep_alive(version, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._pool.release(connection, False)
+                if reused:
+                    # The server closed an idle connection; use another
+                    connection, reused = await self._pool.acquire()
+                    continue
+                raise
+            except BaseException:
+                # Cancelled or failed mid-exchange: the connection is unusable
+                self._pool.release(connection, False)
+                raise
+
+    async def _post(self, payload: Dict, connection: Tuple, reused: bool) -> Dict:
+        """
+        POST `payload` over a pooled `connection`, which is returned to the
+        pool, and return the decoded JSON response.
+        """
+        connection, status, headers, keep_alive = await self._open(
+            self._request(payload, "application/json"), connection, reused
+        )
+        try:
+            data = await _read_body(connection[0], headers)
+        except BaseException:
+            self._pool.release(connection, False)
+            raise
+        self._pool.release(connection, keep_alive)
+
+        if status != 200:
+            raise CompletionError(
+                f"Completion endpoint returned HTTP {status}: "
+                f"{data[:200].decode('utf-8', 'replace')}"
+            )
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise CompletionError("Completion endpoint returned invalid JSON")
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """
+        Yield the completion of `prompt` piece by piece as the model writes
+        it, from a server-sent event stream. Streamed prompts are not
+        batched. Raises like `complete`; closing the iterator early closes
+        its connection.
+        """
+        async with self._admission:
+            connection, reused = await self._pool.acquire()
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "max_tokens": max_tokens,
+                "temperature": self.temperature,
+                "stream": True,
+            }
+            self.requests += 1
+            self.prompts += 1
+            connection, status, headers, keep_alive = await self._open(
+                self._request(payload, "text/event-stream"), connection, reused
+            )
+            finished = False
+            try:
+                body = _iter_body(connection[0], headers)
+                if status != 200:
+                    data = b"".join([piece async for piece in body])
+                    finished = True
+                    raise CompletionError(
+                        f"Completion endpoint returned HTTP {status}: "
+                        f"{data[:200].decode('utf-8', 'replace')}"
+                    )
+                done = False
+                async for data in _iter_events(body):
+                    # Read on past [DONE] to the end of the body, so the
+                    # connection can be reused
+                    done = done or data == "[DONE]"
+                    if done:
+                        continue
+                    try:
+                        choices = json.loads(data)["choices"]
+                    except (ValueError, KeyError, TypeError) as e:
+                        raise CompletionError(f"Malformed stream event: {e!r}")
+                    for choice in choices:
+                        if choice.get("text"):
+                            yield choice["text"]
+                finished = True
+            except (CompletionError, OSError):
+                self.errors += 1
+                raise
+            except asyncio.IncompleteReadError:
+                self.errors += 1
+                raise CompletionError("Completion stream ended early")
+            finally:
+                self._pool.release(connection, keep_alive and finished)
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing backend. After `failure_threshold` failures in
+    a row the breaker opens and refuses calls for `reset_timeout` seconds;
+    then it half-opens, letting one trial call through, and closes again if
+    the trial succeeds or reopens if it fails. A trial that never reports
+    back is given up after another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trips = 0
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """CLOSED, OPEN or HALF_OPEN."""
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return self.OPEN
+            return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; a half-open breaker allows one."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_at is not None and now - self._trial_at < self.reset_timeout:
+                return False
+            self._trial_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.trips += 1
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+
+class ModelStoryteller:
+    """
+    Writes ClimateStoryteller's story plans with a completion model, falling
+    back to the template story when the model misses the deadline or fails.
+
+    Stories carry `source`, "model" or "template". Planning is the same as
+    ClimateStoryteller's, so a fallback story is exactly the template story
+    for the same parameters and seed. Failed completions are retried while
+    the deadline allows, and the model is not called at all while its
+    circuit breaker is open.
+    """
+
+    def __init__(
+        self,
+        storyteller: ClimateStoryteller,
+        client: CompletionClient,
+        deadline: float = 20.0,
+        breaker: Optional[CircuitBreaker] = None,
+        retries: int = 2,
+        retry_backoff: float = 0.2,
+    ):
+        """
+        Args:
+            storyteller: Plans stories and writes the fallbacks
+            client: The completion endpoint to write stories with
+            deadline: Seconds a story may wait for the model, from the call
+                to the full completion, before the template story is used
+            breaker: Decides when to stop calling a failing model
+                (default: CircuitBreaker())
+            retries: Retries of a failed completion, within the deadline
+            retry_backoff: Seconds the first retry waits at most; each later
+                retry may wait twice as long, with full jitter
+        """
+        self.storyteller = storyteller
+        self.client = client
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.model_stories = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.incomplete = 0
+        self.rejected = 0  # stories the open breaker kept from the model
+        self.retried = 0
+        # Time to first token of recent streamed model stories, in ms
+        self._ttfts = deque(maxlen=1024)
+
+    def stats(self) -> Dict:
+        """
+        Stories written by the model, fallbacks by cause, streams the model
+        left unfinished, retries, the breaker's state, and time to first
+        token percentiles of recent streamed stories.
+        """
+        ttfts = sorted(self._ttfts)
+        return {
+            "model_stories": self.model_stories,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "incomplete": self.incomplete,
+            "retried": self.retried,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "ttft_ms": {
+                "samples": len(ttfts),
+                **{
+                    f"p{round(fraction * 100)}": _percentile(ttfts, fraction)
+                    for fraction in (0.5, 0.9, 0.99)
+                },
+            },
+            **self.client.stats(),
+        }
+
+    async def generate_story(
+        self,
+        location: str = None,
+        climate_impact: str = None,
+        character_focus: str = None,
+        story_length: int = 1200,
+        seed: Optional[int] = None,
+        output_format: str = "markdown",
+        deadline: Optional[float] = None,
+    ) -> Story:
+        """
+        Generate a climate futures story written by the model.
+
+        Takes ClimateStoryteller.generate_story's arguments, plus a `deadline`
+        in seconds overriding the default for this story.
+        """
+        _check_format(output_format)
+        if seed is None:
+            seed = new_seed()
+        plan, region_data = self.storyteller._plan_story(
+            location, climate_impact, character_focus, seed
+        )
+        story = await self.write_story(
+            plan, region_data, seed, story_length, output_format, deadline
+        )
+        if story is None:
+            story = self.storyteller._story_from_plan(
+                plan, region_data, seed, story_length, output_format
+            )
+        return story
+
+    async def write_story(
+        self,
+        plan: StoryPlan,
+        region_data: Dict,
+        seed: int,
+        story_length: int = 1200,
+        output_format: str = "markdown",
+        deadline: Optional[float] = None,
+    ) -> Optional[Story]:
+        """
+        Have the model write the story of a plan from _plan_story. Returns
+        None, rather than a template story, when the model misses the
+        deadline, fails, or is not called because the breaker is open.
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            return None
+        prompt = build_prompt(plan, region_data, story_length)
+        try:
+            text = await self._complete(
+                prompt,
+                _max_tokens(story_length),
+                self.deadline if deadline is None else deadline,
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            logger.debug("Model missed the deadline for seed %d", seed)
+            return None
+        except (CompletionError, OSError) as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            logger.warning("Model story failed: %s", e)
+            return None
+        self.breaker.record_success()
+
+        self.model_stories += 1
+        blocks = [
+            ("title", plan.title),
+            (
+                "setting",
+                story_templates.SETTING_TEXT.format(
+                    location=region_data["location"], year=plan.year
+                ),
+            ),
+            *(("narrative", paragraph) for paragraph in _paragraphs(text)),
+            ("footer", story_templates.FOOTER_TEXT),
+        ]
+        # Count as the Markdown form would, where the title's "#" is a word
+        word_count = 1 + sum(len(text.split()) for _, text in blocks)
+        story = Story(
+            "".join(_FORMATTERS[output_format](blocks)), seed, plan, word_count
+        )
+        story.source = "model"
+        return story
+
+    async def _complete(self, prompt: str, max_tokens: int, deadline: float) -> str:
+        """
+        The model's completion of `prompt`, retrying failures after a
+        jittered, exponentially growing pause while the deadline allows.
+
+        Raises asyncio.TimeoutError past the deadline, and the last failure
+        when the retries or the time for another run out.
+        """
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        attempt = 0
+        while True:
+            try:
+                text = await asyncio.wait_for(
+                    self.client.complete(prompt, max_tokens), end - loop.time()
+                )
+                if not _paragraphs(text):
+                    raise CompletionError("Empty completion")
+                return text
+            except (CompletionError, OSError) as e:
+                # Full jitter, so callers that failed together retry apart
+                pause = random.uniform(0, self.retry_backoff * 2**attempt)
+                if attempt >= self.retries or loop.time() + pause >= end:
+                    raise
+                attempt += 1
+                self.retried += 1
+                logger.debug("Retrying a failed completion: %s", e)
+                await asyncio.sleep(pause)
+
+    async def stream_story(
+        self,
+        location: str = None,
+        climate_impact: str = None,
+        character_focus: str = None,
+        story_length: int = 1200,
+        seed: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Generate a story written by the model, yielding it as it is written.
+
+        Yields (event, data) pairs: "meta" once, with the seed, title,
+        setting, impact and protagonist; "chunk" for each piece of the
+        story's body, {"text": ...}, whose paragraphs are separated by blank
+        lines; and "done" once, with the footer, the `source`, the Markdown
+        word count, the time to first chunk in ms (`ttft_ms`) and whether the
+        story is `complete`.
+
+        The template story streams instead when the model has not started
+        within the deadline or fails before it starts. A model that then
+        falls silent for longer than the deadline, or fails, ends the story
+        early, incomplete.
+        """
+        start = time.perf_counter()
+        if seed is None:
+            seed = new_seed()
+        plan, region_data = self.storyteller._plan_story(
+            location, climate_impact, character_focus, seed
+        )
+        meta = _story_meta(plan, region_data, seed)
+        yield "meta", meta
+
+        if not self.breaker.allow():
+            self.rejected += 1
+            for event in _template_events(
+                self.storyteller, plan, region_data, story_length, start
+            ):
+                yield event
+            return
+
+        timeout = self.deadline if deadline is None else deadline
+        pieces = self.client.stream(
+            build_prompt(plan, region_data, story_length), _max_tokens(story_length)
+        )
+        parts, ttft, complete = [], None, True
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(pieces.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                if ttft is None:
+                    text = text.lstrip()
+                    if not text:
+                        continue
+                    ttft = (time.perf_counter() - start) * 1000
+                    self._ttfts.append(ttft)
+                parts.append(text)
+                yield "chunk", {"text": text}
+        except asyncio.TimeoutError:
+            if ttft is None:
+                self.timeouts += 1
+                logger.debug("Model missed the deadline for seed %d", seed)
+            else:
+                complete = False
+                logger.warning("Model stalled partway through seed %d", seed)
+        except (CompletionError, OSError) as e:
+            if ttft is None:
+                self.failures += 1
+                logger.warning("Model story failed, using the template story: %s", e)
+            else:
+                complete = False
+                logger.warning("Model story failed partway: %s", e)
+        finally:
+            await pieces.aclose()
+
+        if ttft is None:
+            if complete and not parts:
+                self.failures += 1  # an empty completion
+            self.breaker.record_failure()
+            for event in _template_events(
+                self.storyteller, plan, region_data, story_length, start
+            ):
+                yield event
+            return
+
+        if complete:
+            self.model_stories += 1
+            self.breaker.record_success()
+        else:
+            self.incomplete += 1
+            self.breaker.record_failure()
+        footer = story_templates.FOOTER_TEXT
+        words = 1 + sum(
+            len(text.split())
+            for text in (meta["title"], meta["setting"], "".join(parts), footer)
+        )
+        yield "done", {
+            "source": "model",
+            "footer": footer,
+            "word_count": words,
+            "ttft_ms": round(ttft, 1),
+            "complete": complete,
+        }
+
+    async def hedge_story(
+        self,
+        location: str = None,
+        climate_impact: str = None,
+        character_focus: str = None,
+        story_length: int = 1200,
+        seed: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        ModelService.hedge_story on this loop: the template story's events at
+        once while the model writes the same plan, then an "enriched" event.
+        Closing the iterator stops the model request.
+        """
+        start = time.perf_counter()
+        if seed is None:
+            seed = new_seed()
+        plan, region_data = self.storyteller._plan_story(
+            location, climate_impact, character_focus, seed
+        )
+        rewrite = asyncio.ensure_future(
+            self.write_story(plan, region_data, seed, story_length, "json")
+        )
+        try:
+            yield "meta", _story_meta(plan, region_data, seed)
+            for event, data in _template_events(
+                self.storyteller, plan, region_data, story_length, start
+            ):
+                if event == "done":
+                    data["enriching"] = True
+                yield event, data
+            yield "enriched", _enrichment(await rewrite)
+        finally:
+            rewrite.cancel()
+
+
+def nearest_rank(ordered: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted samples; None if there are none."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered), max(1, round(fraction * len(ordered)))) - 1]
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """nearest_rank, rounded to a tenth for stats."""
+    value = nearest_rank(ordered, fraction)
+    return None if value is None else round(value, 1)
+
+
+def _story_meta(plan: StoryPlan, region_data: Dict, seed: int) -> Dict:
+    """The "meta" event of a streamed story."""
+    return {
+        "seed": seed,
+        "title": plan.title,
+        "setting": story_templates.SETTING_TEXT.format(
+            location=region_data["location"], year=plan.year
+        ),
+        "impact": plan.climate_impact,
+        "protagonist": plan.character.to_dict(),
+    }
+
+
+def _template_events(
+    storyteller: ClimateStoryteller,
+    plan: StoryPlan,
+    region_data: Dict,
+    story_length: int,
+    start: float,
+) -> Iterator[Tuple[str, Dict]]:
+    """The "chunk" and "done" events of the template story for a plan."""
+    words, ttft, separator, footer = 1, None, "", ""
+    for section, text in storyteller._iter_story_blocks(
+        plan, region_data, story_length
+    ):
+        words += len(text.split())
+        if section == "footer":
+            footer = text
+        elif section not in ("title", "setting"):
+            if ttft is None:
+                ttft = (time.perf_counter() - start) * 1000
+            yield "chunk", {"text": separator + text}
+            separator = "\n\n"
+    yield "done", {
+        "source": "template",
+        "footer": footer,
+        "word_count": words,
+        "ttft_ms": round(ttft, 1),
+        "complete": True,
+    }
+
+
+def _enrichment(story: Optional[Story]) -> Dict:
+    """The "enriched" event for a JSON model story, or a dropped rewrite."""
+    if story is None:
+        return {"dropped": True}
+    body = [
+        block["text"]
+        for block in json.loads(story)["sections"]
+        if block["section"] not in ("title", "setting", "footer")
+    ]
+    return {
+        "source": story.source,
+        "text": "\n\n".join(body),
+        "word_count": story.word_count,
+    }
+
+
+def iter_story_events(
+    storyteller: ClimateStoryteller,
+    location: str = None,
+    climate_impact: str = None,
+    character_focus: str = None,
+    story_length: int = 1200,
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    The template story as the events of ModelStoryteller.stream_story, for
+    streaming the same way when no model is configured.
+    """
+    start = time.perf_counter()
+    if seed is None:
+        seed = new_seed()
+    plan, region_data = storyteller._plan_story(
+        location, climate_impact, character_focus, seed
+    )
+    yield "meta", _story_meta(plan, region_data, seed)
+    yield from _template_events(storyteller, plan, region_data, story_length, start)
+
+
+class ModelService:
+    """
+    A ModelStoryteller running on an event loop thread of its own, for
+    synchronous callers such as the Flask app.
+
+    The loop, the client and its connections are created on first use in
+    each process, so a service created before gunicorn forks its workers
+    works in every worker. As a ClimateStoryteller's `enricher` it rewrites
+    template stories in the background.
+    """
+
+    def __init__(
+        self,
+        storyteller: ClimateStoryteller,
+        base_url: str,
+        model: str = DEFAULT_MODEL,
+        api_key: Optional[str] = None,
+        deadline: float = 20.0,
+        **client_options,
+    ):
+        """
+        Takes CompletionClient's arguments and ModelStoryteller's deadline.
+        """
+        self.storyteller = storyteller
+        self.deadline = deadline
+        self._client_args = dict(
+            base_url=base_url, model=model, api_key=api_key, **client_options
+        )
+        CompletionClient(**self._client_args)  # reject a bad URL up front
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._narrator = None
+
+    def _start(self) -> Tuple[asyncio.AbstractEventLoop, ModelStoryteller]:
+        """Return this process's loop and narrator, starting them if needed."""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever, name="model-backend", daemon=True
+                    ).start()
+                    self._narrator = ModelStoryteller(
+                        self.storyteller,
+                        CompletionClient(**self._client_args),
+                        self.deadline,
+                    )
+                    self._loop = loop
+                    self._pid = os.getpid()
+        return self._loop, self._narrator
+
+    def _call(self, function, *args):
+        """Call `function` on the loop thread and return its result."""
+        loop, _ = self._start()
+
+        async def call():
+            return function(*args)
+
+        return asyncio.run_coroutine_threadsafe(call(), loop).result()
+
+    def close(self):
+        """Close this process's connections and stop its loop thread."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            loop, narrator = self._loop, self._narrator
+            self._pid = self._loop = self._narrator = None
+        asyncio.run_coroutine_threadsafe(narrator.client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    def stats(self) -> Dict:
+        """ModelStoryteller.stats, for this process."""
+        return self._call(lambda: self._narrator.stats())
+
+    def generate_story(self, **params) -> Story:
+        """ModelStoryteller.generate_story, waiting for the result."""
+        loop, narrator = self._start()
+        return asyncio.run_coroutine_threadsafe(
+            narrator.generate_story(**params), loop
+        ).result()
+
+    def stream_story(self, **params) -> Iterator[Tuple[str, Dict]]:
+        """
+        ModelStoryteller.stream_story's events, as they are produced.
+        Closing the iterator stops the story and its model request.
+        """
+        loop, narrator = self._start()
+        # Unbounded, since the loop thread must never block; a story's
+        # events are bounded by its length
+        events = queue.SimpleQueue()
+
+        async def pump():
+            try:
+                async for event in narrator.stream_story(**params):
+                    events.put(event)
+            except BaseException as e:
+                events.put(e)
+                raise
+            events.put(None)
+
+        pumping = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                if isinstance(event, BaseException):
+                    raise event
+                yield event
+        finally:
+            pumping.cancel()
+
+    def enrich(
+        self,
+        plan: StoryPlan,
+        region_data: Dict,
+        seed: int,
+        story_length: int = 1200,
+        output_format: str = "markdown",
+    ) -> Future:
+        """
+        Have the model write the story of a plan in the background, for
+        ClimateStoryteller's `enricher`. Returns at once with a future of
+        ModelStoryteller.write_story's result: the model's story, or None if
+        it missed the deadline, failed or the breaker is open. Cancelling
+        the future stops the model request.
+        """
+        loop, narrator = self._start()
+        return asyncio.run_coroutine_threadsafe(
+            narrator.write_story(plan, region_data, seed, story_length, output_format),
+            loop,
+        )
+
+    def hedge_story(
+        self,
+        location: str = None,
+        climate_impact: str = None,
+        character_focus: str = None,
+        story_length: int = 1200,
+        seed: Optional[int] = None,
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        The template story's events at once, as iter_story_events yields
+        them but with `enriching` set in "done", while the model writes the
+        same plan; then an "enriched" event with the model's body text,
+        source and word count, or {"dropped": true} if the model missed the
+        deadline, failed or was not called. Closing the iterator stops the
+        model request.
+        """
+        start = time.perf_counter()
+        if seed is None:
+            seed = new_seed()
+        plan, region_data = self.storyteller._plan_story(
+            location, climate_impact, character_focus, seed
+        )
+        rewrite = self.enrich(plan, region_data, seed, story_length, "json")
+        try:
+            yield "meta", _story_meta(plan, region_data, seed)
+            for event, data in _template_events(
+                self.storyteller, plan, region_data, story_length, start
+            ):
+                if event == "done":
+                    data["enriching"] = True
+                yield event, data
+
+            yield "enriched", _enrichment(rewrite.result())
+        finally:
+            rewrite.cancel()
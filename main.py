@@ -6,9 +6,37 @@ This script provides a command-line interface for generating climate change narr
 """
 
 import argparse
+import asyncio
+import os
 import sys
 
-from climate_storyteller import ClimateStoryteller
+from climate_storyteller import (
+    MAX_STORY_LENGTH,
+    STORY_FORMATS,
+    ClimateStoryteller,
+    new_seed,
+)
+from data_sources import open_data_source
+from llm_backend import DEFAULT_MODEL, CompletionClient, ModelStoryteller
+from template_packs import load_template_pack
+
+
+async def write_with_model(storyteller, args, seed):
+    """Write the story with the completion endpoint at args.llm."""
+    async with CompletionClient(
+        args.llm, model=args.llm_model, api_key=os.environ.get("STORY_LLM_API_KEY")
+    ) as client:
+        narrator = ModelStoryteller(storyteller, client, deadline=args.llm_deadline)
+        story = await narrator.generate_story(
+            location=args.location,
+            climate_impact=args.impact,
+            character_focus=args.character,
+            story_length=args.length,
+            seed=seed,
+            output_format=args.format,
+        )
+    print(f"Written by: {story.source}", file=sys.stderr)
+    return story
 
 
 def main():
@@ -21,6 +49,10 @@ Examples:
   python main.py                                    # Generate a random story
   python main.py --location "Miami, Florida"       # Generate story for specific location
   python main.py --impact drought --character rural_farmer  # Specify impact and character
+  python main.py --seed 42                         # Reproduce a story from its seed
+  python main.py --format html -o story.html       # Write the story as HTML
+  python main.py --templates my_pack.yaml          # Use a template pack's prose
+  python main.py --llm http://localhost:8001       # Have a model write the prose
   python main.py --list-locations                  # List available locations
   python main.py --list-impacts                    # List available climate impacts
   python main.py --list-characters                 # List available character types
@@ -53,7 +85,23 @@ Examples:
         "-len",
         type=int,
         default=1200,
-        help="Target word count for the story (default: 1200)",
+        help="Target word count for the story "
+        f"(default: 1200, capped at {MAX_STORY_LENGTH})",
+    )
+
+    parser.add_argument(
+        "--seed",
+        "-s",
+        type=int,
+        help="Seed for reproducible generation (default: random, printed with the story)",
+    )
+
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=list(STORY_FORMATS),
+        default="markdown",
+        help="Output format (default: markdown)",
     )
 
     parser.add_argument(
@@ -63,6 +111,40 @@ Examples:
         help="Output file to save the story (default: print to console)",
     )
 
+    parser.add_argument(
+        "--data",
+        type=str,
+        help="Catalog to use: a JSON directory or SQLite file (default: built-in)",
+    )
+
+    parser.add_argument(
+        "--templates",
+        type=str,
+        help="Template pack with extra or replacement prose (YAML or JSON)",
+    )
+
+    parser.add_argument(
+        "--llm",
+        type=str,
+        default=os.environ.get("STORY_LLM_URL"),
+        help="OpenAI-compatible completion endpoint to write the story with, "
+        "falling back to templates (default: STORY_LLM_URL)",
+    )
+
+    parser.add_argument(
+        "--llm-model",
+        type=str,
+        default=os.environ.get("STORY_LLM_MODEL", DEFAULT_MODEL),
+        help=f"Model name for --llm (default: STORY_LLM_MODEL or {DEFAULT_MODEL})",
+    )
+
+    parser.add_argument(
+        "--llm-deadline",
+        type=float,
+        default=20.0,
+        help="Seconds to wait for the model before using templates (default: 20)",
+    )
+
     parser.add_argument(
         "--list-locations", action="store_true", help="List all available locations"
     )
@@ -78,9 +160,17 @@ Examples:
     )
 
     args = parser.parse_args()
+    # Longer targets fall short on some combinations; cap them as the web
+    # app does, and report the capped length
+    args.length = min(args.length, MAX_STORY_LENGTH)
 
     # Initialize the storyteller
-    storyteller = ClimateStoryteller()
+    try:
+        templates = load_template_pack(args.templates)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Error loading template pack: {e}", file=sys.stderr)
+        sys.exit(1)
+    storyteller = ClimateStoryteller(open_data_source(args.data), templates=templates)
 
     # Handle list commands
     if args.list_locations:
@@ -113,20 +203,39 @@ Examples:
         print(f"Target length: {args.length} words")
         print("-" * 50)
 
-        story = storyteller.generate_story(
-            location=args.location,
-            climate_impact=args.impact,
-            character_focus=args.character,
-            story_length=args.length,
-        )
+        seed = args.seed if args.seed is not None else new_seed()
+        print(f"Seed: {seed}")
 
-        # Output the story
+        if args.llm:
+            sections = [asyncio.run(write_with_model(storyteller, args, seed))]
+        else:
+            sections = storyteller.iter_story(
+                location=args.location,
+                climate_impact=args.impact,
+                character_focus=args.character,
+                story_length=args.length,
+                seed=seed,
+                output_format=args.format,
+            )
+
+        # Output the story, counting words as the sections go by (meaningful
+        # for Markdown and plain text, which carry no markup)
+        word_count = 0
         if args.output:
             with open(args.output, "w", encoding="utf-8") as f:
-                f.write(story)
+                for section in sections:
+                    word_count += len(section.split())
+                    f.write(section)
             print(f"Story saved to {args.output}")
         else:
-            print(story)
+            # Stream each section to the console as soon as it is written
+            for section in sections:
+                word_count += len(section.split())
+                sys.stdout.write(section)
+                sys.stdout.flush()
+            print()
+        if args.format in ("markdown", "text"):
+            print(f"Word count: {word_count}")
 
     except Exception as e:
         print(f"Error generating story: {e}", file=sys.stderr)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Stand-in completion server for testing model-written stories offline.
+
+Serves an OpenAI-compatible `POST /v1/completions`, streamed as server-sent
+events when asked (plus `GET /v1/models` and `GET /health`), over plain
+asyncio, with the latency profile of a hosted model: a log-normally
+distributed time to first token, then tokens at a fixed rate. A bounded
+number of requests decode at once and the rest queue, like a model server's
+batch slots; a request with several prompts decodes them side by side,
+paying a little more prefill per prompt. Errors and stalled requests
+can be injected to exercise deadlines and fallbacks.
+
+The completions are filler prose built from the prompt's outline, one word
+per TOKENS_PER_WORD tokens, so they have a story's shape but no meaning.
+
+    python mock_llm_server.py --port 8001 --ttft 0.4 --tokens-per-second 40
+    python main.py --llm http://127.0.0.1:8001
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from llm_backend import TOKENS_PER_WORD
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Server Error"}
+
+_FILLER = (
+    "The light came in low and amber through the dust.",
+    "Somewhere down the street a generator coughed and caught.",
+    "Neighbors traded news across fences and phone screens.",
+    "Nobody said it aloud, but everyone was counting the days.",
+    "The old routines had bent, and then quietly reshaped themselves.",
+    "Children still ran between the houses, louder than the weather.",
+    "Every plan now came with a second plan folded inside it.",
+    "The radio listed closures in the same calm voice as the news.",
+    "It was not the world anyone had been promised, but it was theirs.",
+    "Small repairs, done together, had started to feel like hope.",
+)
+
+_BEAT = re.compile(r"^\d+\. (.+)$", re.MULTILINE)
+# A streamed token: a word and the whitespace after it
+_TOKEN = re.compile(r"\S+\s*")
+
+
+@dataclass(frozen=True)
+class MockModel:
+    """Latency and failure profile of the stand-in model."""
+
+    ttft: float = 0.35  # median seconds to the first token
+    ttft_spread: float = 0.35  # sigma of the log-normal time to first token
+    tokens_per_second: float = 45.0  # decode rate of each request
+    slots: int = 16  # requests decoded at once; the rest queue
+    batch_prefill: float = 0.15  # extra first-token time per extra prompt
+    error_rate: float = 0.0  # fraction of requests answered with HTTP 500
+    stall_rate: float = 0.0  # fraction of requests that hang for `stall`
+    stall: float = 60.0
+
+
+def mock_completion(prompt: str, tokens: int) -> str:
+    """Filler story text for `prompt`, about `tokens` tokens long."""
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+    beats = _BEAT.findall(prompt) or [rng.choice(_FILLER)]
+    budget = max(1, int(tokens / TOKENS_PER_WORD))
+    per_beat = max(1, budget // len(beats))
+    paragraphs = []
+    for beat in beats:
+        words = beat.split()
+        while len(words) < per_beat:
+            words.extend(rng.choice(_FILLER).split())
+        paragraphs.append(" ".join(words[:per_beat]))
+    return "\n\n".join(paragraphs)
+
+
+class MockCompletionServer:
+    """The stand-in server; `start` binds it, `port` is where it listens."""
+
+    def __init__(self, model: MockModel = MockModel(), seed: Optional[int] = None):
+        self.model = model
+        self.rng = random.Random(seed)
+        self.port = None
+        self.requests = 0
+        self.prompts = 0
+        self.active = 0  # requests holding a decode slot
+        self._slots = asyncio.Semaphore(model.slots)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        """Listen on `host`:`port` (0 picks a free port) and return the server."""
+        server = await asyncio.start_server(self._serve, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer requests on one keep-alive connection until it closes."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                head = (
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                )
+                if isinstance(payload, dict):
+                    data = json.dumps(payload).encode("utf-8")
+                    writer.write(
+                        (
+                            head + "Content-Type: application/json\r\n"
+                            f"Content-Length: {len(data)}\r\n\r\n"
+                        ).encode("latin-1")
+                        + data
+                    )
+                else:
+                    # A stream of server-sent events, one chunk each
+                    writer.write(
+                        (
+                            head + "Content-Type: text/event-stream\r\n"
+                            "Cache-Control: no-cache\r\n"
+                            "Transfer-Encoding: chunked\r\n\r\n"
+                        ).encode("latin-1")
+                    )
+                    try:
+                        async for event in payload:
+                            writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+                            await writer.drain()
+                    finally:
+                        await payload.aclose()
+                    writer.write(b"0\r\n\r\n")
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # shutting down; the connection closes below
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        """Return the status and either a JSON payload or an event stream."""
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/v1/models":
+            return 200, {"object": "list", "data": [{"id": "mock", "object": "model"}]}
+        if method != "POST" or path != "/v1/completions":
+            return 404, _error(f"No route for {method} {path}")
+        try:
+            payload = json.loads(body)
+            prompts = payload["prompt"]
+            if isinstance(prompts, str):
+                prompts = [prompts]
+            max_tokens = int(payload.get("max_tokens", 16))
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, _error(f"Invalid request: {e}")
+        if payload.get("stream"):
+            return 200, self._stream(payload.get("model", "mock"), prompts, max_tokens)
+        return await self._complete(payload.get("model", "mock"), prompts, max_tokens)
+
+    async def _complete(
+        self, model_name: str, prompts: List[str], max_tokens: int
+    ) -> Tuple[int, Dict]:
+        model = self.model
+        rng = self.rng
+        async with self._slots, self._decoding():
+            self.requests += 1
+            self.prompts += len(prompts)
+            if rng.random() < model.stall_rate:
+                await asyncio.sleep(model.stall)
+            if rng.random() < model.error_rate:
+                return 500, _error("Injected failure")
+
+            first_token = rng.lognormvariate(math.log(model.ttft), model.ttft_spread)
+            first_token *= 1 + model.batch_prefill * (len(prompts) - 1)
+            lengths = [rng.randint(max_tokens * 3 // 4, max_tokens) for _ in prompts]
+            await asyncio.sleep(first_token + max(lengths) / model.tokens_per_second)
+
+        choices = [
+            {
+                "index": i,
+                "text": mock_completion(prompt, tokens),
+                "logprobs": None,
+                "finish_reason": "length" if tokens == max_tokens else "stop",
+            }
+            for i, (prompt, tokens) in enumerate(zip(prompts, lengths))
+        ]
+        prompt_tokens = sum(
+            int(len(prompt.split()) * TOKENS_PER_WORD) for prompt in prompts
+        )
+        return 200, {
+            "id": f"cmpl-mock-{self.requests}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": model_name,
+            "choices": choices,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": sum(lengths),
+                "total_tokens": prompt_tokens + sum(lengths),
+            },
+        }
+
+
+    async def _stream(
+        self, model_name: str, prompts: List[str], max_tokens: int
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the completions of `prompts` as server-sent events, each token
+        when its time comes. An injected failure is an error event.
+        """
+        model = self.model
+        rng = self.rng
+        loop = asyncio.get_running_loop()
+        async with self._slots, self._decoding():
+            self.requests += 1
+            self.prompts += len(prompts)
+            if rng.random() < model.stall_rate:
+                await asyncio.sleep(model.stall)
+            if rng.random() < model.error_rate:
+                yield _event(_error("Injected failure"))
+                return
+
+            first_token = rng.lognormvariate(math.log(model.ttft), model.ttft_spread)
+            first_token *= 1 + model.batch_prefill * (len(prompts) - 1)
+            await asyncio.sleep(first_token)
+
+            # Tokens of every prompt, interleaved as they would be decoded
+            streams = [
+                (i, _TOKEN.findall(mock_completion(prompt, tokens)))
+                for i, (prompt, tokens) in enumerate(
+                    (prompt, rng.randint(max_tokens * 3 // 4, max_tokens))
+                    for prompt in prompts
+                )
+            ]
+            interval = TOKENS_PER_WORD / model.tokens_per_second
+            start = loop.time()
+            for position in range(max(len(tokens) for _, tokens in streams)):
+                # Sleep in ticks of at least 10 ms, sending what is due
+                due = start + position * interval
+                if due - loop.time() > 0.01:
+                    await asyncio.sleep(due - loop.time())
+                for i, tokens in streams:
+                    if position < len(tokens):
+                        yield _event(
+                            {
+                                "id": f"cmpl-mock-{self.requests}",
+                                "object": "text_completion",
+                                "created": int(time.time()),
+                                "model": model_name,
+                                "choices": [
+                                    {
+                                        "index": i,
+                                        "text": tokens[position],
+                                        "logprobs": None,
+                                        "finish_reason": None,
+                                    }
+                                ],
+                            }
+                        )
+        yield b"data: [DONE]\n\n"
+
+
+    @contextlib.asynccontextmanager
+    async def _decoding(self):
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+
+
+def _event(payload: Dict) -> bytes:
+    return b"data: %s\n\n" % json.dumps(payload).encode("utf-8")
+
+
+def _error(message: str) -> Dict:
+    return {"error": {"message": message, "type": "mock_error"}}
+
+
+async def _serve_forever(args):
+    model = MockModel(
+        ttft=args.ttft,
+        ttft_spread=args.ttft_spread,
+        tokens_per_second=args.tokens_per_second,
+        slots=args.slots,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+    )
+    mock = MockCompletionServer(model, args.seed)
+    server = await mock.start(args.host, args.port)
+    print(f"Mock completion server on http://{args.host}:{mock.port} ({model})")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Command line entry point: run the stand-in server."""
+    defaults = MockModel()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft", type=float, default=defaults.ttft)
+    parser.add_argument("--ttft-spread", type=float, default=defaults.ttft_spread)
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=defaults.tokens_per_second
+    )
+    parser.add_argument("--slots", type=int, default=defaults.slots)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--stall-rate", type=float, default=defaults.stall_rate)
+    parser.add_argument("--seed", type=int, help="seed for latencies and failures")
+    try:
+        asyncio.run(_serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Precomputed HTTP responses for the Climate Futures Storyteller.
+
+Some responses change only when the catalog does, such as the lists of
+locations, impacts and characters, or never while the process runs, such as
+the page itself. Those are encoded once: the body, a strong ETag derived from
+its content, and compressed variants for clients that accept them. Serving
+one is then a header comparison and a dictionary lookup, and a client that
+already holds the current version gets 304 Not Modified.
+
+The web interface and the ASGI app share these; each turns `select` and
+`headers` into a response of its own kind.
+"""
+
+import gzip
+import hashlib
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; pages then get deflate instead
+    brotli = None
+
+# One day; clients revalidate with the ETag after that
+DEFAULT_MAX_AGE = 24 * 3600
+
+# Compressors by content coding, at their slowest and smallest settings
+COMPRESSORS = {
+    "gzip": lambda body: gzip.compress(body, 9, mtime=0),
+    "deflate": lambda body: zlib.compress(body, 9),
+}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=11)
+
+# Codings worth the one-off cost for larger bodies, in order of preference
+BEST_CODINGS = ("br", "gzip") if brotli is not None else ("gzip", "deflate")
+
+
+def _accepted_codings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """The content codings of an Accept-Encoding header, with their q-values."""
+    codings = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding.lower()] = quality
+    return codings
+
+
+class PrecomputedResponse:
+    """
+    An encoded response body with its ETag and compressed variants.
+
+    Variants are only kept when they are smaller than the body, and are
+    offered in the order they were added. Each has a strong ETag of its own,
+    as different codings of a resource must, derived from the same digest.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        content_type: str,
+        max_age: int = DEFAULT_MAX_AGE,
+        codings: Sequence[str] = ("gzip",),
+    ):
+        """
+        Args:
+            body: The encoded response body
+            content_type: Its Content-Type
+            max_age: Seconds clients may use it before revalidating
+            codings: Content codings of COMPRESSORS to offer, preferred first
+        """
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = f"public, max-age={max_age}"
+        self._digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{self._digest}"'
+        # Content coding -> (body, ETag), in order of preference
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+        for coding in codings:
+            self.add_variant(coding, COMPRESSORS[coding](body))
+
+    def add_variant(self, coding: str, body: bytes):
+        """Offer `body`, compressed with `coding`, if it saves any bytes."""
+        if len(body) < len(self.body):
+            self.variants[coding] = (body, f'"{self._digest}-{coding}"')
+
+    def select(
+        self, accept_encoding: Optional[str]
+    ) -> Tuple[bytes, str, Optional[str]]:
+        """
+        The body, ETag and content coding (None for none) to send to a client
+        with `accept_encoding`.
+        """
+        if self.variants and accept_encoding:
+            accepted = _accepted_codings(accept_encoding)
+            for coding, (body, etag) in self.variants.items():
+                if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                    return body, etag, coding
+        return self.body, self.etag, None
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """
+        Whether an If-None-Match header names this version, in any coding.
+        Tags compare weakly, as RFC 9110 requires for If-None-Match.
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return self.etag in tags or any(
+            etag in tags for _, etag in self.variants.values()
+        )
+
+    def headers(self, etag: str, coding: Optional[str]) -> List[Tuple[str, str]]:
+        """Caching headers of a response with `etag` in `coding`."""
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", self.cache_control),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if coding is not None:
+            headers.append(("Content-Encoding", coding))
+        return headers
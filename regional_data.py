@@ -396,3 +396,23 @@ CHARACTER_TEMPLATES = {
         ],
     },
 }
+
+# Human-form names that don't normalize to a canonical location key.
+# Keys are already normalized (lowercase, underscores between words).
+LOCATION_ALIASES = {
+    "miami": "miami_florida",
+    "miami_fl": "miami_florida",
+    "bangladesh": "bangladesh_delta",
+    "ganges_delta": "bangladesh_delta",
+    "american_southwest": "southwestern_usa",
+    "southwest_usa": "southwestern_usa",
+    "us_southwest": "southwestern_usa",
+    "sahel": "sahel_africa",
+    "the_sahel": "sahel_africa",
+    "himalaya": "himalayas",
+    "the_himalayas": "himalayas",
+    "new_york": "new_york_city",
+    "new_york_ny": "new_york_city",
+    "nyc": "new_york_city",
+    "nairobi_kenya": "nairobi",
+}
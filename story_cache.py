@@ -0,0 +1,78 @@
+"""
+Byte-budgeted LRU cache for rendered stories.
+
+The web interface keeps recently generated stories (or their encoded JSON
+responses) here, so repeated requests for the same parameters and seed skip
+generation. The cache is bounded by the total size of its values rather than
+by entry count, since stories vary several-fold in length.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable
+
+
+class ByteBudgetLRU:
+    """
+    Thread-safe LRU mapping whose values are charged a size in bytes.
+
+    Inserting past `max_bytes` evicts least recently used entries until the
+    new value fits; a value larger than the whole budget is not stored.
+    Hits, misses and evictions are counted for `stats`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        """Return the value for `key` and mark it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value, size: int):
+        """Store `value` under `key`, charging it `size` bytes."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            while self._entries and self._bytes + size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+    def clear(self):
+        """Drop every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Return the hit, miss and eviction counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
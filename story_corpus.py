@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Prebuilt story corpus for the Climate Futures Storyteller.
+
+A corpus is a single binary file of pre-generated stories that a reader maps
+into memory with `mmap`, so serving a story costs a few index lookups and no
+generation. Every process that maps the same file shares it through the page
+cache.
+
+File layout (all integers little-endian):
+
+    header     magic b"CFSC", version, story count and the offsets of the
+               sections below
+    blobs      one u32 byte length + UTF-8 text per story
+    index      one u64 file offset per story, pointing at its length prefix
+    metadata   one fixed-width record per story: location, impact and
+               character ids (u16 each) and the seed (u64)
+    groups     one record per (location, impact, character) combination: the
+               three ids, the index of its first story and its story count
+    names      JSON object of the location, impact and character names the
+               ids refer to, plus the target story length
+
+Stories are written sorted by (location, impact, character), so every
+combination is a contiguous run of indices and filtered lookups only touch
+the small group table.
+
+Build a corpus from the command line:
+
+    python story_corpus.py build -n 100000 -o stories.cfsc
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from climate_storyteller import SEED_BITS, ClimateStoryteller, new_seed
+
+MAGIC = b"CFSC"
+VERSION = 1
+
+# magic, version, reserved, count, then the blobs, index, metadata, groups
+# and names offsets
+_HEADER = struct.Struct("<4sHHQQQQQQ")
+_LENGTH = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+# location id, impact id, character id, padding, seed
+_METADATA = struct.Struct("<HHHxxQ")
+# location id, impact id, character id, padding, first index, count
+_GROUP = struct.Struct("<HHHxxQQ")
+
+
+def build_corpus(
+    path: str,
+    n: int,
+    storyteller: Optional[ClimateStoryteller] = None,
+    seed: Optional[int] = None,
+    story_length: int = 1200,
+) -> int:
+    """
+    Generate `n` random stories and write them to a corpus file at `path`.
+
+    Locations, impacts and characters are drawn uniformly, like
+    `generate_story` does, and every story gets its own seed, recorded in the
+    metadata table so it can be regenerated. The same `seed` always builds
+    the same corpus. The file is written next to `path` and moved into place
+    once complete, so readers never see a partial corpus.
+
+    Returns:
+        Number of bytes written
+    """
+    storyteller = storyteller or ClimateStoryteller()
+    rng = random.Random(new_seed() if seed is None else seed)
+    locations = storyteller.list_available_locations()
+    impacts = storyteller.list_available_impacts()
+    characters = storyteller.list_available_characters()
+
+    # Draw every story's parameters up front, then write them grouped
+    specs = sorted(
+        (
+            rng.randrange(len(locations)),
+            rng.randrange(len(impacts)),
+            rng.randrange(len(characters)),
+            rng.getrandbits(SEED_BITS),
+        )
+        for _ in range(n)
+    )
+
+    offsets = array("Q")
+    metadata = bytearray()
+    groups = bytearray()
+    names = json.dumps(
+        {
+            "locations": locations,
+            "impacts": impacts,
+            "characters": characters,
+            "story_length": story_length,
+        }
+    ).encode("utf-8")
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(bytes(_HEADER.size))
+        blobs_offset = f.tell()
+
+        group = None
+        for index, (location, impact, character, story_seed) in enumerate(specs):
+            if group != (location, impact, character):
+                if group is not None:
+                    groups += _GROUP.pack(*group, first, index - first)
+                group, first = (location, impact, character), index
+
+            text = storyteller.generate_story(
+                location=locations[location],
+                climate_impact=impacts[impact],
+                character_focus=characters[character],
+                story_length=story_length,
+                seed=story_seed,
+            ).encode("utf-8")
+            offsets.append(f.tell())
+            f.write(_LENGTH.pack(len(text)))
+            f.write(text)
+            metadata += _METADATA.pack(location, impact, character, story_seed)
+        if group is not None:
+            groups += _GROUP.pack(*group, first, n - first)
+
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        index_offset = f.tell()
+        f.write(offsets.tobytes())
+        metadata_offset = f.tell()
+        f.write(metadata)
+        groups_offset = f.tell()
+        f.write(groups)
+        names_offset = f.tell()
+        f.write(names)
+        size = f.tell()
+
+        f.seek(0)
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                0,
+                n,
+                blobs_offset,
+                index_offset,
+                metadata_offset,
+                groups_offset,
+                names_offset,
+            )
+        )
+
+    os.replace(temporary, path)
+    return size
+
+
+class StoryCorpus:
+    """
+    Read-only, memory-mapped view of a corpus file written by `build_corpus`.
+
+    Opening a corpus reads only the header, the group table and the names;
+    stories stay in the mapping until asked for. `story_bytes` returns a
+    zero-copy view, and `story` decodes one story into a string.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (
+            magic,
+            version,
+            _,
+            self._count,
+            _,
+            self._index_offset,
+            self._metadata_offset,
+            groups_offset,
+            names_offset,
+        ) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} story corpus")
+
+        names = json.loads(self._view[names_offset:].tobytes())
+        self.locations = names["locations"]
+        self.impacts = names["impacts"]
+        self.characters = names["characters"]
+        self.story_length = names["story_length"]
+        self._ids = (
+            {name: i for i, name in enumerate(self.locations)},
+            {name: i for i, name in enumerate(self.impacts)},
+            {name: i for i, name in enumerate(self.characters)},
+        )
+
+        # Index ranges per (location, impact, character) id pattern, where
+        # None stands for any value, with cumulative sizes for sampling
+        self._groups = {}
+        for offset in range(groups_offset, names_offset, _GROUP.size):
+            *key, first, count = _GROUP.unpack_from(self._mmap, offset)
+            for pattern in product(*((value, None) for value in key)):
+                ranges, totals = self._groups.setdefault(pattern, ([], [0]))
+                ranges.append((first, first + count))
+                totals.append(totals[-1] + count)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        """Release the memory mapping; views from `story_bytes` must be gone."""
+        self._view.release()
+        self._mmap.close()
+
+    def story_bytes(self, index: int) -> memoryview:
+        """Return the UTF-8 text of story `index` as a zero-copy view."""
+        if not 0 <= index < self._count:
+            raise IndexError(f"story index {index} out of range")
+        (offset,) = _OFFSET.unpack_from(self._mmap, self._index_offset + 8 * index)
+        (length,) = _LENGTH.unpack_from(self._mmap, offset)
+        start = offset + _LENGTH.size
+        return self._view[start : start + length]
+
+    def story(self, index: int) -> str:
+        """Return the text of story `index`."""
+        return str(self.story_bytes(index), "utf-8")
+
+    def metadata(self, index: int) -> Dict:
+        """Return the location, impact, character and seed of story `index`."""
+        if not 0 <= index < self._count:
+            raise IndexError(f"story index {index} out of range")
+        location, impact, character, seed = _METADATA.unpack_from(
+            self._mmap, self._metadata_offset + _METADATA.size * index
+        )
+        return {
+            "location": self.locations[location],
+            "impact": self.impacts[impact],
+            "character": self.characters[character],
+            "seed": seed,
+        }
+
+    def find(
+        self,
+        location: Optional[str] = None,
+        impact: Optional[str] = None,
+        character: Optional[str] = None,
+    ) -> List[Tuple[int, int]]:
+        """
+        Return the (start, stop) index ranges of the matching stories.
+
+        Filters left as None match anything; unknown names match nothing.
+        """
+        pattern = self._pattern(location, impact, character)
+        if pattern is None or pattern not in self._groups:
+            return []
+        return list(self._groups[pattern][0])
+
+    def iter_matching(
+        self,
+        location: Optional[str] = None,
+        impact: Optional[str] = None,
+        character: Optional[str] = None,
+    ) -> Iterator[int]:
+        """Yield the indices of the matching stories, in corpus order."""
+        for start, stop in self.find(location, impact, character):
+            yield from range(start, stop)
+
+    def random_index(
+        self,
+        location: Optional[str] = None,
+        impact: Optional[str] = None,
+        character: Optional[str] = None,
+        rng: Optional[random.Random] = None,
+    ) -> Optional[int]:
+        """
+        Pick a uniformly random matching story; None when nothing matches.
+        """
+        pattern = self._pattern(location, impact, character)
+        if pattern is None or pattern not in self._groups:
+            return None
+        ranges, totals = self._groups[pattern]
+        pick = (rng or random).randrange(totals[-1])
+        position = bisect_right(totals, pick) - 1
+        return ranges[position][0] + pick - totals[position]
+
+    def _pattern(self, location, impact, character) -> Optional[Tuple]:
+        """Translate name filters to an id pattern; None if a name is unknown."""
+        pattern = []
+        for ids, name in zip(self._ids, (location, impact, character)):
+            if name is None:
+                pattern.append(None)
+            elif name in ids:
+                pattern.append(ids[name])
+            else:
+                return None
+        return tuple(pattern)
+
+
+def main():
+    """Command line entry point: build or inspect a corpus."""
+    parser = argparse.ArgumentParser(
+        description="Build or inspect a prebuilt Climate Futures story corpus"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Generate stories into a corpus file")
+    build.add_argument("--output", "-o", required=True, help="Corpus file to write")
+    build.add_argument("-n", type=int, default=10000, help="Number of stories")
+    build.add_argument("--seed", "-s", type=int, help="Seed for the whole corpus")
+    build.add_argument(
+        "--length", "-len", type=int, default=1200, help="Target words per story"
+    )
+
+    info = commands.add_parser("info", help="Summarize a corpus file")
+    info.add_argument("path", help="Corpus file to read")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        size = build_corpus(
+            args.output, args.n, seed=args.seed, story_length=args.length
+        )
+        print(f"Wrote {args.n} stories to {args.output} ({size:,} bytes)")
+    else:
+        corpus = StoryCorpus(args.path)
+        print(f"{len(corpus)} stories, target length {corpus.story_length} words")
+        for location in corpus.locations:
+            ranges = corpus.find(location=location)
+            print(f"  {location}: {sum(stop - start for start, stop in ranges)}")
+        corpus.close()
+
+
+if __name__ == "__main__":
+    main()
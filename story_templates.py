@@ -0,0 +1,402 @@
+"""
+Story prose fragments for the Climate Futures Storyteller.
+
+Each scene template uses ``str.format`` placeholders (``{name}``,
+``{pregnancy_stage}``, ...) that are filled in per story. Character-independent
+passages are plain text and get folded into the scene templates once, when
+ClimateStoryteller compiles its fragment registry.
+"""
+
+# Fallback key used for climate impacts without a dedicated template
+DEFAULT_IMPACT = "*"
+
+# Professions that switch the maternal-health variants on
+MATERNAL_PERSONAS = ("pregnant_woman", "new_mother")
+
+NAMES = (
+    "Maria",
+    "Ahmed",
+    "Sarah",
+    "Chen",
+    "Fatima",
+    "James",
+    "Priya",
+    "Diego",
+    "Aisha",
+    "Michael",
+    "Yuki",
+    "Carlos",
+    "Nadia",
+    "David",
+    "Lakshmi",
+    "Hassan",
+)
+
+PERSONAL_BACKGROUNDS = {
+    "coastal_community": (
+        "grew up by the water, learned to fish from grandparents",
+        "moved here for work, fell in love with the ocean",
+        "family has lived here for generations, watching the tides change",
+    ),
+    "urban_worker": (
+        "came to the city for opportunities, now navigating new challenges",
+        "born and raised in the neighborhood, seeing it transform",
+        "moved here recently, learning to adapt to urban climate impacts",
+    ),
+    "rural_farmer": (
+        "inherited the family farm, learning new ways to work the land",
+        "started farming after a career change, embracing sustainable practices",
+        "grew up in the countryside, now teaching others about adaptation",
+    ),
+    "pregnant_woman": (
+        "discovered she was pregnant just as the climate impacts became more severe",
+        "had her first child during a drought, now expecting her second during floods",
+        "moved to the city for better healthcare, but climate change is making access difficult",
+    ),
+    "new_mother": (
+        "gave birth during the worst heatwave in years, now caring for her newborn",
+        "had her baby during flooding season, learning to navigate motherhood in crisis",
+        "became a mother in a time of climate uncertainty, adapting daily to new challenges",
+    ),
+    "healthcare_worker": (
+        "trained as a community health worker to serve her community during climate crises",
+        "became a midwife to help women give birth safely despite climate challenges",
+        "works as a nurse, seeing firsthand how climate change affects maternal health",
+    ),
+}
+DEFAULT_PERSONAL_BACKGROUNDS = ("adapting to changing times",)
+
+PREGNANCY_STAGES = (
+    "in her first trimester",
+    "in her second trimester",
+    "in her third trimester",
+    "expecting her first child",
+    "carrying her second child",
+    "pregnant with twins",
+)
+
+BEFORE_MEMORIES = {
+    "coastal_community": (
+        "the morning jog along the beach was a daily ritual",
+        "the sound of waves was the soundtrack to every evening",
+        "fishing trips were about adventure, not necessity",
+        "the community gathered on the pier every sunset",
+    ),
+    "urban_worker": (
+        "the subway was crowded but reliable",
+        "summer meant outdoor festivals and street fairs",
+        "the city's energy was infectious and constant",
+        "weekend walks through the park were restorative",
+    ),
+    "rural_farmer": (
+        "the seasons followed a predictable pattern",
+        "the sound of rain on the roof was music",
+        "the harvest was a time of celebration and abundance",
+        "the land provided everything the community needed",
+    ),
+}
+DEFAULT_BEFORE_MEMORIES = ("life was simpler",)
+
+TITLES = {
+    "sea_level_rise": (
+        "The New Shoreline",
+        "When the Water Came",
+        "Rising Tides, Rising Hope",
+        "The Last Beach House",
+    ),
+    "drought": (
+        "The Thirsty Season",
+        "When the Rains Stopped",
+        "Learning to Live with Less",
+        "The Water Keepers",
+    ),
+    "extreme_heat": (
+        "The Long Summer",
+        "When the Air Burned",
+        "Finding Shade",
+        "The Cool Places",
+    ),
+    "wildfire": (
+        "The Orange Sky",
+        "When the Mountains Burned",
+        "Learning to Live with Fire",
+        "The Fire Keepers",
+    ),
+    "flooding_events": (
+        "When the Roads Disappeared",
+        "The Water Between Us",
+        "Flooded Paths, Open Hearts",
+        "Rising Waters, Rising Hope",
+    ),
+    "vector_borne_diseases": (
+        "The Buzz of Danger",
+        "When Mosquitoes Multiply",
+        "Protecting Two Lives",
+        "The Invisible Threat",
+    ),
+    DEFAULT_IMPACT: ("Adapting to Change",),
+}
+
+MATERNAL_TITLES = {
+    "flooding_events": (
+        "The Road to the Clinic",
+        "When Water Blocks the Way",
+        "Flooded Paths, Mother's Heart",
+        "The Journey Through Water",
+    ),
+    "extreme_heat": (
+        "The Heat of New Life",
+        "When the Sun Burns Too Bright",
+        "Cooling the Fire Within",
+        "The Longest Summer",
+    ),
+    "vector_borne_diseases": (
+        "The Buzz of Fear",
+        "Protecting Two Hearts",
+        "When Mosquitoes Threaten Life",
+        "The Invisible Enemy",
+    ),
+}
+
+OPENING_SCENES = {
+    "sea_level_rise": "I never thought I'd need a boat to get to my own front door. But here I am, {name}, paddling through what used to be my neighborhood street, past the old oak tree that now stands knee-deep in brackish water.",
+    "drought": "The sound of water is different now. {name} remembers when the river used to rush past their window, but today it's just a trickle, and the silence is deafening.",
+    "extreme_heat": "At 6 AM, the air already feels like a warm blanket. {name} steps outside and immediately feels the weight of the day ahead, knowing that by noon, the streets will be empty and the city will retreat indoors.",
+    "wildfire": "The sky is orange again today. {name} has learned to read the color of the horizon like a weather forecast, and this particular shade means another day of staying inside, windows closed against the smoke.",
+    "flooding_events": "The rain started three days ago, and now {name} watches the water rise around their home, knowing that today's antenatal appointment might be impossible to reach.",
+    "vector_borne_diseases": "The mosquitoes are worse this year, and {name} feels their constant buzz as a threat to the life growing inside her, knowing that malaria during pregnancy can be devastating.",
+    DEFAULT_IMPACT: "{name} wakes up to another day of change.",
+}
+
+MATERNAL_OPENING_SCENES = {
+    "flooding_events": "The water has cut off the road to the clinic again. {name}, {pregnancy_stage}, feels her baby kick as she watches the floodwaters rise, wondering how she'll make it to her antenatal appointment.",
+    "extreme_heat": "The heat is unbearable today, and {name} feels her body struggling under the weight of both pregnancy and the scorching sun, knowing that heat stress can be dangerous for her unborn child.",
+    "vector_borne_diseases": "The mosquitoes are relentless this season, and {name} feels their constant presence as a threat to her pregnancy, knowing that malaria can cause complications for both her and her baby.",
+}
+
+BEFORE_SCENE = "Back in {before_year}, things were different. {name} remembers when {memory}. The rhythm of daily life was predictable, comfortable, taken for granted."
+
+TRANSITION = "But change came gradually, then suddenly. {name} noticed the small things first - {early_signs}. Then the big changes started happening faster than anyone expected."
+
+EARLY_SIGNS = {
+    "sea_level_rise": "the high tides reaching further up the beach, the storm drains backing up more often",
+    "drought": "the wells running dry earlier each year, the crops needing more water than before",
+    "extreme_heat": "the summer days getting longer and hotter, the nights offering less relief",
+    "wildfire": "the fire season starting earlier each year, the smoke becoming a regular visitor",
+    DEFAULT_IMPACT: "the small changes that added up",
+}
+
+PRESENT_CHALLENGES = "Now, in {region_year}, {name} faces new realities every day. {challenge}"
+
+CHALLENGES = {
+    "sea_level_rise": "The water has claimed {name}'s favorite walking path, and the insurance company won't cover the flood damage anymore. Every storm brings new anxiety about what might be lost next.",
+    "drought": "{name} has learned to measure water in drops, not gallons. The garden that once fed the family now struggles to survive, and the community well runs dry by mid-summer.",
+    "extreme_heat": "The heat has reshaped {name}'s entire day. Work starts at dawn and ends by noon, and the afternoons are spent in whatever cool place can be found.",
+    "wildfire": "Every summer, {name} keeps a bag packed by the door. The evacuation orders come with little warning, and the smoke makes it hard to breathe even when the flames are miles away.",
+    "flooding_events": "The roads to the clinic are impassable again, and {name} worries about missing critical antenatal appointments. The floodwaters have cut off access to healthcare when it's needed most.",
+    "vector_borne_diseases": "The mosquitoes are relentless this season, and {name} feels their constant presence as a threat to her pregnancy, knowing that malaria can cause complications for both her and her baby.",
+    DEFAULT_IMPACT: "{name} faces new challenges every day.",
+}
+
+MATERNAL_CHALLENGES = {
+    "flooding_events": "The floodwaters have cut off the road to the clinic, and {name}, {pregnancy_stage}, worries about missing her antenatal appointment. She can feel her baby kick as she watches the water rise, wondering how she'll get the care she needs.",
+    "extreme_heat": "The heat is unbearable, and {name} feels her body struggling under the weight of both pregnancy and the scorching sun. She knows heat stress can be dangerous for her unborn child, but she must continue working to support her family.",
+    "vector_borne_diseases": "The mosquitoes are worse this year, and {name} feels their constant buzz as a threat to the life growing inside her. She knows malaria during pregnancy can cause premature birth, low birth weight, or even death for her baby.",
+}
+
+ADAPTATIONS = "But {name} has learned to adapt. {adaptation}"
+
+ADAPTATION_DESCRIPTIONS = {
+    "sea_level_rise": "The house now sits on stilts, and {name} has learned to navigate the neighborhood by boat. The community has built floating gardens and installed pumps that run on solar power.",
+    "drought": "{name} has become a master of water conservation, collecting every drop of rainwater and growing drought-resistant crops. The community shares resources and knowledge about sustainable farming.",
+    "extreme_heat": "The home has been retrofitted with better insulation and cooling systems that run on renewable energy. {name} has learned to work with the heat, not against it.",
+    "wildfire": "The property has been cleared of flammable materials, and {name} has learned to read the wind and weather patterns. The community has established early warning systems and evacuation plans.",
+    "flooding_events": "The community has established emergency transport systems and mobile clinics that can reach flooded areas. {name} has learned to identify safe routes and alternative healthcare options when the main roads are impassable.",
+    "vector_borne_diseases": "The community has implemented comprehensive mosquito control measures and distributed insecticide-treated nets. {name} has learned to protect herself and her family through proper net usage and environmental management.",
+    DEFAULT_IMPACT: "{name} has found new ways to thrive.",
+}
+
+MATERNAL_ADAPTATION_DESCRIPTIONS = {
+    "flooding_events": "The community has established emergency transport systems and mobile clinics that can reach flooded areas. {name} has learned to identify safe routes and alternative healthcare options when the main roads are impassable. Community health workers now make home visits during floods to ensure pregnant women receive the care they need.",
+    "extreme_heat": "The community has set up cooling centers and shade structures where pregnant women can rest during the hottest parts of the day. {name} has learned to adjust her work schedule and stay hydrated, while community health workers provide regular check-ups to monitor her and her baby's health.",
+    "vector_borne_diseases": "The community has implemented comprehensive mosquito control measures and distributed insecticide-treated nets. {name} has learned to protect herself and her unborn child through proper net usage, environmental management, and regular malaria prevention medication. Community health workers provide education and support to ensure safe pregnancies.",
+}
+
+COMMUNITY_RESPONSE = "The community has come together in ways {name} never expected. {response}"
+
+COMMUNITY_RESPONSES = {
+    "sea_level_rise": "Neighbors help each other with flood preparations, share boats for transportation, and work together to maintain the community's resilience.",
+    "drought": "The community has established water-sharing agreements, created community gardens, and organized workshops on sustainable living.",
+    "extreme_heat": "Cooling centers have been set up in community buildings, and neighbors check on each other during heat waves, especially the elderly and vulnerable.",
+    "wildfire": "The community has formed fire watch groups, established evacuation protocols, and created support networks for those who have lost homes.",
+    DEFAULT_IMPACT: "The community has found strength in working together.",
+}
+
+REFLECTION = "As {name} looks out at the changed landscape, there's a mix of loss and hope. The world is different now, but the human spirit of adaptation and community resilience shines through. {ending}"
+
+HOPEFUL_ENDINGS = {
+    "sea_level_rise": "The water may have claimed some land, but it has also brought the community closer together, creating new ways of living that are more connected to the natural world.",
+    "drought": "The scarcity of water has taught the community to value every resource, creating a more sustainable way of life that honors the land and each other.",
+    "extreme_heat": "The heat has forced innovation and adaptation, leading to new technologies and community practices that are more resilient and sustainable.",
+    "wildfire": "The fires have taught the community to respect the power of nature while building stronger bonds and more resilient communities.",
+    DEFAULT_IMPACT: "The challenges have brought out the best in people, creating new possibilities for the future.",
+}
+
+DEFAULT_SENSORY_DETAILS = "The world feels different now."
+DEFAULT_DAILY_CHANGES = "Daily life has changed in ways both small and large."
+
+# Layout lines around the scenes, as plain text and in Markdown
+SETTING_TEXT = "A climate futures story set in {location}, {year}"
+FOOTER_TEXT = "This story is part of the Climate Futures Storyteller project, creating narratives that help us understand and connect with the human experience of climate change."
+TITLE_LINE = "# {title}"
+SETTING_LINE = "*" + SETTING_TEXT + "*"
+FOOTER = "*" + FOOTER_TEXT + "*"
+
+# Optional passages, included or left out to honor story_length. Listed in
+# the order they are considered: the closing paragraphs first, then scene and
+# adaptation expansions, the emotional passage, general passages and finally
+# the short regional detail sentences that fine-tune the length.
+SENSORY_PASSAGE = "The sensory details are everywhere: {sensory_details}"
+DAILY_CHANGES_PASSAGE = "Daily life has transformed: {daily_changes}"
+PERSONAL_PASSAGE = "For {name}, this journey has been deeply personal. {personal_story}, and now {name} is part of a community learning to thrive in a changing world."
+CULTURAL_PASSAGE = "The cultural context of {location} adds another layer to this story. {cultural_context}, and this heritage provides both challenges and strengths as the community adapts to new realities."
+SCIENCE_PASSAGE = "This story reflects the reality of climate change as we understand it in 2025: {global_temperature}, with {extreme_weather}, and {sea_level_rise}. The impacts are real, but so is the human capacity for adaptation and resilience."
+EMOTIONAL_PASSAGE = "Beneath the new routines runs a feeling {name} still struggles to name. {emotional_impact}."
+
+# Scene expansions follow the present-challenges scene
+SCENE_EXPANSIONS = {
+    "sea_level_rise": (
+        "Mornings start with the tide tables now. {name} checks them before coffee, before the news, before anything else, because the water decides which streets are open, which stores will be dry, and whether the school bus can make its usual run along the old shore road.",
+        "The old boardwalk is gone, pulled up plank by plank after the third storm in two years. In its place the city has planted marsh grass and oyster reefs, and {name} has learned to love the strange new shoreline, even if it sits a little closer to home every season.",
+        "At the hardware store, the shelves that once held garden hoses are stacked with sandbags, sump pumps and waterproof sealant. {name} knows the owner by name now, and they trade stories about flooded basements the way neighbors used to trade stories about fishing.",
+        "Some families have already left. Their houses stand empty with plywood over the windows and realtor signs fading in the salt air. {name} walks past them on the way to work and wonders who will be next, and whether staying is courage or stubbornness.",
+        "On calm evenings the water is beautiful, silver and still under a wide sky. {name} sits on the raised porch and watches herons hunt in what used to be the neighbor's lawn, holding grief and wonder in the same breath.",
+    ),
+    "drought": (
+        "Every morning begins with the same ritual: {name} checks the rain gauge, knowing it will be empty, then checks the water tank, knowing it will be lower than yesterday. The numbers go into a notebook that has become a kind of diary of the dry years.",
+        "The reservoir outside town has shrunk to a cracked basin, and old fence lines and a drowned church steeple have surfaced from the mud. People drive out on weekends to look at them, as if visiting a museum of what the land used to be.",
+        "Water trucks arrive on Tuesdays and Fridays. {name} waits in line with buckets and jerry cans, listening to neighbors compare notes on which crops survived, which wells still pump, and which families have decided to move somewhere wetter.",
+        "Dust storms come without much warning now, turning the afternoon sky the color of weak tea. {name} keeps damp cloths by the door and tape for the window frames, and has learned to hear the wind change before the dust arrives.",
+        "When rain finally comes, it comes hard, running off the baked ground instead of soaking in. {name} stands outside anyway, face turned up, letting it fall, because even a brief storm feels like a gift after so many dry months.",
+    ),
+    "extreme_heat": (
+        "The day is organized around the thermometer. {name} runs errands before seven, sleeps through the worst of the afternoon, and comes back to life after sunset, when the streets fill again with people walking, talking and buying food from late-night stalls.",
+        "The power grid strains every evening as air conditioners hum across the city. {name} has memorized the rolling blackout schedule and keeps frozen water bottles, a battery fan and a list of cooling centers taped to the refrigerator door.",
+        "Heat has changed the city's sounds. Construction crews work under floodlights at night, the parks stay empty at midday, and ambulance sirens rise on the hottest afternoons. {name} listens to them and thinks about the elderly neighbors who live alone.",
+        "Trees have become precious. The city pays residents to plant and water them, and {name} tends a young shade tree outside the building with the same care once reserved for a garden, measuring its growth against the summers still to come.",
+        "At work, the rules have changed: mandatory water breaks, cooling vests, shifts that end before noon. {name} remembers when people joked about the heat. Nobody jokes anymore, but people look out for each other in ways they never used to.",
+    ),
+    "wildfire": (
+        "The air quality app is the first thing {name} opens each morning. Green means the windows can be opened and the children can play outside. Orange means masks. Purple means staying in, running the air purifier and waiting for the wind to shift.",
+        "Across the valley, the burned hillsides are already turning green with new shoots between the blackened trunks. {name} walks there sometimes, amazed at how fast the land begins to heal, and uneasy about how soon it might burn again.",
+        "The go-bag by the door holds documents, medicine, phone chargers, a change of clothes and the family photo albums. {name} checks it at the start of each fire season, the way people elsewhere change the batteries in their smoke detectors.",
+        "Insurance has become its own kind of disaster. Premiums have tripled, some companies have pulled out entirely, and {name} spends long evenings on the phone trying to understand what would actually be covered if the flames came over the ridge.",
+        "When the smoke finally clears, the whole town seems to exhale. People crowd onto trails and patios, squinting at a sky that is suddenly blue again. {name} joins them, grateful, knowing these clear weeks are a season of their own now.",
+    ),
+    "flooding_events": (
+        "The rainy season has a new rhythm: days of heavy downpours, then sudden surges of water through the lowest streets. {name} has learned to read the clouds over the hills and to move valuables onto high shelves before the first thunder arrives.",
+        "After each flood, the mud stays for days. {name} helps neighbors shovel it out of doorways and scrub the walls with bleach, while children wade through puddles that still smell of sewage and diesel, and everyone worries about the fevers that follow.",
+        "The matatu routes change with the water. Drivers shout updates about which roads are passable, and fares rise when the detours grow long. {name} keeps a little extra money aside for these days, because getting anywhere now costs more than it used to.",
+        "Radio alerts crackle through the neighborhood whenever the river rises. {name} keeps a small bag packed with papers, a torch and a phone charger, and knows the fastest path to the church on the hill, where families gather when the water comes in.",
+        "When the floods recede, the community rebuilds a little higher each time: raised doorsteps, clearer drains, new culverts dug by hand. {name} works alongside the others, and there is a stubborn pride in every shovel of earth they move together.",
+    ),
+    "vector_borne_diseases": (
+        "Dusk is the dangerous hour now. {name} closes the shutters before sunset, lights a coil by the door and checks the net over the bed for holes, a routine as automatic as locking the door once was.",
+        "Standing water has become an enemy. After every rain, {name} walks around the compound tipping out buckets, old tires and flowerpots, knowing that a single forgotten container can breed hundreds of mosquitoes in a week.",
+        "The health post keeps a chart on the wall showing malaria cases by month. The peaks come earlier and climb higher than they did a decade ago, and the nurses speak of dengue in places that never used to see it.",
+        "Fever brings a special kind of fear now. When anyone in the household feels hot and achy, {name} does not wait: it is straight to the clinic for a rapid test, because every hour matters when the parasite is involved.",
+        "Community volunteers go door to door handing out nets and teaching families how to hang them properly. {name} walks with them some evenings, and learns that protecting one household means protecting the whole street.",
+    ),
+    DEFAULT_IMPACT: (
+        "The changes arrive in small ways first: a season that starts too early, a harvest that comes in thin, a storm that lingers longer than it should. {name} notices them the way one notices an old friend growing quieter, uneasy but unsure what to say.",
+        "Prices at the market tell the story as clearly as any scientist. {name} pays more for food, more for water and more for repairs, and stretches each month's money a little further than the month before.",
+        "The local news carries climate stories almost every night now, and {name} has stopped changing the channel. Knowing what is coming makes it easier to prepare, even when the forecasts are hard to hear.",
+        "The weather has become the first topic of every conversation, and it is never small talk anymore. {name} listens closely when neighbors compare notes on the season, because their observations often arrive long before any official warning does.",
+        "Even the familiar landscape looks different: trees flowering at odd times, birds arriving late or not at all, streams running high in the wrong month. {name} keeps noticing these shifts and has started writing them down, a private record of a world in motion.",
+    ),
+}
+
+# Adaptation expansions follow the adaptations scene
+ADAPTATION_EXPANSIONS = {
+    "sea_level_rise": (
+        "The house itself has changed. {name} helped raise the electrical outlets, moved the water heater to the attic and replaced the carpet with tile that can be hosed down. None of it is pretty, but the next flood will cost days of cleanup instead of months.",
+        "A neighborhood group now meets every month to map which blocks flood first and which drains clog most often. {name} brings the tide data, others bring photographs, and together they have convinced the city to fix three storm drains that had been ignored for years.",
+        "Some adaptations are older than anyone expected. The marsh restoration project borrows from how the land protected itself before it was paved, and {name} volunteers on weekends, planting grasses that will one day soften the waves before they ever reach the street.",
+        "{name} has started thinking about the future in decades rather than years: where the family might live in 2050, what skills will still matter, how to stay close to a place that is slowly changing shape. The plans are uncertain, but having them helps.",
+    ),
+    "drought": (
+        "Nothing is wasted now. {name} reuses dishwater on the garden, collects the cold water that runs before the shower warms and mulches every bed to keep the soil from baking. The small savings add up, and the garden still produces more than anyone expected.",
+        "The cooperative has pooled money for a shared drip irrigation system and a weather station. {name} checks the soil moisture readings on a phone app before deciding what to water, and the harvests, though smaller than in the old days, have become far more reliable.",
+        "Seed swaps have become important gatherings. Farmers trade varieties that tolerate heat and thin rain, some of them grandmother seeds nearly forgotten until the drought years. {name} keeps a careful record of which ones thrive, building a living library for the dry years ahead.",
+        "Water has become a shared responsibility rather than a private one. {name} sits on the village water committee, helping decide how the remaining supply is divided between households, livestock and fields, a task that requires patience, fairness and a great deal of listening.",
+    ),
+    "extreme_heat": (
+        "The apartment has been transformed by small, cheap changes: reflective film on the windows, a white-painted roof, thick curtains drawn at dawn and opened at dusk. {name} learned most of these tricks from an older neighbor who grew up in a hotter country.",
+        "A buddy system now links everyone on the block. During heat alerts, {name} checks on two elderly neighbors twice a day, bringing water, making sure their fans are working and watching for the confusion that can be the first sign of heat stroke.",
+        "The city has painted its playgrounds in light colors, installed misting stations at bus stops and opened libraries late into the night. {name} spends many evenings in the cool reading room, surrounded by families who have come for the same reason.",
+        "At work, {name} has helped redesign the schedule so the heaviest tasks happen in the coolest hours. Productivity dipped at first, then recovered, and the number of people sent home sick from the heat has dropped almost to zero.",
+    ),
+    "wildfire": (
+        "The property looks different now. {name} cleared the brush in a wide circle around the house, replaced the wooden fence near the walls with stone and installed mesh over the vents so embers cannot drift inside. The neighbors have done the same, block by block.",
+        "Prescribed burns have returned to the hills, planned carefully on cool, damp days. {name} joined a training program run with local tribal fire practitioners, learning how small, gentle fires can protect a landscape from the enormous ones that destroy it.",
+        "Every household on the street now has a role in the evacuation plan: who checks on the elderly, who gathers the pets, who has room in the car. {name} keeps the phone tree updated and runs a practice drill each spring before the dry season begins.",
+        "A clean-air room has become part of every home. {name} sealed the windows of one bedroom, bought a good filter and keeps it ready for smoke days, a small refuge where the children can sleep without coughing through the night.",
+    ),
+    "flooding_events": (
+        "{name} helped the neighborhood dig new drainage channels along the main path, working in shifts on weekends with borrowed shovels. The water still comes, but it moves through faster now, and fewer homes are left standing in mud for days afterward.",
+        "Houses are being built differently: foundations raised on stone, walls plastered to resist damp, important papers kept in sealed plastic bags on high shelves. {name} shares these lessons with newcomers who arrive from the countryside without knowing how the rains behave here.",
+        "A community early warning network links the upstream villages to the city by text message. When the river rises in the hills, {name} receives the alert hours before the water arrives, enough time to move the elderly and the sick to higher ground.",
+        "Women's savings groups have started a small emergency fund for families hit by floods. {name} contributes a little each week and has seen the fund pay for roofing sheets, school fees and medicine when nobody else could help quickly enough.",
+    ),
+    "vector_borne_diseases": (
+        "Community health workers now visit every household once a month. {name} knows them well: they check on pregnant women, test children with fevers, hand out medicine and keep careful records that help the clinic spot an outbreak before it spreads.",
+        "The neighborhood has organized clean-up days to clear drains and remove rubbish where water collects. {name} helps coordinate them, and the young people who join have turned the work into something close to a festival, with music playing while they dig.",
+        "New tools have arrived with the new diseases: rapid tests that give results in minutes, treated nets that last for years and a phone service that reminds families when medicine is due. {name} has seen how much difference these small things can make.",
+        "{name} has learned to recognize the early signs of malaria and dengue and now teaches others: the pattern of the fever, the aching joints, the danger signs that mean a patient must reach the hospital immediately rather than waiting until morning.",
+    ),
+    DEFAULT_IMPACT: (
+        "Small changes have added up. {name} has insulated the house, planted a garden, joined a neighborhood group and learned a dozen new skills, from reading weather forecasts closely to repairing things that once would simply have been thrown away and replaced.",
+        "Local businesses have adapted too, changing their hours, their supplies and sometimes their whole trade. {name} has watched the corner shop start selling water filters and solar lamps, and the mechanic down the road now installs batteries and panels as often as he fixes engines.",
+        "{name} has come to see adaptation as a habit rather than a single decision. Each season brings something new to learn, and each lesson is shared with neighbors, so that the whole community grows a little wiser with every difficult year.",
+    ),
+}
+
+# General passages follow the community-response scene
+GENERAL_PASSAGES = (
+    "The children have grown up knowing nothing else. For them the new rhythms are simply how the world works, and {name} is sometimes startled by how easily they adapt, trading stories about storms and heat the way earlier generations traded stories about holidays.",
+    "The elders remember it differently. They talk about the old seasons with a longing that is hard to hear, and {name} has started recording their stories, certain that their memories hold knowledge the community will need in the years ahead.",
+    "Work has changed too. Some jobs have disappeared, others have appeared almost overnight: installing solar panels, restoring wetlands, building flood defenses, running cooling centers. {name} has watched friends retrain in their forties and fifties, determined not to be left behind.",
+    "There are meetings now, more than ever before, in church halls, school gyms and neighbors' living rooms. {name} goes to most of them, because decisions about water, land and money are being made there, and everyone who shows up has a voice.",
+    "Money is tight, and the help that was promised from far away arrives slowly, if at all. {name} has learned that the most reliable support is local: the neighbor with a truck, the cousin with a spare room, the shopkeeper who extends credit in a bad month.",
+    "Some nights, {name} lies awake thinking about the future, about what the world will look like in another twenty years. Morning always brings the same answer: nobody knows, but the work of today still needs doing, and it is better done together.",
+    "Food has changed as much as anything else. Familiar crops have become expensive or disappeared from the market, replaced by hardier grains and vegetables that grow in the new conditions. {name} has learned new recipes, and some of them have quietly become family favorites.",
+    "Schools teach climate adaptation now alongside reading and arithmetic. {name} sometimes helps with homework about rain gardens, heat safety or water budgets, and is struck by how practical the lessons are, and how seriously the children take them.",
+    "Faith communities have become places of practical support as well as comfort. The congregation {name} attends runs a food bank, a cooling room and a phone tree for emergencies, and the weekly gatherings now include announcements about weather warnings alongside hymns.",
+    "Not everyone agrees about what should be done. There are arguments over money, over which neighborhoods get protected first and over whether to stay or leave. {name} has learned to listen to people on every side, because the disagreements are part of the work too.",
+    "Technology helps, but only so far. {name} relies on weather apps, solar chargers and online groups, yet the most important knowledge still travels by word of mouth, from the neighbor who noticed the warning signs to the friend who knows a safer route.",
+    "Despite everything, there is joy. Weddings and birthdays are still celebrated, music still drifts from open windows on cooler evenings, and children still laugh in the streets. {name} holds on to these moments, knowing they are as important to resilience as any seawall.",
+)
+
+# Short regional facts used as fine-grained length fillers. {value} is the
+# detail text with its first letter lowercased; {items} is a list detail
+# joined into prose.
+REGIONAL_DETAIL_SENTENCES = {
+    "sea_level_rise": "Projections for {location} put sea level rise at {value}.",
+    "flooding_frequency": "Flooding has grown more common as well, with {value}.",
+    "displacement_estimate": "Displacement estimates reach {value}.",
+    "temperature_increase": "Temperatures are expected to climb {value}.",
+    "precipitation_decrease": "Forecasts call for a {value} in precipitation.",
+    "rainfall_variability": "Rainfall patterns show {value}.",
+    "glacier_loss": "Glaciologists expect {value}.",
+    "flooding_risk": "Flood risk keeps rising, with {value}.",
+    "heat_wave_duration": "Heat waves now bring {value}.",
+    "disease_impact": "Health workers report {value}.",
+    "informal_settlements": "The risk is not shared equally: {value}.",
+    "healthcare_access": "Getting care is its own struggle, with {value}.",
+    "economic_impact": "The economy is shifting too: {value}.",
+    "community_response": "Ask about the community response and people describe {value}.",
+    "adaptation_strategies": "Across {location}, people are investing in {items}.",
+    "healthcare_challenges": "Clinics face {items}.",
+    "maternal_health_impacts": "For expectant mothers, the risks include {items}.",
+    "maternal_health_focus": "Maternal health programs now focus on {items}.",
+}
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Template packs for the Climate Futures Storyteller.
+
+A template pack is a YAML or JSON file that replaces or extends the prose in
+story_templates.py, so writers can add scenes, titles and passages without
+touching code. Its `sections` name the story_templates tables in lower case:
+
+    name: coastal-voices
+    sections:
+      titles:                       # variants: one is drawn per story
+        sea_level_rise: ["The Tide Line", "Salt in the Garden"]
+      opening_scenes:               # one template per climate impact
+        sea_level_rise: "{name} wakes to the sound of pumps."
+        "*": "{name} wakes to a changed world."   # any other impact
+      maternal_opening_scenes:      # used for the professions below
+        sea_level_rise: "{name}, {pregnancy_stage}, listens to the pumps."
+      maternal_personas: [pregnant_woman, new_mother, midwife]
+
+Conditions are expressed the way story_templates.py expresses them: tables
+keyed by climate impact ("*" for any other), and maternal_* tables that take
+over for professions listed in maternal_personas. Lists are variants. Tables
+keyed by impact, profession or focus are merged into the built-in ones; any
+other value replaces the built-in one.
+
+Packs are validated and compiled when loaded: every template is checked
+against the placeholders its section is rendered with, so a misspelled
+{placeholder} is rejected at load time rather than when a story happens to
+use it. The storyteller then folds the pack into its precompiled fragment
+registry, so rendering costs the same as with the built-in prose. Loaded
+packs are cached per file until it changes.
+
+    python template_packs.py check my_pack.yaml
+"""
+
+import argparse
+import json
+import os
+import string
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import story_templates
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; JSON packs need only the stdlib
+    yaml = None
+
+# Placeholders the scene renderers supply
+_SCENE = frozenset({"name"})
+_MATERNAL_SCENE = frozenset({"name", "pregnancy_stage"})
+_LITERAL = frozenset()
+
+# Table shapes
+_TEXT = "text"  # one template
+_VARIANTS = "variants"  # non-empty list of templates
+_BY_KEY = "by_key"  # key -> one template
+_VARIANTS_BY_KEY = "variants_by_key"  # key -> non-empty list of templates
+
+# Every table a pack may set: (shape, placeholders its templates may use)
+TABLES: Dict[str, Tuple[str, FrozenSet[str]]] = {
+    "maternal_personas": (_VARIANTS, _LITERAL),
+    "names": (_VARIANTS, _LITERAL),
+    "personal_backgrounds": (_VARIANTS_BY_KEY, _LITERAL),
+    "default_personal_backgrounds": (_VARIANTS, _LITERAL),
+    "pregnancy_stages": (_VARIANTS, _LITERAL),
+    "before_memories": (_VARIANTS_BY_KEY, _LITERAL),
+    "default_before_memories": (_VARIANTS, _LITERAL),
+    "titles": (_VARIANTS_BY_KEY, _LITERAL),
+    "maternal_titles": (_VARIANTS_BY_KEY, _LITERAL),
+    "opening_scenes": (_BY_KEY, _SCENE),
+    "maternal_opening_scenes": (_BY_KEY, _MATERNAL_SCENE),
+    "before_scene": (_TEXT, frozenset({"before_year", "memory", "name"})),
+    "transition": (_TEXT, frozenset({"early_signs", "name"})),
+    "early_signs": (_BY_KEY, _LITERAL),
+    "present_challenges": (_TEXT, frozenset({"challenge", "name", "region_year"})),
+    "challenges": (_BY_KEY, _SCENE),
+    "maternal_challenges": (_BY_KEY, _MATERNAL_SCENE),
+    "adaptations": (_TEXT, frozenset({"adaptation", "name"})),
+    "adaptation_descriptions": (_BY_KEY, _SCENE),
+    "maternal_adaptation_descriptions": (_BY_KEY, _SCENE),
+    "community_response": (_TEXT, frozenset({"name", "response"})),
+    "community_responses": (_BY_KEY, _LITERAL),
+    "reflection": (_TEXT, frozenset({"ending", "name"})),
+    "hopeful_endings": (_BY_KEY, _LITERAL),
+    "default_sensory_details": (_TEXT, _LITERAL),
+    "default_daily_changes": (_TEXT, _LITERAL),
+    "sensory_passage": (_TEXT, frozenset({"sensory_details"})),
+    "daily_changes_passage": (_TEXT, frozenset({"daily_changes"})),
+    "personal_passage": (_TEXT, frozenset({"name", "personal_story"})),
+    "cultural_passage": (_TEXT, frozenset({"cultural_context", "location"})),
+    "science_passage": (
+        _TEXT,
+        frozenset({"global_temperature", "extreme_weather", "sea_level_rise"}),
+    ),
+    "emotional_passage": (_TEXT, frozenset({"emotional_impact", "name"})),
+    "scene_expansions": (_VARIANTS_BY_KEY, _SCENE),
+    "adaptation_expansions": (_VARIANTS_BY_KEY, _SCENE),
+    "general_passages": (_VARIANTS, _SCENE),
+    "regional_detail_sentences": (_BY_KEY, frozenset({"items", "location", "value"})),
+}
+
+
+class TemplatePack:
+    """
+    Validated, frozen template tables, read like the story_templates module
+    (`pack.TITLES`, `pack.OPENING_SCENES`, ...).
+    """
+
+    def __init__(self, name: str, tables: Dict):
+        self.name = name
+        for table, value in tables.items():
+            setattr(self, table.upper(), value)
+
+    def __repr__(self) -> str:
+        return f"TemplatePack({self.name!r})"
+
+
+def _freeze(value):
+    """Turn lists into tuples, recursively."""
+    if isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+_builtin = None
+
+
+def builtin_pack() -> TemplatePack:
+    """The prose in story_templates.py as a template pack."""
+    global _builtin
+    if _builtin is None:
+        _builtin = TemplatePack(
+            "builtin",
+            {
+                table: _freeze(getattr(story_templates, table.upper()))
+                for table in TABLES
+            },
+        )
+    return _builtin
+
+
+def _check_template(where: str, template, allowed: FrozenSet[str], problems):
+    """Record why `template` cannot be rendered with `allowed`, if it cannot."""
+    if not isinstance(template, str):
+        problems.append(f"{where}: expected text, got {type(template).__name__}")
+        return
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        problems.append(f"{where}: {e}")
+        return
+    for _, field, spec, conversion in parsed:
+        if field is None:
+            continue
+        if field not in allowed:
+            hint = ", ".join(sorted(allowed)) or "none"
+            problems.append(
+                f"{where}: undefined placeholder {{{field}}} (allowed: {hint})"
+            )
+        elif spec or conversion:
+            problems.append(f"{where}: {{{field}}} takes no conversion or format")
+
+
+def _check_variants(where: str, value, allowed: FrozenSet[str], problems):
+    if not isinstance(value, (list, tuple)) or not value:
+        problems.append(f"{where}: expected a non-empty list")
+        return
+    for i, template in enumerate(value):
+        _check_template(f"{where}[{i}]", template, allowed, problems)
+
+
+def compile_pack(sections: Dict, name: str = "pack") -> TemplatePack:
+    """
+    Validate pack `sections` and merge them over the built-in tables.
+
+    Raises ValueError listing every problem: unknown tables, wrongly shaped
+    values and templates with placeholders their section does not supply.
+    """
+    if not isinstance(sections, dict):
+        raise ValueError(f"Invalid template pack {name}: sections must be a mapping")
+
+    problems = []
+    for table, value in sections.items():
+        if table not in TABLES:
+            problems.append(f"{table}: unknown section")
+            continue
+        shape, allowed = TABLES[table]
+        if shape == _TEXT:
+            _check_template(table, value, allowed, problems)
+        elif shape == _VARIANTS:
+            _check_variants(table, value, allowed, problems)
+        elif not isinstance(value, dict):
+            problems.append(f"{table}: expected a mapping")
+        else:
+            for key, item in value.items():
+                where = f"{table}[{key!r}]"
+                if shape == _BY_KEY:
+                    _check_template(where, item, allowed, problems)
+                else:
+                    _check_variants(where, item, allowed, problems)
+    if problems:
+        raise ValueError(
+            f"Invalid template pack {name}:\n  " + "\n  ".join(problems)
+        )
+
+    builtin = builtin_pack()
+    tables = {}
+    for table, (shape, _) in TABLES.items():
+        value = getattr(builtin, table.upper())
+        if table in sections:
+            update = _freeze(sections[table])
+            merged = shape in (_BY_KEY, _VARIANTS_BY_KEY)
+            value = {**value, **update} if merged else update
+        tables[table] = value
+    return TemplatePack(name, tables)
+
+
+def _read(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError(
+                    f"Reading {path} needs PyYAML; install it or use a JSON pack"
+                )
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+# Loaded packs by path, with the (mtime, size) they were read at
+_cache: Dict[str, Tuple[Tuple[int, int], TemplatePack]] = {}
+
+
+def load_template_pack(path: Optional[str]) -> TemplatePack:
+    """
+    Load, validate and compile the template pack at `path` (YAML or JSON).
+    No path means the built-in prose. Packs are cached until the file changes.
+    """
+    if not path:
+        return builtin_pack()
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    document = _read(path)
+    if not isinstance(document, dict):
+        raise ValueError(f"Invalid template pack {path}: expected a mapping")
+    pack = compile_pack(
+        document.get("sections", {}), document.get("name") or os.path.basename(path)
+    )
+    _cache[path] = (version, pack)
+    return pack
+
+
+def main():
+    """Command line entry point: validate a template pack."""
+    parser = argparse.ArgumentParser(description="Validate a story template pack")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("check", help="Validate and compile a pack")
+    check.add_argument("path", help="YAML or JSON template pack")
+    args = parser.parse_args()
+
+    try:
+        pack = load_template_pack(args.path)
+    except (OSError, RuntimeError, ValueError) as e:
+        raise SystemExit(str(e))
+    print(f"{pack.name}: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Shared fixtures: mock_llm_server's stand-in model, served from a loop thread
+of its own so both the Flask and the ASGI app can reach it.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_llm_server import MockCompletionServer  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def mock_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+
+    async def shutdown():
+        # Cancel connections still open, such as stalled requests
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def serve_model(mock_loop):
+    """Start a MockCompletionServer for a MockModel; return the server."""
+    servers = []
+
+    def serve(model):
+        mock = MockCompletionServer(model, seed=0)
+        servers.append(
+            asyncio.run_coroutine_threadsafe(mock.start(), mock_loop).result()
+        )
+        return mock
+
+    yield serve
+    for server in servers:
+        mock_loop.call_soon_threadsafe(server.close)
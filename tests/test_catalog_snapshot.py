@@ -0,0 +1,33 @@
+"""
+catalog_snapshot: loading is read-only; the build step writes the snapshot.
+"""
+
+import os
+
+from catalog_snapshot import SnapshotDataSource, load_snapshot, write_snapshot
+from data_sources import ModuleDataSource
+
+
+def test_missing_snapshot_is_compiled_in_memory(tmp_path):
+    cache_dir = tmp_path / "cache"
+    snapshot = load_snapshot(cache_dir=str(cache_dir))
+    assert isinstance(snapshot, SnapshotDataSource)
+    assert snapshot.list_locations() == ModuleDataSource().list_locations()
+    assert not cache_dir.exists()
+
+
+def test_written_snapshot_is_loaded(tmp_path):
+    path = write_snapshot(cache_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    written = os.stat(path).st_mtime_ns
+
+    snapshot = load_snapshot(cache_dir=str(tmp_path))
+    assert snapshot.list_locations() == ModuleDataSource().list_locations()
+    assert os.stat(path).st_mtime_ns == written
+
+
+def test_disabled_snapshots_serve_the_source(monkeypatch):
+    monkeypatch.setenv("STORY_CATALOG_CACHE", "")
+    source = ModuleDataSource()
+    assert load_snapshot(source) is source
+    assert write_snapshot(source) is None
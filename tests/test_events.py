@@ -0,0 +1,287 @@
+"""
+/api/generate/events, in the Flask and the ASGI app, against
+mock_llm_server's stand-in model: the order of the events, the text they
+carry, the template fallbacks, and what a client that leaves mid-story frees.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import asgi_app
+import web_interface
+from llm_backend import (
+    CompletionClient,
+    ModelService,
+    ModelStoryteller,
+    _max_tokens,
+    build_prompt,
+)
+from mock_llm_server import MockModel, mock_completion
+
+LENGTH = 200
+# Writes a LENGTH-word story in a fraction of a second
+FAST = MockModel(ttft=0.02, ttft_spread=0.1, tokens_per_second=4000.0)
+# Takes most of a minute, so a reader can leave partway
+SLOW = MockModel(ttft=0.02, ttft_spread=0.1, tokens_per_second=20.0)
+STALLING = MockModel(ttft=0.02, ttft_spread=0.1, stall_rate=1.0, stall=2.0)
+
+
+def parse_events(text):
+    """The (event, data) pairs of a server-sent event stream."""
+    events = []
+    for block in text.split("\n\n"):
+        if block:
+            event, data = block.split("\n", 1)
+            events.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def wait_for(condition, timeout=5.0):
+    """Whether `condition()` holds within `timeout` seconds."""
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+async def wait_for_async(condition, timeout=5.0):
+    """wait_for, letting the loop run meanwhile."""
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+def chunk_text(events):
+    return "".join(data["text"] for event, data in events if event == "chunk")
+
+
+def template_body(seed):
+    """The body of the template story, as its chunks should join."""
+    story = web_interface.storyteller.generate_story(
+        story_length=LENGTH, seed=seed, output_format="json"
+    )
+    return "\n\n".join(
+        block["text"]
+        for block in json.loads(story)["sections"]
+        if block["section"] not in ("title", "setting", "footer")
+    )
+
+
+def is_completion(text, seed):
+    """Whether `text` is the stand-in model's completion of the story's plan."""
+    plan, region_data = web_interface.storyteller._plan_story(None, None, None, seed)
+    prompt = build_prompt(plan, region_data, LENGTH)
+    max_tokens = _max_tokens(LENGTH)
+    return any(
+        text == mock_completion(prompt, tokens)
+        for tokens in range(max_tokens * 3 // 4, max_tokens + 1)
+    )
+
+
+def assert_order(events, *tail):
+    """Assert the events are meta, one or more chunks, done, then `tail`."""
+    names = [event for event, _ in events]
+    chunks = names.count("chunk")
+    assert chunks > 0
+    assert names == ["meta", *["chunk"] * chunks, "done", *tail]
+
+
+class FlaskApp:
+    """web_interface's route, through Flask's test client."""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.client = web_interface.app.test_client()
+        self.service = None
+
+    def use_model(self, mock, deadline=5.0, hedge=False):
+        """Write stories with `mock`; return the ModelStoryteller."""
+        self.service = ModelService(
+            web_interface.storyteller,
+            f"http://127.0.0.1:{mock.port}",
+            deadline=deadline,
+        )
+        self.monkeypatch.setattr(web_interface, "model_service", self.service)
+        self.monkeypatch.setattr(web_interface, "hedged", hedge)
+        return self.service._start()[1]
+
+    def events(self, query, leave=None, until=None):
+        """
+        The events of one story. With `leave`, the client calls it at the
+        first chunk and then disconnects. `until` must then hold within a
+        few seconds, while the app and its model connections are still up.
+        """
+        response = self.client.get(f"/api/generate/events?{query}", buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        text = ""
+        try:
+            for piece in response.response:
+                text += piece.decode("utf-8")
+                if leave is not None and "event: chunk" in text:
+                    leave()
+                    break
+        finally:
+            response.close()
+        if until is not None:
+            assert wait_for(until)
+        return parse_events(text)
+
+    def close(self):
+        if self.service is not None:
+            self.service.close()
+
+
+class AsgiApp:
+    """asgi_app's route, called as an ASGI server would."""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+
+    def use_model(self, mock, deadline=5.0, hedge=False):
+        """Write stories with `mock`; return the ModelStoryteller."""
+        narrator = ModelStoryteller(
+            web_interface.storyteller,
+            CompletionClient(f"http://127.0.0.1:{mock.port}"),
+            deadline=deadline,
+        )
+        self.monkeypatch.setattr(asgi_app, "_narrator", narrator)
+        self.monkeypatch.setattr(asgi_app, "hedged", hedge)
+        return narrator
+
+    def events(self, query, leave=None, until=None):
+        """FlaskApp.events, on an event loop of the test's own."""
+        return asyncio.run(self._events(query, leave, until))
+
+    async def _events(self, query, leave, until):
+        requested, left = False, asyncio.Event()
+        start, body = None, b""
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await left.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal start, body
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            body += message["body"]
+            if leave is not None and not left.is_set() and b"event: chunk" in body:
+                leave()
+                left.set()
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/generate/events",
+            "query_string": query.encode("latin-1"),
+            "headers": [],
+        }
+        try:
+            await asgi_app.app(scope, receive, send)
+            if until is not None:
+                assert await wait_for_async(until)
+        finally:
+            if asgi_app._narrator is not None:
+                await asgi_app._narrator.client.close()
+        assert start["status"] == 200
+        assert (b"content-type", b"text/event-stream") in start["headers"]
+        return parse_events(body.decode("utf-8"))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=[FlaskApp, AsgiApp], ids=["flask", "asgi"])
+def app(request, monkeypatch):
+    app = request.param(monkeypatch)
+    yield app
+    app.close()
+
+
+def test_template_story_streams_without_a_model(app):
+    events = app.events(f"seed=7&length={LENGTH}")
+    assert_order(events)
+    assert events[0][1]["seed"] == 7
+    assert events[-1][1]["source"] == "template"
+    assert chunk_text(events) == template_body(7)
+
+
+def test_model_story_streams_as_written(app, serve_model):
+    narrator = app.use_model(serve_model(FAST))
+    events = app.events(f"seed=11&length={LENGTH}")
+    assert_order(events)
+    done = events[-1][1]
+    assert done["source"] == "model"
+    assert done["complete"] is True
+    assert done["ttft_ms"] > 0
+    assert is_completion(chunk_text(events), 11)
+    assert narrator.stats()["model_stories"] == 1
+
+
+def test_hedged_story_streams_the_template_then_the_rewrite(app, serve_model):
+    app.use_model(serve_model(FAST), hedge=True)
+    events = app.events(f"seed=13&length={LENGTH}")
+    assert_order(events, "enriched")
+    assert events[-2][1]["source"] == "template"
+    assert events[-2][1]["enriching"] is True
+    assert chunk_text(events) == template_body(13)
+    enriched = events[-1][1]
+    assert enriched["source"] == "model"
+    assert is_completion(enriched["text"], 13)
+
+
+def test_model_past_the_deadline_falls_back_to_the_template(app, serve_model):
+    narrator = app.use_model(serve_model(STALLING), deadline=0.3)
+    events = app.events(f"seed=17&length={LENGTH}")
+    assert_order(events)
+    assert events[-1][1]["source"] == "template"
+    assert chunk_text(events) == template_body(17)
+    assert narrator.stats()["timeouts"] == 1
+
+
+def test_hedged_rewrite_past_the_deadline_is_dropped(app, serve_model):
+    app.use_model(serve_model(STALLING), deadline=0.3, hedge=True)
+    events = app.events(f"seed=19&length={LENGTH}")
+    assert_order(events, "enriched")
+    assert chunk_text(events) == template_body(19)
+    assert events[-1][1] == {"dropped": True}
+
+
+def test_open_breaker_streams_the_template_without_calling_the_model(app, serve_model):
+    mock = serve_model(FAST)
+    narrator = app.use_model(mock)
+    for _ in range(narrator.breaker.failure_threshold):
+        narrator.breaker.record_failure()
+    events = app.events(f"seed=23&length={LENGTH}")
+    assert_order(events)
+    assert events[-1][1]["source"] == "template"
+    assert chunk_text(events) == template_body(23)
+    assert narrator.stats()["rejected"] == 1
+    assert mock.requests == 0
+
+
+def test_client_leaving_mid_story_frees_the_model_slot(app, serve_model):
+    mock = serve_model(SLOW)
+    app.use_model(mock)
+    decoding = []
+    events = app.events(
+        "seed=29&length=600",
+        leave=lambda: decoding.append(mock.active),
+        until=lambda: mock.active == 0,
+    )
+    assert [event for event, _ in events[:2]] == ["meta", "chunk"]
+    assert decoding == [1]
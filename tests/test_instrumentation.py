@@ -0,0 +1,42 @@
+"""
+ClimateStoryteller.enable_instrumentation: every story is counted once per
+stage, whatever its output format and whether it is written whole or streamed.
+"""
+
+import pytest
+
+from climate_storyteller import STORY_FORMATS, ClimateStoryteller
+
+
+@pytest.fixture
+def storyteller():
+    storyteller = ClimateStoryteller()
+    storyteller.enable_instrumentation()
+    yield storyteller
+    storyteller.disable_instrumentation()
+
+
+def test_every_format_counts_one_write_per_story(storyteller):
+    for seed, name in enumerate(STORY_FORMATS):
+        storyteller.generate_story(seed=seed, output_format=name)
+        "".join(storyteller.iter_story(seed=seed, output_format=name))
+
+    timings = storyteller.stage_timings()
+    stories = 2 * len(STORY_FORMATS)
+    for stage in ("plan", "passages", "write"):
+        assert timings[stage]["calls"] == stories
+    assert timings["write"]["total_ns"] >= timings["passages"]["total_ns"]
+
+
+def test_story_left_partway_still_counts_one_write(storyteller):
+    sections = storyteller.iter_story(seed=1)
+    next(sections)
+    sections.close()
+    assert storyteller.stage_timings()["write"]["calls"] == 1
+
+
+def test_disabled_storyteller_writes_the_same_stories(storyteller):
+    instrumented = storyteller.generate_story(seed=5, output_format="html")
+    storyteller.disable_instrumentation()
+    assert storyteller.generate_story(seed=5, output_format="html") == instrumented
+    assert storyteller.stage_timings() == {}
@@ -0,0 +1,94 @@
+"""
+story_cache.ByteBudgetLRU, on its own and as web_interface's story cache:
+the byte budget, least-recently-used eviction and the stats counters.
+"""
+
+import pytest
+
+import web_interface
+from story_cache import ByteBudgetLRU
+
+LENGTH = 600
+
+
+def test_cache_stays_within_its_byte_budget():
+    cache = ByteBudgetLRU(100)
+    for key in range(20):
+        cache.put(key, str(key), 30)
+        assert cache.stats()["bytes"] <= 100
+    assert len(cache) == 3
+
+    cache.put("huge", "x", 101)
+    assert cache.get("huge") is None
+    assert len(cache) == 3
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = ByteBudgetLRU(100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"
+
+    cache.put("c", "C", 40)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+    # Replacing a value recharges its size and refreshes it
+    cache.put("c", "CC", 70)
+    assert cache.get("a") is None
+    assert cache.get("c") == "CC"
+    assert cache.stats()["bytes"] == 70
+
+
+def test_cache_counts_hits_misses_and_evictions():
+    cache = ByteBudgetLRU(50)
+    cache.get("a")
+    cache.put("a", "A", 30)
+    cache.get("a")
+    cache.get("a")
+    cache.put("b", "B", 30)
+    cache.get("a")
+
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+        "entries": 1,
+        "bytes": 30,
+        "max_bytes": 50,
+    }
+    cache.clear()
+    assert cache.stats()["hits"] == 2
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def client():
+    return web_interface.app.test_client()
+
+
+def entry_size(seed):
+    story = web_interface.storyteller.generate_story(story_length=LENGTH, seed=seed)
+    return web_interface.cache_entry(story)[1]
+
+
+def test_web_interface_caches_seeded_stories_least_recently_used(client, monkeypatch):
+    # Room for any two of the three stories, but not all three
+    budget = sum(map(entry_size, (1, 2, 3))) - 1
+    monkeypatch.setattr(web_interface, "story_cache", ByteBudgetLRU(budget))
+    monkeypatch.setattr(web_interface, "cache_json", False)
+
+    stories = {}
+    for seed in (1, 2, 1, 3, 2):
+        response = client.post("/api/generate", json={"seed": seed, "length": LENGTH})
+        story = response.get_json()["story"]
+        assert stories.setdefault(seed, story) == story
+
+    stats = client.get("/api/cache/stats").get_json()
+    # Seed 3 evicts seed 2, not the just-read seed 1; seed 2 then evicts 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= stats["max_bytes"] == budget
@@ -0,0 +1,89 @@
+"""
+web_interface's JSON API through Flask's test client: request validation and
+conditional requests for the precomputed responses.
+"""
+
+import json
+
+import pytest
+
+import web_interface
+from climate_storyteller import STORY_FORMATS
+
+
+@pytest.fixture
+def client():
+    return web_interface.app.test_client()
+
+
+def assert_unknown_format(response, name):
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload["success"] is False
+    assert repr(name) in payload["error"]
+    assert payload["formats"] == list(STORY_FORMATS)
+
+
+@pytest.mark.parametrize("name", list(STORY_FORMATS))
+def test_every_story_format_is_accepted(client, name):
+    response = client.post(f"/api/generate?format={name}", json={"seed": 1})
+    assert response.status_code == 200
+    assert response.get_json()["format"] == name
+
+
+def test_unknown_format_is_a_bad_request(client):
+    assert_unknown_format(
+        client.post("/api/generate?format=xml", json={"seed": 1}), "xml"
+    )
+    assert_unknown_format(
+        client.post("/api/generate", json={"seed": 1, "format": "pdf"}), "pdf"
+    )
+    assert_unknown_format(
+        client.post("/api/generate/stream?format=xml", json={}), "xml"
+    )
+    assert_unknown_format(client.get("/api/random?format=xml"), "xml")
+
+
+def test_unknown_batch_format_is_refused_up_front(client):
+    response = client.post("/api/generate/batch", json={"count": 3, "format": "xml"})
+    assert_unknown_format(response, "xml")
+
+
+def test_unknown_format_of_one_batch_story_fails_only_that_story(client):
+    response = client.post(
+        "/api/generate/batch", json={"stories": [{"format": "xml"}, {"seed": 2}]}
+    )
+    assert response.status_code == 200
+    first, second = map(json.loads, response.get_data(as_text=True).splitlines())
+    assert first["success"] is False
+    assert "'xml'" in first["error"]
+    assert second["success"] is True
+
+
+@pytest.mark.parametrize("path", ["/", "/api/locations", "/api/catalog"])
+def test_matching_if_none_match_gets_not_modified(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    revalidated = client.get(path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b""
+    assert revalidated.headers["ETag"] == etag
+
+    changed = client.get(path, headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+    assert changed.get_data() == response.get_data()
+
+
+def test_compressed_etag_revalidates_too(client):
+    response = client.get("/api/catalog", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    etag = response.headers["ETag"]
+
+    revalidated = client.get(
+        "/api/catalog",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": f"W/{etag}"},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
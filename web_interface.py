@@ -6,39 +6,431 @@ This module provides a simple web interface using Flask for generating
 climate change narratives through a browser.
 """
 
+import itertools
 import json
 import os
+import random
+import sys
 
-from flask import Flask, jsonify, render_template, request, send_from_directory
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    request,
+    send_from_directory,
+    stream_with_context,
+)
 
-from climate_storyteller import ClimateStoryteller
+from climate_storyteller import (
+    MAX_STORY_LENGTH,
+    SEED_BITS,
+    STORY_FORMATS,
+    ClimateStoryteller,
+    Story,
+    new_seed,
+)
+from data_sources import open_data_source
+from llm_backend import DEFAULT_MODEL, ModelService, iter_story_events
+from precomputed import BEST_CODINGS, DEFAULT_MAX_AGE, PrecomputedResponse
+from story_cache import ByteBudgetLRU
+from story_corpus import StoryCorpus
+from template_packs import load_template_pack
 
 app = Flask(__name__)
-storyteller = ClimateStoryteller()
+# STORY_DATA selects an external catalog (a JSON directory or SQLite file) and
+# STORY_TEMPLATES a template pack with extra or replacement prose
+storyteller = ClimateStoryteller(
+    open_data_source(os.environ.get("STORY_DATA")),
+    templates=load_template_pack(os.environ.get("STORY_TEMPLATES")),
+)
+
+# STORY_LLM_URL names an OpenAI-compatible completion endpoint that writes
+# the stories of /api/generate/events as they stream (see llm_backend.py).
+# With STORY_LLM_MODE=hedge the template story streams at once instead, and
+# the model's rewrite follows if it arrives within STORY_LLM_DEADLINE.
+model_service = None
+hedged = os.environ.get("STORY_LLM_MODE", "stream") == "hedge"
+if os.environ.get("STORY_LLM_URL"):
+    model_service = ModelService(
+        storyteller,
+        os.environ["STORY_LLM_URL"],
+        model=os.environ.get("STORY_LLM_MODEL", DEFAULT_MODEL),
+        api_key=os.environ.get("STORY_LLM_API_KEY"),
+        deadline=float(os.environ.get("STORY_LLM_DEADLINE", 20)),
+    )
+
+# Prebuilt stories, served by /api/random and /api/corpus/random when
+# STORY_CORPUS points at a corpus file built with story_corpus.py
+corpus = None
+if os.environ.get("STORY_CORPUS"):
+    corpus = StoryCorpus(os.environ["STORY_CORPUS"])
+
+# Recently generated seeded stories, bounded by STORY_CACHE_BYTES (default
+# 32 MiB). With STORY_CACHE_JSON=1 the encoded responses are cached instead,
+# so hits skip jsonify as well as generation.
+story_cache = ByteBudgetLRU(int(os.environ.get("STORY_CACHE_BYTES", 32 * 2**20)))
+cache_json = os.environ.get("STORY_CACHE_JSON", "").lower() in ("1", "true", "yes")
+
+# Most stories one /api/generate/batch request may ask for
+batch_max = int(os.environ.get("STORY_BATCH_MAX", 1000))
+
+# How long clients may cache the catalog lists, in seconds
+catalog_max_age = int(os.environ.get("STORY_CATALOG_MAX_AGE", DEFAULT_MAX_AGE))
+# The storyteller the catalog responses were encoded from, and the responses
+_catalog = None
+# The catalog response the page was built with, and the page
+_index = None
+
+# Media types a client can prefer with Accept; the JSON envelope wins ties
+_ACCEPTED_TYPES = ("application/json", "text/html", "text/markdown", "text/plain")
+_FORMAT_OF_TYPE = {media_type: name for name, media_type in STORY_FORMATS.items()}
+
+
+class UnknownFormat(ValueError):
+    """A requested story format that is not one of STORY_FORMATS."""
+
+
+def check_format(requested):
+    """Return `requested` if it names one of STORY_FORMATS; else raise."""
+    if not isinstance(requested, str) or requested not in STORY_FORMATS:
+        raise UnknownFormat(
+            f"Unknown output format {requested!r}; "
+            f"choose from {', '.join(STORY_FORMATS)}"
+        )
+    return requested
+
+
+def format_error(error):
+    """The 400 response to an UnknownFormat, listing the valid formats."""
+    return (
+        jsonify(
+            {"success": False, "error": str(error), "formats": list(STORY_FORMATS)}
+        ),
+        400,
+    )
+
+
+def negotiate_format(requested=None):
+    """
+    Pick the story format of a response; returns (format, bare).
+
+    An explicit `format` parameter chooses the format of the story inside the
+    usual JSON envelope, and raises UnknownFormat if it is not one of
+    STORY_FORMATS. Without one, an Accept header that prefers text/html,
+    text/markdown or text/plain asks for the bare story in that format;
+    anything else gets the envelope with Markdown.
+    """
+    if requested:
+        return check_format(requested), False
+    best = request.accept_mimetypes.best_match(
+        _ACCEPTED_TYPES, default="application/json"
+    )
+    if best == "application/json":
+        return "markdown", False
+    return _FORMAT_OF_TYPE[best], True
+
+
+def bare_story_response(story, output_format):
+    """Return a story as the whole response body, its seed in the headers."""
+    return Response(
+        story,
+        mimetype=STORY_FORMATS[output_format],
+        headers={
+            "X-Story-Seed": str(story.seed),
+            "X-Story-Word-Count": str(story.word_count),
+        },
+    )
+
+
+def envelope_story(story, output_format):
+    """The `story` value of a JSON envelope: text, or sections for "json"."""
+    return json.loads(story) if output_format == "json" else story
+
+
+def story_length(length):
+    """
+    The story length to write for a requested `length` (default 1200), capped
+    at MAX_STORY_LENGTH, the longest every combination reaches; responses
+    report the capped length.
+    """
+    return min(int(length or 1200), MAX_STORY_LENGTH)
+
+
+def resolve_names(location, impact, character):
+    """
+    The catalog keys of a request's location, impact and character, so that
+    "Miami, Florida", "Miami" and "miami_florida" write, cache and report the
+    same story. Unknown names are kept as given, and missing ones as None.
+    """
+    return (
+        location and (storyteller.resolve_location(location) or location) or None,
+        impact and (storyteller.resolve_impact(impact) or impact) or None,
+        character and (storyteller.resolve_character(character) or character)
+        or None,
+    )
+
+
+def cache_entry(story):
+    """
+    What the story cache keeps of a story, and the bytes that holds: the
+    text with its seed and word count, and the protagonist. The plan is left
+    out, since its scenes repeat most of the text; the protagonist's strings
+    come from the catalog and templates and are shared.
+    """
+    text = Story(story, story.seed, None, story.word_count)
+    character = story.plan.character
+    entry = (text, character)
+    size = sum(
+        map(
+            sys.getsizeof,
+            (
+                entry,
+                text,
+                text.__dict__,
+                text.seed,
+                text.word_count,
+                character,
+                character.challenges,
+                character.adaptations,
+            ),
+        )
+    )
+    return entry, size
+
+
+def display_label(key):
+    """How the page shows a catalog key: "new_york_city" as "New York City"."""
+    return key.replace("_", " ").title()
+
+
+def catalog_responses():
+    """
+    The encoded /api/locations, /api/impacts, /api/characters and
+    /api/catalog responses, by name. A storyteller's catalog never changes,
+    so they are encoded once per storyteller.
+    """
+    global _catalog
+    if _catalog is None or _catalog[0] is not storyteller:
+        lists = {
+            "locations": storyteller.list_available_locations(),
+            "impacts": storyteller.list_available_impacts(),
+            "characters": storyteller.list_available_characters(),
+        }
+        # Everything the page's form needs, in one document
+        lists["catalog"] = {
+            **lists,
+            "labels": {
+                name: {key: display_label(key) for key in keys}
+                for name, keys in lists.items()
+            },
+        }
+        _catalog = (
+            storyteller,
+            {
+                name: PrecomputedResponse(
+                    app.json.response(value).get_data(),
+                    app.json.mimetype,
+                    catalog_max_age,
+                )
+                for name, value in lists.items()
+            },
+        )
+    return _catalog[1]
+
+
+def index_response():
+    """
+    The page as a PrecomputedResponse, with the /api/catalog document
+    inlined so the form needs no requests, compressed with the best codings
+    available. Clients revalidate it on every visit, so a new deployment
+    shows at once; the answer is usually 304.
+    """
+    global _index
+    catalog = catalog_responses()["catalog"]
+    if _index is None or _index[0] is not catalog:
+        # The JSON is ASCII; escaping "<" keeps "</script>" out of it
+        inline = catalog.body.decode("ascii").strip().replace("<", "\\u003c")
+        page = INDEX_HTML.replace(CATALOG_PLACEHOLDER, inline).replace(
+            MAX_LENGTH_PLACEHOLDER, str(MAX_STORY_LENGTH)
+        )
+        _index = (
+            catalog,
+            PrecomputedResponse(
+                page.encode("utf-8"),
+                "text/html; charset=utf-8",
+                max_age=0,
+                codings=BEST_CODINGS,
+            ),
+        )
+    return _index[1]
+
+
+def precomputed_response(precomputed):
+    """Serve a PrecomputedResponse, or 304 if the client has its version."""
+    body, etag, coding = precomputed.select(request.headers.get("Accept-Encoding"))
+    headers = precomputed.headers(etag, coding)
+    if precomputed.not_modified(request.headers.get("If-None-Match")):
+        return Response(status=304, headers=headers)
+    return Response(body, content_type=precomputed.content_type, headers=headers)
+
+
+def sse_event(event, data):
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def server_sent_events(events):
+    """Encode (event, data) pairs as server-sent events, one chunk each."""
+    try:
+        for event, data in events:
+            yield sse_event(event, data)
+    except Exception as e:
+        # The response has started; report the failure in the stream
+        yield sse_event("error", {"error": str(e)})
+
+
+def batch_specs(data):
+    """
+    Check a /api/generate/batch body; returns its size and an iterator of
+    its stories' /api/generate parameters.
+
+    The body holds either `stories`, a list of parameter objects, or
+    `count`. Its own location, impact, character, length and format apply to
+    every story that does not set them, and its `seed` seeds the batch: each
+    story without a seed of its own gets the next seed drawn from it, so the
+    same body always yields the same stories. Specs are merged as they are
+    read, one at a time. Raises ValueError for a malformed body or one with
+    more than `batch_max` stories, and UnknownFormat for a batch-wide
+    `format` that is not one of STORY_FORMATS; a story's own format is
+    checked when it is written.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("The request body must be a JSON object")
+    stories = data.get("stories")
+    count = data.get("count")
+    if stories is not None:
+        if count is not None:
+            raise ValueError("Give either stories or count, not both")
+        if not isinstance(stories, list):
+            raise ValueError("stories must be a list of objects")
+        count = len(stories)
+    elif isinstance(count, bool) or not isinstance(count, int) or count < 1:
+        raise ValueError("A batch needs stories or a positive integer count")
+    if count > batch_max:
+        raise ValueError(f"A batch may ask for at most {batch_max} stories")
+
+    defaults = {
+        name: data[name]
+        for name in ("location", "impact", "character", "length", "format")
+        if data.get(name) is not None
+    }
+    if "format" in defaults:
+        check_format(defaults["format"])
+    seeds = None
+    if data.get("seed") is not None:
+        seeds = random.Random(int(data["seed"]))
+
+    def specs():
+        for index in range(count):
+            spec = stories[index] if stories is not None else {}
+            # Drawn for every story, so each seed depends only on its index
+            seed = seeds.getrandbits(SEED_BITS) if seeds is not None else None
+            if isinstance(spec, dict):
+                spec = {**defaults, "seed": seed, **spec}
+            yield spec
+
+    return count, specs()
+
+
+def batch_params(spec):
+    """The generate_story arguments of one /api/generate/batch spec."""
+    if not isinstance(spec, dict):
+        raise ValueError("Each story must be a JSON object")
+    location, impact, character = resolve_names(
+        spec.get("location"), spec.get("impact"), spec.get("character")
+    )
+    seed = spec.get("seed")
+    return {
+        "location": location,
+        "climate_impact": impact,
+        "character_focus": character,
+        "story_length": story_length(spec.get("length")),
+        "seed": int(seed) if seed is not None else None,
+        "output_format": check_format(spec.get("format") or "markdown"),
+    }
+
+
+def batch_result(story, params):
+    """/api/generate's response for a story generated with `params`."""
+    return {
+        "success": True,
+        "story": envelope_story(story, params["output_format"]),
+        "format": params["output_format"],
+        "metadata": {
+            "location": params["location"],
+            "impact": params["climate_impact"],
+            "character": params["character_focus"],
+            "length": params["story_length"],
+            "word_count": story.word_count,
+            "seed": story.seed,
+            "protagonist": story.plan.character.to_dict(),
+        },
+    }
+
+
+def ndjson_line(index, payload):
+    """Encode one batch result, with its `index`, as a line of NDJSON."""
+    line = {"index": index, **payload}
+    return json.dumps(line, separators=(",", ":"), sort_keys=True) + "\n"
+
+
+def batch_lines(specs):
+    """
+    Generate a batch one story per line, each only when the server asks for
+    the next chunk. A failed story is reported on its line and the batch
+    goes on.
+    """
+    for index, spec in enumerate(specs):
+        try:
+            params = batch_params(spec)
+            story = storyteller.generate_story(**params)
+            line = ndjson_line(index, batch_result(story, params))
+        except Exception as e:
+            line = ndjson_line(index, {"success": False, "error": str(e)})
+        yield line
 
 
 @app.route("/")
 def index():
-    """Main page with story generation form."""
-    return render_template("index.html")
+    """Main page with story generation form, served from memory."""
+    return precomputed_response(index_response())
 
 
 @app.route("/api/locations")
 def get_locations():
     """API endpoint to get available locations."""
-    return jsonify(storyteller.list_available_locations())
+    return precomputed_response(catalog_responses()["locations"])
 
 
 @app.route("/api/impacts")
 def get_impacts():
     """API endpoint to get available climate impacts."""
-    return jsonify(storyteller.list_available_impacts())
+    return precomputed_response(catalog_responses()["impacts"])
 
 
 @app.route("/api/characters")
 def get_characters():
     """API endpoint to get available character types."""
-    return jsonify(storyteller.list_available_characters())
+    return precomputed_response(catalog_responses()["characters"])
+
+
+@app.route("/api/catalog")
+def get_catalog():
+    """
+    API endpoint to get the locations, impacts and character types at once,
+    with the `labels` the page shows for each, by list and key.
+    """
+    return precomputed_response(catalog_responses()["catalog"])
 
 
 @app.route("/api/generate", methods=["POST"])
@@ -47,45 +439,276 @@ def generate_story():
     try:
         data = request.get_json()
 
-        location = data.get("location")
-        impact = data.get("impact")
-        character = data.get("character")
-        length = data.get("length", 1200)
-
-        story = storyteller.generate_story(
-            location=location,
-            climate_impact=impact,
-            character_focus=character,
-            story_length=length,
+        location, impact, character = resolve_names(
+            data.get("location"), data.get("impact"), data.get("character")
+        )
+        length = story_length(data.get("length"))
+        seed = data.get("seed")
+        seed = int(seed) if seed is not None else None
+        output_format, bare = negotiate_format(
+            data.get("format") or request.args.get("format")
         )
 
-        return jsonify(
+        # Only seeded requests can repeat; fresh seeds are never seen twice.
+        # Every format of a story is cached separately; bare stories are
+        # cached as stories, since they need no encoding.
+        key = (location, impact, character, length, seed, output_format, bare)
+        cached = story_cache.get(key) if seed is not None else None
+        if cached is not None and cache_json and not bare:
+            return Response(cached, mimetype=app.json.mimetype)
+
+        if cached is not None:
+            story, protagonist = cached
+        else:
+            story = storyteller.generate_story(
+                location=location,
+                climate_impact=impact,
+                character_focus=character,
+                story_length=length,
+                seed=seed,
+                output_format=output_format,
+            )
+            protagonist = story.plan.character
+
+        if bare:
+            if seed is not None and cached is None:
+                story_cache.put(key, *cache_entry(story))
+            return bare_story_response(story, output_format)
+
+        response = jsonify(
             {
                 "success": True,
-                "story": story,
+                "story": envelope_story(story, output_format),
+                "format": output_format,
                 "metadata": {
                     "location": location,
                     "impact": impact,
                     "character": character,
                     "length": length,
+                    "word_count": story.word_count,
+                    "seed": story.seed,
+                    "protagonist": protagonist.to_dict(),
                 },
             }
         )
 
+        if seed is not None and cached is None:
+            if cache_json:
+                body = response.get_data()
+                story_cache.put(key, body, sys.getsizeof(body))
+            else:
+                story_cache.put(key, *cache_entry(story))
+        return response
+
+    except UnknownFormat as e:
+        return format_error(e)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/api/generate/stream", methods=["POST"])
+def generate_story_stream():
+    """
+    API endpoint to stream a story section by section, as Markdown unless a
+    `format` parameter or the Accept header asks for another format.
+    """
+    try:
+        data = request.get_json()
+        seed = data.get("seed")
+        seed = int(seed) if seed is not None else new_seed()
+        output_format, _ = negotiate_format(
+            data.get("format") or request.args.get("format")
+        )
+
+        location, impact, character = resolve_names(
+            data.get("location"), data.get("impact"), data.get("character")
+        )
+        sections = storyteller.iter_story(
+            location=location,
+            climate_impact=impact,
+            character_focus=character,
+            story_length=story_length(data.get("length")),
+            seed=seed,
+            output_format=output_format,
+        )
+        # Produce the first section before committing to a 200 response
+        first = next(sections)
+    except UnknownFormat as e:
+        return format_error(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return Response(
+        stream_with_context(itertools.chain([first], sections)),
+        mimetype=STORY_FORMATS[output_format],
+        headers={"X-Story-Seed": str(seed)},
+    )
+
+
+@app.route("/api/generate/events")
+def generate_story_events():
+    """
+    API endpoint to stream a story as server-sent events while it is written:
+    "meta" (seed, title, setting, protagonist), a "chunk" for each piece of
+    text and "done" (footer, source, word count, time to first chunk); see
+    llm_backend.ModelStoryteller.stream_story. With STORY_LLM_URL set a model
+    writes the story, otherwise the template story streams paragraph by
+    paragraph. In hedge mode the template story streams and an "enriched"
+    event with the model's rewrite follows; see ModelService.hedge_story.
+    Takes location, impact, character, length and seed as query parameters,
+    so browsers can use EventSource.
+    """
+    try:
+        location, impact, character = resolve_names(
+            request.args.get("location"),
+            request.args.get("impact"),
+            request.args.get("character"),
+        )
+        params = {
+            "location": location,
+            "climate_impact": impact,
+            "character_focus": character,
+            "story_length": story_length(request.args.get("length", type=int)),
+            "seed": request.args.get("seed", type=int),
+        }
+        if model_service is not None and hedged:
+            events = model_service.hedge_story(**params)
+        elif model_service is not None:
+            events = model_service.stream_story(**params)
+        else:
+            events = iter_story_events(storyteller, **params)
+        # Plan the story before committing to a 200 response
+        first = next(events)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return Response(
+        stream_with_context(server_sent_events(itertools.chain([first], events))),
+        mimetype="text/event-stream",
+        # Keep caches and proxies such as nginx from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/generate/batch", methods=["POST"])
+def generate_story_batch():
+    """
+    API endpoint to generate up to STORY_BATCH_MAX stories in one request
+    (see batch_specs for the body), streamed as newline-delimited JSON: one
+    line per story in order, /api/generate's response plus its `index`.
+
+    Each story is written when the previous line has been handed to the
+    server, so memory stays flat whatever the batch size, and a client that
+    disconnects stops the batch: the server closes the generator on its next
+    failed write. Batch stories bypass the story cache, which one batch would
+    otherwise flush.
+    """
+    try:
+        count, specs = batch_specs(request.get_json())
+    except UnknownFormat as e:
+        return format_error(e)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    return Response(
+        stream_with_context(batch_lines(specs)),
+        mimetype="application/x-ndjson",
+        headers={
+            "X-Batch-Count": str(count),
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @app.route("/api/random")
 def generate_random_story():
-    """API endpoint to generate a random story."""
+    """API endpoint to generate a random story, in any of STORY_FORMATS."""
     try:
-        story = storyteller.generate_story()
-        return jsonify({"success": True, "story": story})
+        seed = request.args.get("seed", type=int)
+        output_format, bare = negotiate_format(request.args.get("format"))
+        story = None
+        if seed is None and corpus is not None:
+            index = corpus.random_index()
+            if index is not None:
+                metadata = corpus.metadata(index)
+                if output_format == "markdown" and not bare:
+                    return jsonify(
+                        {
+                            "success": True,
+                            "story": corpus.story(index),
+                            "seed": metadata["seed"],
+                        }
+                    )
+                # Other formats are rendered again from the prebuilt story's seed
+                story = storyteller.generate_story(
+                    location=metadata["location"],
+                    climate_impact=metadata["impact"],
+                    character_focus=metadata["character"],
+                    story_length=corpus.story_length,
+                    seed=metadata["seed"],
+                    output_format=output_format,
+                )
+
+        if story is None:
+            story = storyteller.generate_story(seed=seed, output_format=output_format)
+        if bare:
+            return bare_story_response(story, output_format)
+        return jsonify(
+            {
+                "success": True,
+                "story": envelope_story(story, output_format),
+                "seed": story.seed,
+            }
+        )
+    except UnknownFormat as e:
+        return format_error(e)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/api/corpus/random")
+def corpus_random_story():
+    """API endpoint to serve a random prebuilt story, optionally filtered."""
+    if corpus is None:
+        return jsonify({"success": False, "error": "No story corpus loaded"}), 404
+
+    index = corpus.random_index(
+        location=request.args.get("location"),
+        impact=request.args.get("impact"),
+        character=request.args.get("character"),
+    )
+    if index is None:
+        return jsonify({"success": False, "error": "No prebuilt story matches"}), 404
+
+    metadata = corpus.metadata(index)
+    return jsonify(
+        {
+            "success": True,
+            "story": corpus.story(index),
+            "seed": metadata["seed"],
+            "metadata": metadata,
+        }
+    )
+
+
+@app.route("/api/cache/stats")
+def cache_stats():
+    """API endpoint reporting story cache hits, misses and evictions."""
+    return jsonify(story_cache.stats())
+
+
+@app.route("/api/model/stats")
+def model_stats():
+    """
+    API endpoint reporting this process's model-written stories, fallbacks
+    and time to first token percentiles.
+    """
+    if model_service is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **model_service.stats()})
+
+
 @app.route("/health")
 def health_check():
     """Health check endpoint for monitoring."""
@@ -98,9 +721,12 @@ def health_check():
     )
 
 
-def create_html_template():
-    """Create the HTML template for the web interface."""
-    html_content = """<!DOCTYPE html>
+# Where the page inlines the /api/catalog document and the longest length
+CATALOG_PLACEHOLDER = "{{catalog}}"
+MAX_LENGTH_PLACEHOLDER = "{{max_length}}"
+
+# The page of the web interface
+INDEX_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -222,11 +848,25 @@ def create_html_template():
         }
         
         .story-content {
-            white-space: pre-wrap;
             line-height: 1.8;
             font-size: 16px;
         }
         
+        .story-content h1 {
+            font-size: 1.6em;
+            line-height: 1.3;
+            margin-bottom: 10px;
+        }
+        
+        .story-content p {
+            margin-bottom: 1em;
+        }
+        
+        .story-content .story-setting,
+        .story-content footer {
+            color: #666;
+        }
+        
         .loading {
             text-align: center;
             color: #666;
@@ -309,7 +949,7 @@ def create_html_template():
                 
                 <div class="form-group">
                     <label for="length">Story Length (words)</label>
-                    <input type="number" id="length" name="length" value="1200" min="500" max="2000">
+                    <input type="number" id="length" name="length" value="1200" min="500" max="{{max_length}}">
                 </div>
                 
                 <button class="btn" onclick="generateStory()">Generate Story</button>
@@ -325,111 +965,123 @@ def create_html_template():
         </div>
     </div>
 
+    <script id="catalog" type="application/json">{{catalog}}</script>
     <script>
-        // Load available options when page loads
-        document.addEventListener('DOMContentLoaded', function() {
-            loadLocations();
-            loadImpacts();
-            loadCharacters();
-        });
-        
-        async function loadLocations() {
-            try {
-                const response = await fetch('/api/locations');
-                const locations = await response.json();
-                const select = document.getElementById('location');
-                
-                locations.forEach(location => {
-                    const option = document.createElement('option');
-                    option.value = location;
-                    option.textContent = location.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
-                    select.appendChild(option);
-                });
-            } catch (error) {
-                console.error('Error loading locations:', error);
-            }
-        }
+        // Fill in the form's options when the page loads
+        document.addEventListener('DOMContentLoaded', loadCatalog);
         
-        async function loadImpacts() {
+        // The catalog comes inlined in the page; /api/catalog serves the same
+        async function loadCatalog() {
             try {
-                const response = await fetch('/api/impacts');
-                const impacts = await response.json();
-                const select = document.getElementById('impact');
-                
-                impacts.forEach(impact => {
-                    const option = document.createElement('option');
-                    option.value = impact;
-                    option.textContent = impact.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
-                    select.appendChild(option);
-                });
+                const inline = document.getElementById('catalog');
+                const catalog = inline
+                    ? JSON.parse(inline.textContent)
+                    : await (await fetch('/api/catalog')).json();
+                [['location', 'locations'], ['impact', 'impacts'], ['character', 'characters']]
+                    .forEach(([field, list]) => {
+                        const select = document.getElementById(field);
+                        catalog[list].forEach(key => {
+                            const option = document.createElement('option');
+                            option.value = key;
+                            option.textContent = catalog.labels[list][key];
+                            select.appendChild(option);
+                        });
+                    });
             } catch (error) {
-                console.error('Error loading impacts:', error);
+                console.error('Error loading the catalog:', error);
             }
         }
         
-        async function loadCharacters() {
-            try {
-                const response = await fetch('/api/characters');
-                const characters = await response.json();
-                const select = document.getElementById('character');
-                
-                characters.forEach(character => {
-                    const option = document.createElement('option');
-                    option.value = character;
-                    option.textContent = character.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
-                    select.appendChild(option);
-                });
-            } catch (error) {
-                console.error('Error loading characters:', error);
-            }
-        }
+        // The story being streamed, if any
+        let currentStream = null;
         
-        async function generateStory() {
-            const location = document.getElementById('location').value;
-            const impact = document.getElementById('impact').value;
-            const character = document.getElementById('character').value;
-            const length = document.getElementById('length').value;
+        function generateStory() {
+            const params = new URLSearchParams();
+            ['location', 'impact', 'character', 'length'].forEach(field => {
+                const value = document.getElementById(field).value;
+                if (value) params.set(field, value);
+            });
             
             const storyContent = document.getElementById('story-content');
             storyContent.innerHTML = '<p class="loading">Generating story...</p>';
             
-            try {
-                const response = await fetch('/api/generate', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
-                        location: location || null,
-                        impact: impact || null,
-                        character: character || null,
-                        length: parseInt(length)
-                    })
-                });
+            // The story streams in as server-sent events: its details first,
+            // then the text as it is written, then the footer
+            if (currentStream) currentStream.close();
+            const stream = new EventSource('/api/generate/events?' + params);
+            currentStream = stream;
+            let details, article, body, text = '';
+            
+            stream.addEventListener('meta', event => {
+                const meta = JSON.parse(event.data);
                 
-                const data = await response.json();
+                details = document.createElement('div');
+                details.className = 'metadata';
+                let content = '<strong>Story Details:</strong><br>';
+                if (params.get('location')) content += `Location: ${params.get('location')}<br>`;
+                if (params.get('impact')) content += `Impact: ${params.get('impact')}<br>`;
+                if (params.get('character')) content += `Character: ${params.get('character')}<br>`;
+                content += `Seed: ${meta.seed}<br>`;
+                details.innerHTML = content;
                 
-                if (data.success) {
-                    let content = '';
-                    
-                    if (data.metadata) {
-                        content += '<div class="metadata">';
-                        content += '<strong>Story Details:</strong><br>';
-                        if (data.metadata.location) content += `Location: ${data.metadata.location}<br>`;
-                        if (data.metadata.impact) content += `Impact: ${data.metadata.impact}<br>`;
-                        if (data.metadata.character) content += `Character: ${data.metadata.character}<br>`;
-                        content += `Length: ${data.metadata.length} words`;
-                        content += '</div>';
-                    }
-                    
-                    content += '<div class="story-content">' + data.story + '</div>';
-                    storyContent.innerHTML = content;
-                } else {
-                    storyContent.innerHTML = '<div class="error">Error: ' + data.error + '</div>';
+                article = document.createElement('article');
+                article.className = 'story-content';
+                const title = document.createElement('h1');
+                title.textContent = meta.title;
+                const setting = document.createElement('p');
+                setting.className = 'story-setting';
+                setting.appendChild(document.createElement('em')).textContent = meta.setting;
+                body = document.createElement('div');
+                article.append(title, setting, body);
+                storyContent.replaceChildren(details, article);
+            });
+            
+            stream.addEventListener('chunk', event => {
+                text += JSON.parse(event.data).text;
+                // Rewrite only the paragraph being written and any new ones
+                const paragraphs = text.split(/\\n\\s*\\n/);
+                for (let i = Math.max(body.children.length - 1, 0); i < paragraphs.length; i++) {
+                    const paragraph = body.children[i] || body.appendChild(document.createElement('p'));
+                    paragraph.textContent = paragraphs[i];
                 }
-            } catch (error) {
-                storyContent.innerHTML = '<div class="error">Error generating story: ' + error.message + '</div>';
-            }
+            });
+            
+            stream.addEventListener('done', event => {
+                const done = JSON.parse(event.data);
+                // A hedged story may still be rewritten by the model
+                if (!done.enriching) stream.close();
+                const footer = document.createElement('footer');
+                footer.appendChild(document.createElement('p'))
+                    .appendChild(document.createElement('em')).textContent = done.footer;
+                article.appendChild(footer);
+                details.innerHTML += `Length: ${done.word_count} words (target ${params.get('length')})<br>`
+                    + `Written by: ${done.source}${done.complete ? '' : ' (unfinished)'}, `
+                    + `first words after ${Math.round(done.ttft_ms)} ms`;
+            });
+            
+            stream.addEventListener('enriched', event => {
+                stream.close();
+                const enriched = JSON.parse(event.data);
+                if (enriched.dropped) return;
+                body.replaceChildren(...enriched.text.split(/\\n\\s*\\n/).map(text => {
+                    const paragraph = document.createElement('p');
+                    paragraph.textContent = text;
+                    return paragraph;
+                }));
+                details.innerHTML += `<br>Rewritten by: ${enriched.source}, `
+                    + `${enriched.word_count} words`;
+            });
+            
+            // Server-reported failures carry data; a dropped connection does not
+            stream.addEventListener('error', event => {
+                stream.close();
+                const error = document.createElement('div');
+                error.className = 'error';
+                error.textContent = 'Error generating story: '
+                    + (event.data ? JSON.parse(event.data).error : 'the connection was lost');
+                if (article) storyContent.appendChild(error);
+                else storyContent.replaceChildren(error);
+            });
         }
         
         async function generateRandomStory() {
@@ -437,7 +1089,7 @@ def create_html_template():
             storyContent.innerHTML = '<p class="loading">Generating random story...</p>';
             
             try {
-                const response = await fetch('/api/random');
+                const response = await fetch('/api/random?format=html');
                 const data = await response.json();
                 
                 if (data.success) {
@@ -453,20 +1105,17 @@ def create_html_template():
 </body>
 </html>"""
 
-    with open("templates/index.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
-
 
 if __name__ == "__main__":
-    # Create templates directory if it doesn't exist
-    os.makedirs("templates", exist_ok=True)
-
-    # Create the HTML template
-    create_html_template()
-
     # Get port from environment variable (for deployment) or use default
     port = int(os.environ.get("PORT", 5001))
 
     print("Starting Climate Futures Storyteller web interface...")
+    print(
+        "Location index: {locations} locations, {keys} keys, "
+        "built in {build_ms:.2f} ms, {bytes} bytes".format(
+            **storyteller.location_index_stats
+        )
+    )
     print(f"Open your browser to http://localhost:{port}")
     app.run(debug=False, host="0.0.0.0", port=port)